@@ -0,0 +1,144 @@
+"""
+Concurrent writer benchmark for the engine configuration.
+
+Builds a scratch SQLite database per profile, then runs several writer
+threads inserting reminders in small transactions while reader threads
+repeat the expiring-policies query. Reports commits/s, reads/s and lock
+errors for SQLite's defaults against the tuned pragmas (WAL and friends).
+
+    python benchmarks/concurrent_writers.py --writers 4 --readers 2 --output writers.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as OrmSession
+
+from lib.models import Client, Policy, Reminder, upgrade_schema
+from lib.models.config import build_engine, load_engine_config
+
+PROFILES = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL, 5s lock wait
+    'sqlite-defaults': {
+        'statement_timeout': '5000',
+        'sqlite_journal_mode': '', 'sqlite_synchronous': '', 'sqlite_cache_size': '',
+        'sqlite_mmap_size': '', 'sqlite_temp_store': '',
+    },
+    'tuned': {},
+}
+
+def populate(engine, clients, policies):
+    today = date.today()
+    with engine.begin() as connection:
+        connection.execute(insert(Client), [
+            {'name': f"Client {i}", 'email': f"client{i}@example.com"} for i in range(1, clients + 1)
+        ])
+        connection.execute(insert(Policy), [
+            {
+                'policy_number': f"BENCH-{i}", 'type': 'Motor Vehicle Insurance',
+                'start_date': today - timedelta(days=365 - i % 365),
+                'end_date': today + timedelta(days=i % 365), 'premium_amount': 10000.0,
+                'client_id': 1 + i % clients, 'insurance_company': 'Britam',
+            }
+            for i in range(1, policies + 1)
+        ])
+
+def run_profile(name, overrides, args):
+    workdir = tempfile.mkdtemp(prefix='writers-')
+    url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    upgrade_schema(url)
+    engine = build_engine(load_engine_config(database_url=url, **overrides))
+    populate(engine, args.clients, args.policies)
+
+    stats = {'commits': 0, 'reads': 0, 'lock_errors': 0}
+    lock = threading.Lock()
+    writers_done = threading.Event()
+
+    def writer(worker):
+        today = date.today()
+        for txn in range(args.transactions):
+            session = OrmSession(bind=engine)
+            try:
+                session.execute(insert(Reminder), [
+                    {'policy_id': 1 + (worker * 7919 + txn * 31 + i) % args.policies,
+                     'reminder_date': today, 'status': 'pending'}
+                    for i in range(args.rows_per_transaction)
+                ])
+                session.commit()
+                with lock:
+                    stats['commits'] += 1
+            except OperationalError:
+                session.rollback()
+                with lock:
+                    stats['lock_errors'] += 1
+            finally:
+                session.close()
+
+    def reader():
+        horizon = date.today() + timedelta(days=90)
+        statement = select(func.count()).select_from(Policy).where(Policy.end_date <= horizon)
+        while not writers_done.is_set():
+            session = OrmSession(bind=engine)
+            try:
+                session.execute(statement).scalar()
+                with lock:
+                    stats['reads'] += 1
+            except OperationalError:
+                with lock:
+                    stats['lock_errors'] += 1
+            finally:
+                session.close()
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    started = time.perf_counter()
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    writers_done.set()
+    for thread in readers:
+        thread.join()
+
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+    return {
+        'profile': name,
+        'journal_mode': journal_mode,
+        'elapsed_s': round(elapsed, 3),
+        'commits_per_s': round(stats['commits'] / elapsed, 1),
+        'reads_per_s': round(stats['reads'] / elapsed, 1),
+        **stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--transactions', type=int, default=200, help='Transactions per writer.')
+    parser.add_argument('--rows-per-transaction', type=int, default=10)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--policies', type=int, default=20000)
+    parser.add_argument('--output', help='Write the JSON results to this file as well as stdout.')
+    args = parser.parse_args()
+
+    results = [run_profile(name, overrides, args) for name, overrides in PROFILES.items()]
+    output = json.dumps({'parameters': vars(args), 'results': results}, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + "\n")
+
+if __name__ == '__main__':
+    main()
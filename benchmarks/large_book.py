@@ -0,0 +1,350 @@
+"""
+Large-book benchmark for the reminder and lookup helpers.
+
+Fills a database with a synthetic, deterministic book of business built from
+the Kenyan generators in lib/db/seed.py (a fixed seed, with small Faker pools
+drawn once rather than per row), then times the key helpers and writes the
+results as JSON so runs can be compared between versions.
+
+    python benchmarks/large_book.py --clients 1000000 --database /tmp/book.db --output book.json
+    python benchmarks/large_book.py --database /tmp/book.db --reuse --output book.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy
+from sqlalchemy import func, insert, select, text
+
+from lib.models import Client, Policy, Reminder, Session, configure_engine, upgrade_schema
+from lib.db.seed import (
+    generate_kenyan_address, generate_kenyan_name, generate_kenyan_phone, get_faker,
+    insurance_companies, policy_types
+)
+from lib import analytics, helpers, instrumentation, search, snapshot
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rows written per INSERT batch while populating
+CHUNK_SIZE = 50_000
+
+# Distinct first names and street addresses drawn from Faker up front
+POOL_SIZE = 1000
+
+def build_pools(seed):
+    fake = get_faker()
+    fake.seed_instance(seed)
+    first_names = [fake.first_name() for _ in range(POOL_SIZE)]
+    street_addresses = [fake.street_address() for _ in range(POOL_SIZE)]
+    return first_names, street_addresses
+
+def generate_clients(rng, count, first_names, street_addresses):
+    for client_id in range(1, count + 1):
+        yield {
+            'id': client_id,
+            'name': generate_kenyan_name(rng, first_names),
+            'email': f"client{client_id}@example.co.ke",
+            'phone': generate_kenyan_phone(rng),
+            'address': generate_kenyan_address(rng, street_addresses),
+        }
+
+def generate_policies(rng, clients, policies_per_client, history_years, today):
+    """
+    Yield policies for each client; on average policies_per_client, with start
+    dates spread over the last history_years years and one-year terms.
+    """
+    policy_id = 0
+    history_days = 365 * history_years
+    for client_id in range(1, clients + 1):
+        for _ in range(rng.randint(1, 2 * policies_per_client - 1)):
+            policy_id += 1
+            start_date = today - timedelta(days=rng.randrange(history_days))
+            yield {
+                'id': policy_id,
+                'policy_number': f"KE-{policy_id:09d}",
+                'type': rng.choice(policy_types),
+                'start_date': start_date,
+                'end_date': start_date + timedelta(days=365),
+                'premium_amount': round(rng.uniform(5000, 100000), 2),
+                'client_id': client_id,
+                'insurance_company': rng.choice(insurance_companies),
+            }
+
+def generate_reminder_history(policies, today):
+    """
+    Yield the historical reminders of expired policies: one issued 30 days
+    before expiry and already sent.
+    """
+    for policy in policies:
+        if policy['end_date'] < today:
+            yield {
+                'policy_id': policy['id'],
+                'reminder_date': policy['end_date'] - timedelta(days=30),
+                'status': 'sent',
+            }
+
+def _insert_chunks(connection, model, rows):
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            connection.execute(insert(model), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        connection.execute(insert(model), chunk)
+        count += len(chunk)
+    return count
+
+def populate(engine, clients, policies_per_client, history_years, seed):
+    """
+    Fill an empty database with the synthetic book and return the row counts.
+
+    The rows bypass the helpers, so the expiry calendar is rebuilt and the
+    data versions bumped afterwards, as a script writing directly must.
+    """
+    rng = random.Random(seed)
+    first_names, street_addresses = build_pools(seed)
+    today = date.today()
+
+    with engine.begin() as connection:
+        client_count = _insert_chunks(
+            connection, Client, generate_clients(rng, clients, first_names, street_addresses)
+        )
+    policy_count = 0
+    reminder_count = 0
+    # Policies and their reminder history are generated in one pass, chunk by chunk
+    policy_rows = generate_policies(rng, clients, policies_per_client, history_years, today)
+    while True:
+        chunk = [row for _, row in zip(range(CHUNK_SIZE), policy_rows)]
+        if not chunk:
+            break
+        with engine.begin() as connection:
+            policy_count += _insert_chunks(connection, Policy, chunk)
+            reminder_count += _insert_chunks(connection, Reminder, generate_reminder_history(chunk, today))
+    session = Session(bind=engine)
+    try:
+        helpers.bump_data_version(session, 'policies', 'reminders')
+        # Commits the version bump too
+        helpers.rebuild_expiry_calendar(session)
+    finally:
+        session.close()
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    return {'clients': client_count, 'policies': policy_count, 'reminders': reminder_count}
+
+def table_counts(session):
+    return {
+        'clients': session.scalar(select(func.count()).select_from(Client)),
+        'policies': session.scalar(select(func.count()).select_from(Policy)),
+        'reminders': session.scalar(select(func.count()).select_from(Reminder)),
+    }
+
+def time_call(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return {
+        'median_s': round(statistics.median(timings), 6),
+        'min_s': round(min(timings), 6),
+        'max_s': round(max(timings), 6),
+        'repeat': repeat,
+    }, result
+
+def expiring_from_snapshot(session, days):
+    with snapshot.load_snapshot(session) as current:
+        return len(current.policies.expiring(days))
+
+def add_client_books(session, clients, tag, batched):
+    """
+    Add clients with three policies each through the helpers, per call or in one write batch.
+    """
+    end_date = date.today() + timedelta(days=200)
+
+    def add_all():
+        for number in range(clients):
+            client = helpers.add_client(session, f"Bench {tag} {number}", f"bench{number}@example.co.ke", None, None)
+            for kind in range(3):
+                helpers.add_policy(
+                    session, client.id, f"BENCH-{tag}-{number}-{kind}", 'Life Insurance',
+                    date.today(), end_date, 10000.0, 'Britam'
+                )
+
+    if batched:
+        with helpers.batch(session):
+            add_all()
+    else:
+        add_all()
+    return clients * 4
+
+def archive_closed_reminders(session, chunk_size=1000):
+    """
+    Archive every closed reminder older than a year, chunk_size per transaction.
+    """
+    archived = 0
+    while True:
+        count = helpers.archive_reminders(session, limit=chunk_size)
+        archived += count
+        if count < chunk_size:
+            return archived
+
+def run_benchmarks(args, counts):
+    """
+    Time the key helpers, each with a fresh session, and return a result per benchmark.
+
+    Helpers are looked up on the module at call time so instrumentation wrappers apply.
+    """
+    rng = random.Random(args.seed)
+    sample_clients = [rng.randint(1, counts['clients']) for _ in range(args.lookups)]
+    # Keeps the policy numbers of repeated write runs unique
+    write_runs = itertools.count()
+
+    def with_session(call):
+        def run():
+            session = Session()
+            try:
+                return call(session)
+            finally:
+                session.close()
+        return run
+
+    benchmarks = {
+        # The first run creates the pending reminders; later runs find nothing to do
+        'generate_reminders.initial': (with_session(lambda s: helpers.generate_reminders(s)['created']), 1),
+        'generate_reminders.noop': (with_session(lambda s: helpers.generate_reminders(s)['created']), args.repeat),
+        # Every touchpoint of the default 90/60/30/7 schedule, against the single-reminder path above
+        'generate_scheduled_reminders.initial': (
+            with_session(lambda s: helpers.generate_scheduled_reminders(s)['created']), 1
+        ),
+        'generate_scheduled_reminders.noop': (
+            with_session(lambda s: helpers.generate_scheduled_reminders(s)['created']), args.repeat
+        ),
+        'get_expiring_policies.30d': (with_session(lambda s: len(helpers.get_expiring_policies(s, 30))), args.repeat),
+        'get_expiring_policies.90d': (with_session(lambda s: len(helpers.get_expiring_policies(s, 90))), args.repeat),
+        # Whole months come from the expiry calendar, the partial ones from the end_date index
+        'count_expiring.365d': (with_session(lambda s: helpers.count_expiring(s, 365)['policies']), args.repeat),
+        'iter_policies': (with_session(lambda s: sum(1 for _ in helpers.iter_policies(s))), args.repeat),
+        'list_policies': (with_session(lambda s: len(helpers.list_policies(s))), args.repeat),
+        'get_client_policies': (
+            with_session(lambda s: sum(len(helpers.get_client_policies(s, c)) for c in sample_clients)),
+            args.repeat
+        ),
+        # Partial policy numbers, as typed by a broker; divide by --lookups for the per-query latency
+        'search.policy_number': (
+            with_session(lambda s: sum(len(search.search_policies(s, f"KE-{c:09d}"[:-1], 5)) for c in sample_clients)),
+            args.repeat
+        ),
+        'snapshot.load': (with_session(lambda s: len(snapshot.PolicySnapshot.load(s))), args.repeat),
+        # The first call writes the snapshot file; later calls map it and bisect
+        'snapshot.expiring.90d': (with_session(lambda s: expiring_from_snapshot(s, 90)), args.repeat),
+        'renewal_report': (with_session(lambda s: analytics.renewal_report(s)['premium_percentiles']['count']), args.repeat),
+        # Writes last, so they do not change what the read benchmarks see; rows counts objects added
+        'add_client_books.per_call': (
+            with_session(lambda s: add_client_books(s, 100, f"call{next(write_runs)}", batched=False)), args.repeat
+        ),
+        'add_client_books.batch': (
+            with_session(lambda s: add_client_books(s, 100, f"batch{next(write_runs)}", batched=True)), args.repeat
+        ),
+        # Closes the sent history reminders of ended policies, then moves them to reminders_archive
+        'reminders.close': (
+            with_session(lambda s: helpers.close_renewed_reminders(s) + helpers.expire_reminders(s)), 1
+        ),
+        'reminders.archive': (with_session(archive_closed_reminders), 1),
+        'count_pending_reminders': (with_session(helpers.count_pending_reminders), args.repeat),
+    }
+    selected = args.benchmarks.split(',') if args.benchmarks else list(benchmarks)
+
+    results = []
+    for name in selected:
+        if name not in benchmarks:
+            raise SystemExit(f"Unknown benchmark: {name} (choose from {', '.join(benchmarks)})")
+        function, repeat = benchmarks[name]
+        timing, rows = time_call(function, repeat)
+        timing.update({'name': name, 'rows': rows})
+        results.append(timing)
+        print(f"{name}: median {timing['median_s']:.4f}s ({rows} rows)", file=sys.stderr)
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', default='large_book.db', help='SQLite file to create or reuse.')
+    parser.add_argument('--reuse', action='store_true', help='Benchmark an existing database without repopulating it.')
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--policies-per-client', type=int, default=3, help='Average policies per client.')
+    parser.add_argument('--history-years', type=int, default=3, help='Years of policy and reminder history.')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark (median reported).')
+    parser.add_argument('--lookups', type=int, default=1000, help='Client ids sampled for get_client_policies.')
+    parser.add_argument('--benchmarks', help='Comma-separated subset of benchmarks to run.')
+    parser.add_argument('--instrument', action='store_true',
+                        help='Record SQL statement counts per helper (flags N+1 patterns).')
+    parser.add_argument('--output', help='Write the JSON results to this file as well as stdout.')
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.abspath(args.database)}"
+    populate_s = None
+    if not args.reuse:
+        if os.path.exists(args.database):
+            os.remove(args.database)
+        upgrade_schema(url)
+        engine = configure_engine(database_url=url)
+        started = time.perf_counter()
+        populate(engine, args.clients, args.policies_per_client, args.history_years, args.seed)
+        populate_s = round(time.perf_counter() - started, 3)
+        print(f"populated in {populate_s}s", file=sys.stderr)
+    else:
+        configure_engine(database_url=url)
+
+    session = Session()
+    counts = table_counts(session)
+    session.close()
+
+    if args.instrument:
+        instrumentation.enable()
+    benchmark_results = run_benchmarks(args, counts)
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'counts': counts,
+        'populate_s': populate_s,
+        'benchmarks': benchmark_results,
+    }
+    if args.instrument:
+        results['helper_totals'] = instrumentation.helper_totals()
+        instrumentation.disable()
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + "\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Startup-time benchmark for the command line.
+
+Measures the cold import latency of lib.cli and the wall time of
+'python -m lib.cli --help' in fresh interpreter processes, and reports the
+modules that dominate the import time. Results are printed as JSON so they
+can be compared between versions.
+
+    python benchmarks/startup.py --runs 20 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import lib.cli': [sys.executable, '-c', 'import lib.cli'],
+    'lib.cli --help': [sys.executable, '-m', 'lib.cli', '--help'],
+}
+
+def time_command(command, runs):
+    """
+    Run a command in a fresh process runs times and return the wall times in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def slowest_imports(module='lib.cli', limit=10):
+    """
+    Return the modules with the largest cumulative import time (microseconds) under -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, check=True, capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative), name.strip()))
+    entries.sort(reverse=True)
+    return [{'module': name, 'cumulative_us': cumulative} for cumulative, name in entries[:limit]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='Fresh processes per scenario.')
+    parser.add_argument('--output', help='Write the JSON results to this file as well as stdout.')
+    args = parser.parse_args()
+
+    # Subtract the bare interpreter start-up so the numbers reflect our own code
+    baseline = statistics.median(time_command([sys.executable, '-c', 'pass'], args.runs))
+    results = {'python': sys.version.split()[0], 'runs': args.runs, 'interpreter_ms': round(baseline, 2)}
+    for name, command in SCENARIOS.items():
+        timings = time_command(command, args.runs)
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 2),
+            'min_ms': round(min(timings), 2),
+            'median_over_interpreter_ms': round(statistics.median(timings) - baseline, 2),
+        }
+    results['slowest_imports'] = slowest_imports()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + "\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+from .models import Policy
+from .helpers import DEFAULT_RENEWAL_GRACE_DAYS, is_renewed
+from sqlalchemy import case, extract, func, select
+from array import array
+from datetime import datetime, timedelta
+import time
+
+# Renewal analytics over the whole policy book.
+#
+# Totals, histograms and renewal counts are pushed down to the database as
+# GROUP BY queries, so only one row per group comes back. Statistics SQL
+# cannot aggregate portably (percentiles, concentration) stream bare columns
+# with yield_per into compact buffers. No ORM objects are created either way.
+
+GROUPINGS = ('month', 'company', 'type')
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# Rows fetched per round trip when streaming columns
+CHUNK_SIZE = 10000
+
+def _window(days, today):
+    today = today or datetime.now().date()
+    return today, today + timedelta(days=days)
+
+def _group_columns(group_by):
+    if group_by == 'month':
+        year = extract('year', Policy.end_date)
+        month = extract('month', Policy.end_date)
+        return [year.label('year'), month.label('month')]
+    if group_by == 'company':
+        return [Policy.insurance_company.label('insurance_company')]
+    if group_by == 'type':
+        return [Policy.type.label('type')]
+    raise ValueError(f"Unknown grouping: {group_by}")
+
+def _stream_column(session, statement):
+    result = session.execute(statement.execution_options(yield_per=CHUNK_SIZE))
+    for partition in result.scalars().partitions():
+        yield from partition
+
+def premium_at_risk(session, group_by='month', days=365, today=None):
+    """
+    Sum the premiums of policies expiring within the window, grouped in the database.
+
+    :param group_by: 'month' (expiry histogram), 'company' or 'type'
+    :param days: Look-ahead window in days
+    :return: List of dictionaries with the group key, policy count and premium total
+    """
+    today, horizon = _window(days, today)
+    columns = _group_columns(group_by)
+    statement = (
+        select(
+            *columns,
+            func.count(Policy.id).label('policies'),
+            func.sum(Policy.premium_amount).label('premium_total'),
+        )
+        .where(Policy.end_date >= today, Policy.end_date <= horizon)
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    groups = []
+    for row in session.execute(statement):
+        group = row._asdict()
+        if group_by == 'month':
+            group = {'month': f"{int(group.pop('year')):04d}-{int(group.pop('month')):02d}", **group}
+        group['premium_total'] = round(group['premium_total'] or 0.0, 2)
+        groups.append(group)
+    return groups
+
+def _percentile(values, percentile):
+    # Linear interpolation between the closest ranks of a sorted sequence
+    position = (len(values) - 1) * percentile / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def premium_percentiles(session, percentiles=DEFAULT_PERCENTILES, days=None, today=None):
+    """
+    Compute premium percentiles, streaming the premium column into a float array.
+
+    :param percentiles: Percentiles to report, between 0 and 100
+    :param days: Only policies expiring within this many days (all policies if None)
+    :return: Dictionary with count, mean, min, max and one 'p<N>' entry per percentile
+    """
+    statement = select(Policy.premium_amount)
+    if days is not None:
+        today, horizon = _window(days, today)
+        statement = statement.where(Policy.end_date >= today, Policy.end_date <= horizon)
+
+    premiums = array('d', _stream_column(session, statement))
+    if not premiums:
+        return {'count': 0}
+    premiums = array('d', sorted(premiums))
+    stats = {
+        'count': len(premiums),
+        'mean': round(sum(premiums) / len(premiums), 2),
+        'min': premiums[0],
+        'max': premiums[-1],
+    }
+    for percentile in percentiles:
+        stats[f"p{percentile:g}"] = round(_percentile(premiums, percentile), 2)
+    return stats
+
+def client_concentration(session, top=10):
+    """
+    Measure how concentrated the premium book is across clients.
+
+    Premiums are summed per client in the database; the per-client totals are
+    streamed into an array to compute the top clients' share and the
+    Herfindahl-Hirschman index (sum of squared shares, 0 to 10000).
+
+    :param top: Number of largest clients to report
+    :return: Dictionary with clients, total premium, top-N share, HHI and the top clients
+    """
+    client_premium = func.sum(Policy.premium_amount).label('premium_total')
+    totals = array('d', _stream_column(
+        session, select(client_premium).group_by(Policy.client_id)
+    ))
+    book_total = sum(totals)
+    if not book_total:
+        return {'clients': len(totals), 'premium_total': 0.0}
+
+    largest = session.execute(
+        select(Policy.client_id, client_premium)
+        .group_by(Policy.client_id)
+        .order_by(client_premium.desc())
+        .limit(top)
+    ).all()
+    return {
+        'clients': len(totals),
+        'premium_total': round(book_total, 2),
+        'top_share': round(sum(row.premium_total for row in largest) / book_total, 4),
+        'hhi': round(sum((value / book_total * 100) ** 2 for value in totals), 2),
+        'top_clients': [
+            {'client_id': row.client_id, 'premium_total': round(row.premium_total, 2)}
+            for row in largest
+        ],
+    }
+
+def renewal_rates(session, lookback_days=365, grace_days=DEFAULT_RENEWAL_GRACE_DAYS, today=None):
+    """
+    Compute renewal rates of policies that expired within the lookback window.
+
+    A policy is renewed under lib.helpers.is_renewed, the rule that also
+    closes reminders as renewed: the client holds a policy of the same type
+    starting within grace_days of its end date. The expired and renewed
+    policies are counted per company in one GROUP BY query.
+
+    :return: Dictionary with overall and per-company expired, renewed and rate
+    """
+    today = today or datetime.now().date()
+    since = today - timedelta(days=lookback_days)
+    statement = (
+        select(
+            Policy.insurance_company,
+            func.count(Policy.id),
+            func.coalesce(func.sum(case((is_renewed(grace_days), 1), else_=0)), 0),
+        )
+        .where(Policy.end_date >= since, Policy.end_date < today)
+        .group_by(Policy.insurance_company)
+    )
+    by_company = {company: (expired, renewed) for company, expired, renewed in session.execute(statement)}
+
+    def rate(expired, renewed):
+        return {'expired': expired, 'renewed': renewed, 'rate': round(renewed / expired, 4) if expired else None}
+
+    return {
+        'overall': rate(sum(c[0] for c in by_company.values()), sum(c[1] for c in by_company.values())),
+        'by_company': {
+            company: rate(*counts)
+            for company, counts in sorted(by_company.items(), key=lambda item: str(item[0]))
+        },
+    }
+
+def renewal_report(session, days=365, top=10, today=None):
+    """
+    Build the full management report: premium at risk by month, company and
+    type, premium percentiles, client concentration and renewal rates.
+
+    :return: Dictionary with one entry per section and the elapsed seconds
+    """
+    started = time.perf_counter()
+    report = {
+        'window_days': days,
+        'by_month': premium_at_risk(session, 'month', days, today),
+        'by_company': premium_at_risk(session, 'company', days, today),
+        'by_type': premium_at_risk(session, 'type', days, today),
+        'premium_percentiles': premium_percentiles(session, days=days, today=today),
+        'client_concentration': client_concentration(session, top),
+        'renewal_rates': renewal_rates(session, today=today),
+    }
+    report['elapsed'] = time.perf_counter() - started
+    return report
@@ -0,0 +1,218 @@
+from .models import Reminder, check_schema_revision, get_engine_config
+from .models.config import build_async_engine
+from .helpers import bump_data_version, expiring_policies_view, reminders_view
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datetime import date, datetime
+import asyncio
+import json
+import sys
+import time
+
+# Asyncio variants of the helpers, for fanning out reminder notifications.
+#
+# They run on SQLAlchemy's async engine, built from the same settings as the
+# shared engine with the backend's async driver (aiosqlite locally). Reads are
+# column-only selects (see the read models in lib/helpers.py), so no ORM
+# objects are created. The dispatcher keeps a bounded number of deliveries in
+# flight and marks delivered reminders 'sent' in batched UPDATEs.
+
+DEFAULT_PAGE_SIZE = 1000
+
+# Deliveries in flight at once
+DEFAULT_CONCURRENCY = 100
+
+# Reminder ids per status UPDATE
+DEFAULT_STATUS_BATCH_SIZE = 500
+
+_async_engine = None
+
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+async def get_async_engine():
+    """
+    Return the shared async engine, creating it and checking the schema on first use.
+    """
+    global _async_engine
+    if _async_engine is None:
+        engine = build_async_engine(get_engine_config())
+        try:
+            # The same revision check configure_engine runs on the shared engine
+            async with engine.connect() as connection:
+                await connection.run_sync(check_schema_revision)
+        except RuntimeError:
+            await engine.dispose()
+            raise
+        AsyncSessionLocal.configure(bind=engine)
+        _async_engine = engine
+    return _async_engine
+
+async def open_session():
+    """
+    Open a session on the shared async engine.
+    """
+    await get_async_engine()
+    return AsyncSessionLocal()
+
+async def dispose_async_engine():
+    """
+    Close the async engine's pooled connections (call before the event loop ends).
+    """
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+async def iter_reminders_async(session, page_size=DEFAULT_PAGE_SIZE, since_id=0):
+    """
+    Yield pending reminders with policy and client contact fields, page by page.
+
+    Each page is read in its own short query (keyset pagination on the reminder
+    id), so no read transaction is held open while the caller works on the rows.
+    """
+    last_id = since_id
+    statement = reminders_view().order_by(None).order_by(Reminder.id).limit(page_size)
+    while True:
+        page = (await session.execute(statement.where(Reminder.id > last_id))).all()
+        await session.commit()
+        if not page:
+            return
+        for row in page:
+            yield row
+        last_id = page[-1].reminder_id
+
+async def iter_expiring_policies_async(session, days=90, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Yield policies expiring within the specified number of days, with client contact fields.
+
+    Rows are streamed from the cursor page_size at a time.
+    """
+    result = await session.stream(expiring_policies_view(days).execution_options(yield_per=page_size))
+    async for partition in result.partitions():
+        for row in partition:
+            yield row
+
+async def mark_reminders(session, reminder_ids, status=Reminder.SENT, batch_size=DEFAULT_STATUS_BATCH_SIZE):
+    """
+    Move reminders to a new status with one UPDATE per batch of ids.
+
+    Reminders whose status may not move to the new one (see
+    Reminder.TRANSITIONS), such as closed ones, are left alone.
+
+    :return: Number of reminders updated
+    """
+    sources = Reminder.sources(status)
+    updated = 0
+    reminder_ids = list(reminder_ids)
+    try:
+        for start in range(0, len(reminder_ids), batch_size):
+            result = await session.execute(
+                update(Reminder)
+                .where(Reminder.id.in_(reminder_ids[start:start + batch_size]), Reminder.status.in_(sources))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        if updated:
+            await session.run_sync(bump_data_version, 'reminders')
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise Exception(f"Database error: {str(e)}")
+    return updated
+
+# Delivery sinks
+# A sink is an async callable taking one reminder row; it returns once the
+# notification is delivered and raises if delivery failed.
+
+class MemorySink:
+    """
+    Local stand-in sink that keeps delivered reminders in memory.
+
+    :param delay: Seconds each delivery takes, to simulate network latency
+    :param fail_ids: Reminder ids whose delivery raises
+    """
+
+    def __init__(self, delay=0.0, fail_ids=()):
+        self.delay = delay
+        self.fail_ids = set(fail_ids)
+        self.delivered = []
+
+    async def __call__(self, reminder):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if reminder.reminder_id in self.fail_ids:
+            raise RuntimeError(f"Delivery of reminder {reminder.reminder_id} failed")
+        self.delivered.append(reminder)
+
+class JsonlSink:
+    """
+    Sink writing each notification as a JSON line to a text handle (an outbox for another sender).
+    """
+
+    def __init__(self, handle=None):
+        self.handle = handle or sys.stdout
+
+    async def __call__(self, reminder):
+        record = {
+            key: value.isoformat() if isinstance(value, (date, datetime)) else value
+            for key, value in reminder._asdict().items()
+        }
+        self.handle.write(json.dumps(record) + "\n")
+
+async def dispatch_reminders(sink, concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_STATUS_BATCH_SIZE,
+                             page_size=DEFAULT_PAGE_SIZE):
+    """
+    Deliver every pending reminder through a sink and mark the delivered ones 'sent'.
+
+    At most concurrency deliveries run at once. Delivered reminder ids are
+    collected and written back batch_size at a time on a separate session, so
+    status updates never wait on a delivery and deliveries never wait on a
+    commit per reminder. Failed deliveries stay pending for the next run.
+
+    :param sink: Async callable delivering one reminder row
+    :return: Dictionary with the numbers delivered, failed and marked sent, and the elapsed seconds
+    """
+    started = time.perf_counter()
+    slots = asyncio.Semaphore(concurrency)
+    delivered_ids = []
+    in_flight = set()
+    stats = {'delivered': 0, 'failed': 0, 'marked_sent': 0}
+
+    async def deliver(reminder):
+        try:
+            await sink(reminder)
+        except Exception:
+            stats['failed'] += 1
+        else:
+            stats['delivered'] += 1
+            delivered_ids.append(reminder.reminder_id)
+        finally:
+            slots.release()
+
+    async def flush(status_session):
+        ids = delivered_ids[:]
+        del delivered_ids[:]
+        if ids:
+            stats['marked_sent'] += await mark_reminders(status_session, ids, batch_size=batch_size)
+
+    read_session = await open_session()
+    status_session = await open_session()
+    try:
+        async for reminder in iter_reminders_async(read_session, page_size=page_size):
+            await slots.acquire()
+            task = asyncio.ensure_future(deliver(reminder))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            if len(delivered_ids) >= batch_size:
+                await flush(status_session)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        await flush(status_session)
+    finally:
+        await read_session.close()
+        await status_session.close()
+
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from datetime import date, datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Read-through cache for the get_client, get_policy and get_client_policies
+# helpers.
+#
+# Entries are the column values of the looked-up rows (plain dictionaries),
+# never ORM objects, so they can outlive the session that loaded them and be
+# stored on disk. The helpers turn them back into session objects without a
+# query and invalidate them whenever a write helper changes the row.
+#
+# The backend is in-process by default. Setting INSURANCE_TRACKER_CACHE_PATH
+# (or calling configure_cache with a SqliteCache) shares the entries between
+# processes through a SQLite file. INSURANCE_TRACKER_CACHE_TTL and
+# INSURANCE_TRACKER_CACHE_MAX_ENTRIES size either backend.
+
+CACHE_PATH_ENV = 'INSURANCE_TRACKER_CACHE_PATH'
+CACHE_TTL_ENV = 'INSURANCE_TRACKER_CACHE_TTL'
+CACHE_MAX_ENTRIES_ENV = 'INSURANCE_TRACKER_CACHE_MAX_ENTRIES'
+
+# Seconds an entry stays valid; bounds staleness from writes made outside the helpers
+DEFAULT_TTL = 300
+
+DEFAULT_MAX_ENTRIES = 10000
+
+class MemoryCache:
+    """
+    In-process LRU cache with a time-to-live per entry.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+class SqliteCache:
+    """
+    Cache stored in a SQLite file, shared by every process that opens it.
+
+    Values are stored as JSON (dates as ISO strings). Least recently used
+    entries are evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)")
+
+    def _connection(self):
+        if not hasattr(self._local, 'connection'):
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return self._local.connection
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=_json_default), now + self.ttl, now)
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+
+    def delete(self, keys):
+        with self._connection() as connection:
+            connection.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+_backend = None
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+def configure_cache(backend=None, path=None, max_entries=None, ttl=None):
+    """
+    Replace the cache backend.
+
+    :param backend: A MemoryCache, SqliteCache or compatible object; built from the other arguments if None
+    :param path: SQLite file to share the cache through (in-process cache if None)
+    :return: The new backend
+    """
+    global _backend
+    if backend is None:
+        max_entries = max_entries or int(os.environ.get(CACHE_MAX_ENTRIES_ENV) or DEFAULT_MAX_ENTRIES)
+        ttl = ttl if ttl is not None else float(os.environ.get(CACHE_TTL_ENV) or DEFAULT_TTL)
+        path = path or os.environ.get(CACHE_PATH_ENV)
+        backend = SqliteCache(path, max_entries, ttl) if path else MemoryCache(max_entries, ttl)
+    _backend = backend
+    reset_stats()
+    return backend
+
+def is_configured():
+    return _backend is not None
+
+def get_cache():
+    """
+    Return the cache backend, configuring it from the environment on first use.
+    """
+    if _backend is None:
+        configure_cache()
+    return _backend
+
+def lookup(key):
+    """
+    Return the cached value for a key, or None, counting the hit or miss.
+    """
+    value = get_cache().get(key)
+    _stats['hits' if value is not None else 'misses'] += 1
+    return value
+
+def store(key, value):
+    get_cache().set(key, value)
+
+def invalidate(*keys):
+    """
+    Drop entries after the rows behind them changed.
+    """
+    get_cache().delete(keys)
+    _stats['invalidations'] += len(keys)
+
+def invalidate_all():
+    """
+    Drop every entry, e.g. after a bulk operation changed an unknown set of rows.
+    """
+    get_cache().clear()
+    _stats['invalidations'] += 1
+
+def reset_stats():
+    for key in _stats:
+        _stats[key] = 0
+
+def cache_stats():
+    """
+    Return the hit and miss counts of this process, the hit rate and the backend size.
+    """
+    lookups = _stats['hits'] + _stats['misses']
+    backend = get_cache()
+    return {
+        **_stats,
+        'hit_rate': round(_stats['hits'] / lookups, 4) if lookups else None,
+        'entries': len(backend),
+        'evictions': backend.evictions,
+    }
+
+def _namespace(session):
+    # Keys are prefixed per database so a shared store can serve several of them
+    url = session.get_bind().url.render_as_string(hide_password=True)
+    return f"{zlib.crc32(url.encode()):08x}"
+
+def policy_key(session, policy_id):
+    return f"{_namespace(session)}:policy:{policy_id}"
+
+def client_key(session, client_id):
+    return f"{_namespace(session)}:client:{client_id}"
+
+def client_policies_key(session, client_id):
+    return f"{_namespace(session)}:client_policies:{client_id}"
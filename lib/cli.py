@@ -1,11 +1,14 @@
 import click
-from .models import Session
-from .helpers import (
-    add_policy, get_policy, list_policies, update_policy, delete_policy,
-    add_client, get_client, list_clients, update_client, delete_client,
-    generate_reminders, list_reminders, get_expiring_policies
+from .db.options import (
+    DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS, IMPORT_KINDS
 )
-from datetime import datetime
+from datetime import datetime, timedelta
+import functools
+import json
+import time
+
+# The models, helpers and SQLAlchemy are imported inside the functions that
+# use them, so 'python -m lib.cli --help' starts without touching the database.
 
 # Using tuples for menu
 MAIN_MENU_OPTIONS = (
@@ -36,11 +39,24 @@ REMINDERS_MENU_OPTIONS = (
     "View Expiring Policies"
 )
 
+# Number of rows shown before asking whether to continue a listing
+PAGE_SIZE = 50
+
 def print_menu(options):
     for idx, option in enumerate(options, 1):
         print(f"{idx}. {option}")
     print("0. Go back/Exit")
 
+def print_paged(lines, page_size=PAGE_SIZE):
+    """
+    Print lines as they are produced, pausing after every page_size lines.
+    """
+    for count, line in enumerate(lines, 1):
+        print(line)
+        if count % page_size == 0:
+            if input("-- Press Enter for more, or q to stop: ").strip().lower() == 'q':
+                break
+
 def get_user_choice(max_choice):
     while True:
         try:
@@ -53,6 +69,8 @@ def get_user_choice(max_choice):
             print("Please enter a valid number")
 
 def policies_menu(session):
+    from .helpers import add_policy, get_policy, iter_policies, update_policy, delete_policy
+
     while True:
         print("\n--- Policies Menu ---")
         print_menu(POLICIES_MENU_OPTIONS)
@@ -95,11 +113,9 @@ def policies_menu(session):
                 print("Policy not found")
         elif choice == 3:
             # list policies
-            policies = list_policies(session)
-            # using a list comprehension to format policy information
-            policy_list = [f"ID: {p.id}, Number: {p.policy_number}, Type: {p.type}" for p in policies]
-            for policy_info in policy_list:
-                print(policy_info)
+            # using a generator expression so rows are formatted as they are fetched
+            policy_lines = (f"ID: {p.id}, Number: {p.policy_number}, Type: {p.type}" for p in iter_policies(session))
+            print_paged(policy_lines)
         elif choice == 4:
             # Update Policy
             policy_id = int(input("Enter policy ID to update: "))
@@ -116,6 +132,8 @@ def policies_menu(session):
                 print("Policy not found")
 
 def clients_menu(session):
+    from .helpers import add_client, get_client_portfolio, iter_clients, update_client, delete_client
+
     while True:
         print("\n--- Clients Menu ---")
         print_menu(CLIENTS_MENU_OPTIONS)
@@ -137,7 +155,7 @@ def clients_menu(session):
         elif choice == 2:
             # View Client
             client_id = int(input("Enter client ID: "))
-            client = get_client(session, client_id)
+            client = get_client_portfolio(session, client_id)
             if client:
                 # Using a dictionary to display client details
                 client_details = {
@@ -149,15 +167,17 @@ def clients_menu(session):
                 }
                 for key, value in client_details.items():
                     print(f"{key}: {value}")
+                # Policies and reminders were loaded with the client, so this runs no further queries
+                for policy in client.policies:
+                    pending = sum(1 for r in policy.reminders if r.status == r.PENDING)
+                    print(f"  Policy {policy.policy_number}: {policy.type}, expires {policy.end_date}, {pending} pending reminder(s)")
             else:
                 print("Client not found")
         elif choice == 3:
             # List Clients
-            clients = list_clients(session)
-            # Using a list comprehension to format client information
-            client_list = [f"ID: {c.id}, Name: {c.name}, Email: {c.email}" for c in clients]
-            for client_info in client_list:
-                print(client_info)
+            # Using a generator expression so rows are formatted as they are fetched
+            client_lines = (f"ID: {c.id}, Name: {c.name}, Email: {c.email}" for c in iter_clients(session))
+            print_paged(client_lines)
         elif choice == 4:
             # Update Client
             client_id = int(input("Enter client ID to update: "))
@@ -174,6 +194,8 @@ def clients_menu(session):
                 print("Client not found")
 
 def reminders_menu(session):
+    from .helpers import generate_reminders, iter_reminders_with_details, get_expiring_policies_with_clients
+
     while True:
         print("\n--- Reminders Menu ---")
         print_menu(REMINDERS_MENU_OPTIONS)
@@ -183,26 +205,35 @@ def reminders_menu(session):
             break
         elif choice == 1:
             # Generate Reminders
-            generate_reminders(session)
-            print("Reminders generated successfully")
+            result = generate_reminders(session)
+            print(f"Generated {result['created']} reminders in {result['elapsed']:.2f}s")
         elif choice == 2:
             # List Reminders
-            reminders = list_reminders(session)
-            # Using a list comprehension to format reminder information
-            reminder_list = [f"ID: {r.id}, Policy ID: {r.policy_id}, Date: {r.reminder_date}, Status: {r.status}" for r in reminders]
-            for reminder_info in reminder_list:
-                print(reminder_info)
+            # Using a generator expression so rows are formatted as they are fetched
+            reminder_lines = (
+                f"ID: {r.reminder_id}, Policy: {r.policy_number}, Client: {r.client_name}, "
+                f"Phone: {r.client_phone}, Date: {r.reminder_date}, Status: {r.status}"
+                for r in iter_reminders_with_details(session)
+            )
+            print_paged(reminder_lines)
         elif choice == 3:
             # View Expiring Policies
             days = int(input("Enter number of days to look ahead: "))
-            policies = get_expiring_policies(session, days)
+            policies = get_expiring_policies_with_clients(session, days)
             # Using a list comprehension to format expiring policy information
-            expiring_policies = [f"Policy ID: {p.id}, Number: {p.policy_number}, Expiry Date: {p.end_date}" for p in policies]
+            expiring_policies = [
+                f"Policy ID: {p.policy_id}, Number: {p.policy_number}, Expiry Date: {p.end_date}, "
+                f"Client: {p.client_name}, Phone: {p.client_phone}, Email: {p.client_email}"
+                for p in policies
+            ]
             for policy_info in expiring_policies:
                 print(policy_info)
 
-def main_menu():
-    session = Session()
+def main_menu(session=None):
+    owns_session = session is None
+    if owns_session:
+        from .models import Session
+        session = Session()
     try:
         while True:
             print("\n--- Insurance Renewal Tracker ---")
@@ -219,7 +250,498 @@ def main_menu():
             elif choice == 3:
                 reminders_menu(session)
     finally:
-        session.close()
+        if owns_session:
+            session.close()
+
+# Non-interactive commands
+# Every command shares the session opened by the cli group and writes
+# machine-readable output to stdout; failures exit with a non-zero status.
+
+def _record(obj):
+    """
+    Convert a model instance to a JSON-serialisable dictionary of its columns.
+    """
+    record = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        record[column.key] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return record
+
+def _write(session, statement, fmt, output=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    from .db.exporter import write_statement
+
+    try:
+        return write_statement(session, statement, fmt, output, chunk_size)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+def get_session(ctx):
+    """
+    Return the session shared by the whole command line, opening it on first use.
+    """
+    root = ctx.find_root()
+    if root.obj is None:
+        from .models import Session
+
+        try:
+            root.obj = Session()
+        except (RuntimeError, ValueError) as e:
+            raise click.ClickException(str(e))
+        root.call_on_close(root.obj.close)
+    return root.obj
+
+def pass_session(command):
+    """
+    Decorator passing the shared session as the first argument of a command.
+    """
+    @click.pass_context
+    def wrapper(ctx, *args, **kwargs):
+        return ctx.invoke(command, get_session(ctx), *args, **kwargs)
+    return functools.update_wrapper(wrapper, command)
+
+format_option = click.option(
+    '--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='jsonl', show_default=True,
+    help='Output format.'
+)
+
+@click.group(invoke_without_command=True)
+@click.option('--timing', is_flag=True, help='Report the elapsed time of the command on stderr.')
+@click.option('--profile-log', type=click.Path(dir_okay=False), envvar='INSURANCE_TRACKER_PROFILE_LOG',
+              help='Append a JSON record per helper call (latency, SQL statements, rows) to this file.')
+@click.option('--metrics-file', type=click.Path(dir_okay=False), envvar='INSURANCE_TRACKER_METRICS_FILE',
+              help='Write per-helper totals in Prometheus text format to this file on exit.')
+@click.pass_context
+def cli(ctx, timing, profile_log, metrics_file):
+    """
+    Insurance Renewal Tracker. Run without a command for the interactive menu.
+    """
+    if timing:
+        started = time.perf_counter()
+        ctx.call_on_close(lambda: click.echo(f"elapsed: {time.perf_counter() - started:.3f}s", err=True))
+    if profile_log or metrics_file:
+        from . import instrumentation
+
+        try:
+            instrumentation.enable(log_path=profile_log)
+        except (RuntimeError, ValueError) as e:
+            raise click.ClickException(str(e))
+
+        def finish_profiling():
+            if metrics_file:
+                instrumentation.write_prometheus(metrics_file)
+            instrumentation.disable()
+        ctx.call_on_close(finish_profiling)
+    if ctx.invoked_subcommand is None:
+        main_menu(get_session(ctx))
+
+@cli.group()
+def policies():
+    """Policy commands."""
+
+@policies.command('list')
+@click.option('--since-id', default=0, show_default=True, help='Only policies with a greater id.')
+@click.option('--limit', type=int, help='Maximum number of policies.')
+@format_option
+@pass_session
+def policies_list(session, since_id, limit, fmt):
+    """List policies in id order."""
+    from .models import Policy
+    from .helpers import policies_view
+
+    statement = policies_view().where(Policy.id > since_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    _write(session, statement, fmt)
+
+@policies.command('expiring')
+@click.option('--days', default=90, show_default=True, help='Look-ahead window in days.')
+@format_option
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='Output file (defaults to stdout).')
+@pass_session
+def policies_expiring(session, days, fmt, output):
+    """List policies expiring within --days, with client contact fields."""
+    from .helpers import expiring_policies_view
+
+    _write(session, expiring_policies_view(days), fmt, output)
+
+@policies.command('show')
+@click.argument('policy_id', type=int)
+@pass_session
+def policies_show(session, policy_id):
+    """Show one policy as JSON."""
+    from .helpers import get_policy
+
+    policy = get_policy(session, policy_id)
+    if policy is None:
+        raise click.ClickException(f"Policy {policy_id} not found")
+    click.echo(json.dumps(_record(policy)))
+
+@cli.group()
+def clients():
+    """Client commands."""
+
+@clients.command('list')
+@click.option('--since-id', default=0, show_default=True, help='Only clients with a greater id.')
+@click.option('--limit', type=int, help='Maximum number of clients.')
+@format_option
+@pass_session
+def clients_list(session, since_id, limit, fmt):
+    """List clients in id order."""
+    from .models import Client
+    from .helpers import clients_view
+
+    statement = clients_view().where(Client.id > since_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    _write(session, statement, fmt)
+
+@clients.command('show')
+@click.argument('client_id', type=int)
+@pass_session
+def clients_show(session, client_id):
+    """Show one client as JSON."""
+    from .helpers import get_client
+
+    client = get_client(session, client_id)
+    if client is None:
+        raise click.ClickException(f"Client {client_id} not found")
+    click.echo(json.dumps(_record(client)))
+
+@cli.group()
+def reminders():
+    """Reminder commands."""
+
+@reminders.command('generate')
+@click.option('--days', default=90, show_default=True, help='Look-ahead window in days.')
+@click.option('--workers', default=1, show_default=True, help='Worker processes; more than one enables sharding.')
+@click.option('--partition', type=click.Choice(['id', 'company']), default='id', show_default=True,
+              help='How the policies are split between workers.')
+@click.option('--shards', type=int, help='Number of id ranges (defaults to --workers).')
+@click.option('--incremental', is_flag=True,
+              help='Only evaluate policies changed or newly in the window since the last incremental run.')
+@click.option('--schedule', is_flag=True,
+              help='Create the due touchpoint of the reminder schedule (config file, or 90,60,30,7 days) instead.')
+@click.option('--offsets', help='Default schedule offsets in days, e.g. 90,60,30,7 (implies --schedule).')
+@pass_session
+def reminders_generate(session, days, workers, partition, shards, incremental, schedule, offsets):
+    """Generate reminders for policies expiring within --days."""
+    from .helpers import generate_reminders, generate_reminders_incremental, generate_scheduled_reminders
+    from .parallel import generate_reminders_sharded
+    from .schedules import load_schedule, parse_offsets
+
+    if incremental and workers > 1:
+        raise click.UsageError("--incremental cannot be combined with --workers")
+    if (schedule or offsets) and (incremental or workers > 1):
+        raise click.UsageError("--schedule cannot be combined with --incremental or --workers")
+    try:
+        if schedule or offsets:
+            reminder_schedule = load_schedule()
+            if offsets:
+                reminder_schedule['default'] = parse_offsets(offsets)
+            result = generate_scheduled_reminders(session, reminder_schedule)
+        elif incremental:
+            result = generate_reminders_incremental(session, days=days)
+        elif workers > 1:
+            result = generate_reminders_sharded(
+                session, days=days, workers=workers, shards=shards, partition=partition
+            )
+        else:
+            result = generate_reminders(session, days=days)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(result))
+
+@reminders.command('list')
+@format_option
+@pass_session
+def reminders_list(session, fmt):
+    """List pending reminders with policy and client contact fields."""
+    from .helpers import reminders_view
+
+    _write(session, reminders_view(), fmt)
+
+@reminders.command('purge')
+@click.option('--older-than-days', default=730, show_default=True, help='Purge reminders dated before this many days ago.')
+@click.option('--status', 'statuses', multiple=True, help='Status to purge (repeatable); defaults to the closed statuses.')
+@click.option('--dry-run', is_flag=True, help='Only count the reminders that would be purged.')
+@pass_session
+def reminders_purge(session, older_than_days, statuses, dry_run):
+    """Delete old reminders in a single statement."""
+    from .helpers import purge_reminders
+
+    try:
+        result = purge_reminders(session, older_than_days, statuses=statuses or None, dry_run=dry_run)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(result))
+
+@reminders.command('close')
+@click.option('--limit', type=int, help='Close at most this many reminders of each kind.')
+@pass_session
+def reminders_close(session, limit):
+    """Close the open reminders of renewed policies, then of ended ones."""
+    from .helpers import close_renewed_reminders, expire_reminders
+
+    try:
+        renewed = close_renewed_reminders(session, limit=limit)
+        expired = expire_reminders(session, limit=limit)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps({'renewed': renewed, 'expired': expired}))
+
+@reminders.command('archive')
+@click.option('--older-than-days', default=365, show_default=True, help='Archive closed reminders dated before this many days ago.')
+@click.option('--chunk-size', default=1000, show_default=True, help='Reminders moved per transaction.')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to wait between transactions.')
+@pass_session
+def reminders_archive(session, older_than_days, chunk_size, pause):
+    """Move old closed reminders to the archive table in chunks."""
+    from .helpers import archive_reminders
+
+    archived = chunks = 0
+    try:
+        while True:
+            count = archive_reminders(session, older_than_days, limit=chunk_size)
+            archived += count
+            chunks += 1
+            if count < chunk_size:
+                break
+            time.sleep(pause)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps({'archived': archived, 'chunks': chunks}))
+
+@reminders.command('dispatch')
+@click.option('--concurrency', default=100, show_default=True, help='Deliveries in flight at once.')
+@click.option('--batch-size', default=500, show_default=True, help='Reminders marked sent per UPDATE.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='Outbox file (defaults to stdout).')
+def reminders_dispatch(concurrency, batch_size, output):
+    """Write pending reminders to a JSON Lines outbox and mark them sent."""
+    import asyncio
+    import sys
+    from .async_helpers import JsonlSink, dispatch_reminders, dispose_async_engine
+
+    async def run(handle):
+        try:
+            return await dispatch_reminders(JsonlSink(handle), concurrency=concurrency, batch_size=batch_size)
+        finally:
+            await dispose_async_engine()
+
+    try:
+        if output is None:
+            result = asyncio.run(run(sys.stdout))
+        else:
+            with open(output, 'a', encoding='utf-8') as handle:
+                result = asyncio.run(run(handle))
+    except Exception as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(result), err=True)
+
+@cli.group()
+def calendar():
+    """Expiry calendar commands."""
+
+@calendar.command('show')
+@click.option('--months', default=12, show_default=True, help='Number of months from the current one.')
+@pass_session
+def calendar_show(session, months):
+    """List policy counts and premium totals per expiry month."""
+    from .helpers import get_expiry_calendar
+
+    start = datetime.now().date().replace(day=1)
+    end = start
+    for _ in range(months - 1):
+        end = (end + timedelta(days=32)).replace(day=1)
+    for bucket in get_expiry_calendar(session, start, end):
+        click.echo(json.dumps({
+            'month': bucket.month.isoformat(), 'policies': bucket.policies,
+            'premium_total': round(bucket.premium_total, 2),
+        }))
+
+@calendar.command('count')
+@click.option('--days', default=90, show_default=True, help='Look-ahead window in days.')
+@pass_session
+def calendar_count(session, days):
+    """Count the policies expiring within --days and sum their premiums."""
+    from .helpers import count_expiring
+
+    click.echo(json.dumps(count_expiring(session, days)))
+
+@calendar.command('check')
+@click.option('--repair', is_flag=True, help='Rebuild the calendar if it does not match the policies.')
+@pass_session
+def calendar_check(session, repair):
+    """Compare the expiry calendar with the policies table."""
+    from .helpers import check_expiry_calendar, rebuild_expiry_calendar
+
+    mismatches = check_expiry_calendar(session)
+    for mismatch in mismatches:
+        click.echo(json.dumps(mismatch, default=str))
+    if mismatches and repair:
+        click.echo(f"Rebuilt {rebuild_expiry_calendar(session)} monthly buckets", err=True)
+    elif mismatches:
+        raise click.ClickException(f"{len(mismatches)} months do not match; run with --repair to rebuild")
+
+@cli.group()
+def snapshot():
+    """Policy snapshot file commands."""
+
+@snapshot.command('build')
+@click.option('--path', type=click.Path(dir_okay=False), help='Snapshot file (defaults to one next to the database).')
+@pass_session
+def snapshot_build(session, path):
+    """Write the snapshot file from the current policies and reminders."""
+    from .snapshot import open_snapshot, write_snapshot
+
+    path = write_snapshot(session, path)
+    with open_snapshot(path) as built:
+        click.echo(json.dumps({
+            'path': path, 'database_id': built.database_id, 'versions': built.versions, 'policies': len(built.policies),
+            'reminders': len(built.reminders), 'bytes': built.policies.nbytes + built.reminders.nbytes,
+        }))
+
+@snapshot.command('info')
+@click.option('--path', type=click.Path(dir_okay=False), help='Snapshot file (defaults to one next to the database).')
+@pass_session
+def snapshot_info(session, path):
+    """Show the snapshot file's size and whether it matches the database."""
+    from .snapshot import open_snapshot, snapshot_path
+
+    path = path or snapshot_path(session)
+    try:
+        existing = open_snapshot(path)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(f"No usable snapshot at {path}: {e}")
+    with existing:
+        click.echo(json.dumps({
+            'path': path, 'created_at': existing.created_at, 'database_id': existing.database_id,
+            'versions': existing.versions, 'current': existing.is_current(session),
+            'policies': len(existing.policies), 'reminders': len(existing.reminders),
+        }))
+
+@snapshot.command('expiring')
+@click.option('--days', default=90, show_default=True, help='Look-ahead window in days.')
+@click.option('--path', type=click.Path(dir_okay=False), help='Snapshot file (defaults to one next to the database).')
+@pass_session
+def snapshot_expiring(session, days, path):
+    """List policies expiring within --days from the snapshot file, rebuilding it if stale."""
+    import sys
+    from .db.exporter import write_jsonl
+    from .snapshot import SnapshotPolicy, load_snapshot
+
+    with load_snapshot(session, path) as current:
+        policies = current.policies
+        write_jsonl(policies.rows(policies.expiring(days)), SnapshotPolicy._fields, sys.stdout)
+
+@cli.group()
+def scheduler():
+    """Background reminder scheduler commands."""
+
+@scheduler.command('run')
+@click.option('--generate-interval', type=float, help='Seconds between reminder generation runs.')
+@click.option('--sweep-interval', type=float, help='Seconds between sweeps closing renewed and expired reminders.')
+@click.option('--archive-interval', type=float, help='Seconds between archive runs.')
+@click.option('--archive-after-days', type=int, help='Age in days at which closed reminders are archived.')
+@click.option('--mode', type=click.Choice(['incremental', 'scheduled']), help='Reminder generation mode.')
+@click.option('--days', type=int, help='Look-ahead window of the incremental run, in days.')
+@click.option('--chunk-size', type=int, help='Rows or policy ids per transaction.')
+@click.option('--chunk-pause', type=float, help='Seconds to wait between transactions.')
+@click.option('--port', type=int, help='Port of the /health and /metrics endpoint (0 disables it).')
+@click.option('--once', is_flag=True, help='Run every job once and exit.')
+def scheduler_run(generate_interval, sweep_interval, archive_interval, archive_after_days, mode, days,
+                  chunk_size, chunk_pause, port, once):
+    """Generate, close and archive reminders on a schedule until interrupted.
+
+    Settings not given as options come from the [scheduler] section of the
+    config file and INSURANCE_TRACKER_SCHEDULER_* environment variables.
+    """
+    import logging
+    import signal
+    from .scheduler import build_scheduler, load_scheduler_config, serve_status
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    try:
+        config = load_scheduler_config(
+            generate_interval=generate_interval, sweep_interval=sweep_interval,
+            archive_interval=archive_interval, archive_after_days=archive_after_days, mode=mode, days=days,
+            chunk_size=chunk_size, chunk_pause=chunk_pause,
+            http_port=('' if port == 0 else port),
+        )
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    runner = build_scheduler(config)
+    server = None
+    if config['http_port'] and not once:
+        server = serve_status(runner, config['http_host'], int(config['http_port']))
+        click.echo(f"Serving /health and /metrics on http://{config['http_host']}:{config['http_port']}", err=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: runner.stop())
+    try:
+        runner.run(once=once)
+    except KeyboardInterrupt:
+        runner.stop()
+    finally:
+        if server is not None:
+            server.shutdown()
+    click.echo(json.dumps(runner.status(), default=str))
+
+@cli.command('search')
+@click.argument('query')
+@click.option('--limit', default=20, show_default=True, help='Maximum results per kind.')
+@click.option('--kind', type=click.Choice(['all', 'clients', 'policies']), default='all', show_default=True)
+@pass_session
+def search_command(session, query, limit, kind):
+    """Find clients and policies by name, email, phone, address, policy number or insurer."""
+    from .search import search_clients, search_policies
+
+    searches = (('clients', 'client', search_clients), ('policies', 'policy', search_policies))
+    for name, label, search in searches:
+        if kind in ('all', name):
+            for row in search(session, query, limit):
+                click.echo(json.dumps({'kind': label, **row._asdict()}, default=str))
+
+@cli.command('analytics')
+@click.option('--days', default=365, show_default=True, help='Window for premium at risk, in days.')
+@click.option('--top', default=10, show_default=True, help='Number of largest clients to report.')
+@pass_session
+def analytics_command(session, days, top):
+    """Report premium at risk, premium percentiles, client concentration and renewal rates."""
+    from .analytics import renewal_report
+
+    click.echo(json.dumps(renewal_report(session, days=days, top=top), default=str))
+
+@cli.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORT_KINDS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Records per transaction.')
+@click.option('--restart', is_flag=True, help='Ignore any saved checkpoint and start from the first record.')
+@pass_session
+def import_command(session, kind, path, batch_size, restart):
+    """Import clients or policies from a CSV or JSONL file."""
+    from .db.importer import import_file
+
+    try:
+        report = import_file(session, path, kind, batch_size=batch_size, resume=not restart)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(report))
+
+@cli.command('export')
+@click.argument('dataset', type=click.Choice(sorted(EXPORT_DATASETS)))
+@format_option
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='Output file (defaults to stdout).')
+@click.option('--days', default=90, show_default=True, help='Look-ahead window for the expiring dataset.')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Rows fetched per round trip.')
+@pass_session
+def export_command(session, dataset, fmt, output, days, chunk_size):
+    """Export policies, clients or reminders."""
+    from .db.exporter import export_dataset
+
+    try:
+        count = export_dataset(session, dataset, fmt, output=output, days=days, chunk_size=chunk_size)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    if output is not None:
+        click.echo(f"Exported {count} rows to {output}", err=True)
 
 if __name__ == '__main__':
-    main_menu()
\ No newline at end of file
+    cli()
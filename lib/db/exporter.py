@@ -0,0 +1,127 @@
+from ..helpers import clients_view, expiring_policies_view, policies_view, reminders_view
+from .options import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS
+from datetime import date, datetime
+import csv
+import json
+import sys
+
+EXPORT_QUERIES = {
+    'expiring': expiring_policies_view,
+    'reminders': reminders_view,
+    'policies': policies_view,
+    'clients': clients_view,
+}
+
+def stream_rows(session, statement, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Execute a column select and yield row tuples straight from the cursor.
+
+    Rows are fetched chunk_size at a time and never become ORM objects, so
+    memory use stays constant regardless of the result size.
+    """
+    result = session.execute(statement.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield from partition
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+def write_csv(rows, columns, handle):
+    """
+    Write rows to an open text handle as CSV with a header row.
+    """
+    writer = csv.writer(handle)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(rows, columns, handle):
+    """
+    Write rows to an open text handle as one JSON object per line.
+    """
+    count = 0
+    for row in rows:
+        handle.write(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n")
+        count += 1
+    return count
+
+def _arrow_schema(statement):
+    import pyarrow as pa
+
+    arrow_types = {int: pa.int64(), float: pa.float64(), date: pa.date32(), str: pa.string()}
+    return pa.schema([
+        (column.name, arrow_types.get(column.type.python_type, pa.string()))
+        for column in statement.selected_columns
+    ])
+
+def write_parquet(rows, statement, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write rows to a Parquet file one row group per chunk.
+
+    Requires the optional pyarrow package.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pipenv install pyarrow)")
+
+    schema = _arrow_schema(statement)
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_table(pa.Table.from_arrays(list(zip(*chunk)), schema=schema))
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            writer.write_table(pa.Table.from_arrays(list(zip(*chunk)), schema=schema))
+            count += len(chunk)
+    return count
+
+def export_dataset(session, dataset, fmt, output=None, days=90, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream one dataset to CSV, JSONL or Parquet.
+
+    :param session: SQLAlchemy database session
+    :param dataset: One of 'expiring', 'reminders', 'policies' or 'clients'
+    :param fmt: 'csv', 'jsonl' or 'parquet'
+    :param output: Output file path; CSV and JSONL default to standard output
+    :param days: Look-ahead window for the 'expiring' dataset
+    :param chunk_size: Rows fetched and written per chunk
+    :return: Number of rows written
+    """
+    if dataset not in EXPORT_QUERIES:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    statement = EXPORT_QUERIES[dataset](days) if dataset == 'expiring' else EXPORT_QUERIES[dataset]()
+    return write_statement(session, statement, fmt, output, chunk_size)
+
+def write_statement(session, statement, fmt, output=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream the rows of a column select to CSV, JSONL or Parquet.
+
+    :return: Number of rows written
+    """
+    columns = [column.name for column in statement.selected_columns]
+    rows = stream_rows(session, statement, chunk_size)
+
+    if fmt == 'parquet':
+        if output is None:
+            raise ValueError("Parquet export needs an output file")
+        return write_parquet(rows, statement, output, chunk_size)
+
+    writer = write_csv if fmt == 'csv' else write_jsonl
+    if output is None:
+        return writer(rows, columns, sys.stdout)
+    with open(output, 'w', newline='', encoding='utf-8') as handle:
+        return writer(rows, columns, handle)
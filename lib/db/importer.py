@@ -0,0 +1,269 @@
+from ..models import Client, Policy, ImportCheckpoint
+from ..helpers import bump_data_version, record_policy_changes, refresh_expiry_buckets
+from .. import cache
+from .options import DEFAULT_BATCH_SIZE
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import date, datetime
+import csv
+import json
+import os
+import time
+
+# SQLite limits the number of bound parameters in one statement
+IN_CHUNK_SIZE = 500
+
+SUPPORTED_SUFFIXES = ('.csv', '.jsonl', '.ndjson')
+
+def read_records(path):
+    """
+    Stream records from a CSV (with a header row) or JSONL file.
+
+    :param path: Path to a .csv or .jsonl file
+    :return: Generator of dictionaries, one per record
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as handle:
+            for row in csv.DictReader(handle):
+                yield row
+    elif path.endswith(SUPPORTED_SUFFIXES):
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported file type: {path} (expected .csv or .jsonl)")
+
+def _required(record, field):
+    value = record.get(field)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"missing {field}")
+    return str(value).strip()
+
+def _optional(record, field):
+    value = record.get(field)
+    if value is None or str(value).strip() == '':
+        return None
+    return str(value).strip()
+
+def _parse_date(record, field):
+    value = _required(record, field)
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"invalid {field} '{value}' (expected YYYY-MM-DD)")
+
+def convert_client(record):
+    """
+    Validate a raw client record and convert it to column values.
+    """
+    return {
+        'name': _required(record, 'name'),
+        'email': _required(record, 'email'),
+        'phone': _optional(record, 'phone'),
+        'address': _optional(record, 'address'),
+    }
+
+def convert_policy(record):
+    """
+    Validate a raw policy record and convert it to column values.
+
+    The client is referenced by 'client_id' or, failing that, 'client_email';
+    the reference is resolved later for the whole batch.
+    """
+    start_date = _parse_date(record, 'start_date')
+    end_date = _parse_date(record, 'end_date')
+    if end_date < start_date:
+        raise ValueError("end_date is before start_date")
+
+    premium = _required(record, 'premium_amount')
+    try:
+        premium_amount = float(premium.replace(',', ''))
+    except ValueError:
+        raise ValueError(f"invalid premium_amount '{premium}'")
+    if premium_amount < 0:
+        raise ValueError("premium_amount is negative")
+
+    client_id = _optional(record, 'client_id')
+    client_email = _optional(record, 'client_email')
+    if client_id is None and client_email is None:
+        raise ValueError("missing client_id or client_email")
+    if client_id is not None:
+        try:
+            client_id = int(client_id)
+        except ValueError:
+            raise ValueError(f"invalid client_id '{client_id}'")
+
+    return {
+        'policy_number': _required(record, 'policy_number'),
+        'type': _optional(record, 'type') or _required(record, 'policy_type'),
+        'start_date': start_date,
+        'end_date': end_date,
+        'premium_amount': premium_amount,
+        'insurance_company': _optional(record, 'insurance_company'),
+        'client_id': client_id,
+        'client_email': client_email,
+    }
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _existing_client_ids(session, client_ids):
+    found = set()
+    for chunk in _chunks(client_ids):
+        found.update(session.scalars(select(Client.id).where(Client.id.in_(chunk))))
+    return found
+
+def _client_ids_by_email(session, emails):
+    # Emails are not unique; the earliest client with the address wins
+    resolved = {}
+    for chunk in _chunks(emails):
+        rows = session.execute(
+            select(Client.email, Client.id).where(Client.email.in_(chunk)).order_by(Client.id)
+        )
+        for email, client_id in rows:
+            resolved.setdefault(email, client_id)
+    return resolved
+
+def _existing_policy_numbers(session, policy_numbers):
+    found = set()
+    for chunk in _chunks(policy_numbers):
+        found.update(session.scalars(select(Policy.policy_number).where(Policy.policy_number.in_(chunk))))
+    return found
+
+def _prepare_clients(session, batch, reject):
+    rows = []
+    for record_no, record in batch:
+        try:
+            rows.append(convert_client(record))
+        except ValueError as e:
+            reject(record_no, record, str(e))
+    return rows
+
+def _prepare_policies(session, batch, reject):
+    converted = []
+    for record_no, record in batch:
+        try:
+            converted.append((record_no, record, convert_policy(record)))
+        except ValueError as e:
+            reject(record_no, record, str(e))
+
+    # Resolve client references and duplicates for the whole batch at once
+    known_ids = _existing_client_ids(
+        session, {row['client_id'] for _, _, row in converted if row['client_id'] is not None}
+    )
+    ids_by_email = _client_ids_by_email(
+        session, {row['client_email'] for _, _, row in converted if row['client_id'] is None}
+    )
+    taken_numbers = _existing_policy_numbers(session, {row['policy_number'] for _, _, row in converted})
+
+    rows = []
+    for record_no, record, row in converted:
+        client_email = row.pop('client_email')
+        if row['client_id'] is None:
+            row['client_id'] = ids_by_email.get(client_email)
+            if row['client_id'] is None:
+                reject(record_no, record, f"unknown client_email '{client_email}'")
+                continue
+        elif row['client_id'] not in known_ids:
+            reject(record_no, record, f"unknown client_id {row['client_id']}")
+            continue
+        if row['policy_number'] in taken_numbers:
+            reject(record_no, record, f"duplicate policy_number '{row['policy_number']}'")
+            continue
+        taken_numbers.add(row['policy_number'])
+        rows.append(row)
+    return rows
+
+IMPORT_PREPARERS = {
+    'clients': (Client, _prepare_clients),
+    'policies': (Policy, _prepare_policies),
+}
+
+def _save_checkpoint(session, checkpoint, source, kind, records_done):
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(source=source, kind=kind)
+        session.add(checkpoint)
+    checkpoint.records_done = records_done
+    checkpoint.updated_at = datetime.now()
+    return checkpoint
+
+def import_file(session, path, kind, batch_size=DEFAULT_BATCH_SIZE, resume=True, rejects_path=None):
+    """
+    Bulk import clients or policies from a CSV or JSONL file.
+
+    Records are validated in batches and written with one bulk INSERT per
+    batch. The batch and the import checkpoint are committed in the same
+    transaction, so an interrupted import can be resumed from the last
+    committed batch without duplicating rows.
+
+    :param session: SQLAlchemy database session
+    :param path: Path to the .csv or .jsonl file
+    :param kind: 'clients' or 'policies'
+    :param batch_size: Number of records per transaction
+    :param resume: Continue from the saved checkpoint for this file, if any
+    :param rejects_path: Where rejected records are written (defaults to <path>.rejects.jsonl)
+    :return: Dictionary with inserted, rejected and skipped counts, elapsed seconds and rows per second
+    """
+    if kind not in IMPORT_PREPARERS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    if not path.endswith(SUPPORTED_SUFFIXES):
+        raise ValueError(f"Unsupported file type: {path} (expected .csv or .jsonl)")
+    model, prepare = IMPORT_PREPARERS[kind]
+    source = os.path.abspath(path)
+    rejects_path = rejects_path or f"{path}.rejects.jsonl"
+
+    checkpoint = session.scalars(
+        select(ImportCheckpoint).filter_by(source=source, kind=kind)
+    ).first()
+    skip = checkpoint.records_done if (checkpoint and resume) else 0
+
+    report = {'inserted': 0, 'rejected': 0, 'skipped': skip}
+    started = time.perf_counter()
+
+    with open(rejects_path, 'a' if skip else 'w', encoding='utf-8') as rejects:
+        def reject(record_no, record, reason):
+            report['rejected'] += 1
+            rejects.write(json.dumps({'record': record_no, 'reason': reason, 'data': record}, default=str) + "\n")
+
+        def flush(batch, records_done):
+            nonlocal checkpoint
+            try:
+                rows = prepare(session, batch, reject)
+                if rows and model is Policy:
+                    # New policies feed the incremental reminder run
+                    new_ids = session.scalars(insert(Policy).returning(Policy.id), rows).all()
+                    record_policy_changes(session, new_ids)
+                    refresh_expiry_buckets(session, [row['end_date'] for row in rows])
+                    bump_data_version(session, 'policies')
+                elif rows:
+                    session.execute(insert(model), rows)
+                checkpoint = _save_checkpoint(session, checkpoint, source, kind, records_done)
+                session.commit()
+                if rows and model is Policy:
+                    # Cached client policy lists are now incomplete
+                    cache.invalidate(*{cache.client_policies_key(session, row['client_id']) for row in rows})
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise RuntimeError(f"Database error at record {batch[0][0]}: {str(e)}")
+            report['inserted'] += len(rows)
+
+        batch = []
+        record_no = 0
+        for record_no, record in enumerate(read_records(path), 1):
+            if record_no <= skip:
+                continue
+            batch.append((record_no, record))
+            if len(batch) >= batch_size:
+                flush(batch, record_no)
+                batch = []
+        if batch:
+            flush(batch, record_no)
+
+    report['elapsed'] = time.perf_counter() - started
+    processed = report['inserted'] + report['rejected']
+    report['rows_per_second'] = processed / report['elapsed'] if report['elapsed'] else 0.0
+    report['rejects_path'] = rejects_path
+    return report
@@ -0,0 +1,14 @@
+# Lightweight constants shared by the importer, the exporter and the CLI.
+# Kept free of SQLAlchemy imports so the CLI can build its options cheaply.
+
+# Number of records validated and written per import transaction
+DEFAULT_BATCH_SIZE = 5000
+
+# Rows fetched from the database cursor per round trip when exporting
+DEFAULT_CHUNK_SIZE = 5000
+
+IMPORT_KINDS = ('clients', 'policies')
+
+EXPORT_DATASETS = ('clients', 'expiring', 'policies', 'reminders')
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
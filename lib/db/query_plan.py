@@ -0,0 +1,72 @@
+from ..models import Session, Policy, Reminder
+from ..helpers import _pending_reminders_select
+from sqlalchemy import select, text
+from datetime import datetime, timedelta
+
+# Hot-path queries and the index each one is expected to use
+EXPECTED_INDEXES = {
+    'get_expiring_policies': 'ix_policies_end_date',
+    'generate_reminders': 'ix_reminders_policy_id_status',
+    'list_reminders': 'ix_reminders_status',
+    'get_client_policies': 'ix_policies_client_id',
+}
+
+def hot_path_queries():
+    """
+    Build the statements issued by the lookup helpers.
+
+    :return: Dictionary of helper name to SQLAlchemy select statement
+    """
+    today = datetime.now().date()
+    horizon = today + timedelta(days=90)
+    return {
+        'get_expiring_policies': select(Policy).where(Policy.end_date <= horizon),
+        'generate_reminders': _pending_reminders_select(horizon, today),
+        'list_reminders': select(Reminder).where(Reminder.status == Reminder.PENDING),
+        'get_client_policies': select(Policy).where(Policy.client_id == 1),
+    }
+
+def explain(session, statement):
+    """
+    Return the SQLite query plan for a statement as a list of detail strings.
+    """
+    compiled = statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    rows = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+def check_indexes(session):
+    """
+    Check that each hot-path query is planned with its expected index.
+
+    :param session: SQLAlchemy database session bound to a SQLite database
+    :return: Dictionary of helper name to (uses expected index, plan details)
+    """
+    results = {}
+    for name, statement in hot_path_queries().items():
+        plan = explain(session, statement)
+        uses_index = any(EXPECTED_INDEXES[name] in detail for detail in plan)
+        results[name] = (uses_index, plan)
+    return results
+
+def report():
+    """
+    Print the query plan check and return True when every query uses its index.
+    """
+    session = Session()
+    try:
+        results = check_indexes(session)
+    finally:
+        session.close()
+
+    for name, (uses_index, plan) in results.items():
+        status = "OK" if uses_index else "MISSING INDEX"
+        print(f"{name}: {status} (expected {EXPECTED_INDEXES[name]})")
+        for detail in plan:
+            print(f"    {detail}")
+    return all(uses_index for uses_index, _ in results.values())
+
+if __name__ == '__main__':
+    raise SystemExit(0 if report() else 1)
@@ -1,11 +1,20 @@
-from ..models import Session, Client, Policy, Reminder
-from ..helpers import generate_reminders
-from faker import Faker
+from ..models import Session
+from ..helpers import add_client, add_policy, batch, generate_reminders
 from datetime import datetime, timedelta
 import random
 
-# Initialize Faker with default locale
-fake = Faker()
+# Faker is slow to import, so it is only created when sample data is generated
+_fake = None
+
+def get_faker():
+    """
+    Return the shared Faker instance (default locale), creating it on first use.
+    """
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        _fake = Faker()
+    return _fake
 
 # Kenyan-specific data
 kenyan_cities = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Thika', 'Malindi', 'Kitale', 'Garissa', 'Kakamega']
@@ -31,29 +40,39 @@ insurance_companies = [
     'Madison Insurance'
 ]
 
-def generate_kenyan_phone():
-    return f"{random.choice(kenyan_phone_prefixes)}{fake.numerify('#######')}"
+# The generators take an optional random.Random and pre-generated pools of
+# first names and street addresses, so bulk generators can produce
+# deterministic rows without a Faker call per row.
 
-def generate_kenyan_name():
-    return f"{fake.first_name()} {random.choice(kenyan_names)}"
+def generate_kenyan_phone(rng=random):
+    return f"{rng.choice(kenyan_phone_prefixes)}{rng.randrange(10_000_000):07d}"
 
-def generate_kenyan_address():
-    return f"{fake.street_address()}, {random.choice(kenyan_cities)}, Kenya"
+def generate_kenyan_name(rng=random, first_names=None):
+    first_name = rng.choice(first_names) if first_names else get_faker().first_name()
+    return f"{first_name} {rng.choice(kenyan_names)}"
+
+def generate_kenyan_address(rng=random, street_addresses=None):
+    street = rng.choice(street_addresses) if street_addresses else get_faker().street_address()
+    return f"{street}, {rng.choice(kenyan_cities)}, Kenya"
 
 def seed_data():
     """
     Seed the database with sample data for testing purposes.
     This function creates sample clients, policies, and generates reminders
     in a Kenyan insurance context.
+
+    The rows are written through the helpers in one batch, so the expiry
+    calendar, change log and data versions stay in step with them.
     """
     session = Session()
 
     try:
-        # Create sample clients
-        clients = create_sample_clients(session)
+        with batch(session):
+            # Create sample clients
+            clients = create_sample_clients(session)
 
-        # Create sample policies for each client
-        create_sample_policies(session, clients)
+            # Create sample policies for each client
+            create_sample_policies(session, clients)
 
         # Generate reminders for policies
         generate_reminders(session)
@@ -73,18 +92,19 @@ def create_sample_clients(session, num_clients=10):
     :param num_clients: Number of sample clients to create
     :return: List of created Client objects
     """
+    fake = get_faker()
     clients = []
-    for _ in range(num_clients):
-        client = Client(
-            name=generate_kenyan_name(),
-            email=fake.email(),
-            phone=generate_kenyan_phone(),
-            address=generate_kenyan_address()
-        )
-        session.add(client)
-        clients.append(client)
-    
-    session.commit()
+    with batch(session):
+        for _ in range(num_clients):
+            client = add_client(
+                session,
+                name=generate_kenyan_name(),
+                email=fake.email(),
+                phone=generate_kenyan_phone(),
+                address=generate_kenyan_address()
+            )
+            clients.append(client)
+
     return clients
 
 def create_sample_policies(session, clients):
@@ -94,26 +114,26 @@ def create_sample_policies(session, clients):
     :param session: SQLAlchemy database session
     :param clients: List of Client objects to associate policies with
     """
-    for client in clients:
-        # Create 1 to 3 policies for each client
-        for _ in range(random.randint(1, 3)):
-            # Generate realistic policy details
-            policy_type = random.choice(policy_types)
-            start_date = fake.date_between(start_date='-2y', end_date='today')
-            end_date = start_date + timedelta(days=365)  # Policies typically last one year
-            
-            policy = Policy(
-                client_id=client.id,
-                policy_number=f"KE-{fake.unique.random_number(digits=8)}",
-                type=policy_type,
-                start_date=start_date,
-                end_date=end_date,
-                premium_amount=round(random.uniform(5000, 100000), 2),  # Premium in Kenyan Shillings
-                insurance_company=random.choice(insurance_companies)
-            )
-            session.add(policy)
-    
-    session.commit()
+    fake = get_faker()
+    with batch(session):
+        for client in clients:
+            # Create 1 to 3 policies for each client
+            for _ in range(random.randint(1, 3)):
+                # Generate realistic policy details
+                policy_type = random.choice(policy_types)
+                start_date = fake.date_between(start_date='-2y', end_date='today')
+                end_date = start_date + timedelta(days=365)  # Policies typically last one year
+
+                add_policy(
+                    session,
+                    client_id=client.id,
+                    policy_number=f"KE-{fake.unique.random_number(digits=8)}",
+                    policy_type=policy_type,
+                    start_date=start_date,
+                    end_date=end_date,
+                    premium_amount=round(random.uniform(5000, 100000), 2),  # Premium in Kenyan Shillings
+                    insurance_company=random.choice(insurance_companies)
+                )
 
 if __name__ == '__main__':
     seed_data()
\ No newline at end of file
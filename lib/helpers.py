@@ -1,6 +1,488 @@
-from .models import Client, Policy, Reminder
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timedelta
+from .models import (
+    Client, Policy, Reminder, PolicyChange, ReminderWatermark, ExpiryBucket, DataVersion, ReminderArchive
+)
+from sqlalchemy import Date, DateTime, Integer, delete, extract, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, make_transient_to_detached, selectinload
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from datetime import date, datetime, timedelta
+from .schedules import make_schedule
+from . import cache
+from contextlib import contextmanager
+import secrets
+import time
+
+# Default number of rows fetched per round trip by the iter_* generators
+DEFAULT_PAGE_SIZE = 1000
+
+# Ids per IN list in the bulk operations (keeps under SQLite's variable limit)
+DEFAULT_BULK_CHUNK_SIZE = 500
+
+# Closed reminders older than this many days move to reminders_archive
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+
+# Reminders moved to the archive per transaction
+DEFAULT_ARCHIVE_CHUNK_SIZE = 1000
+
+# Helper calls between flushes inside a write batch
+DEFAULT_FLUSH_EVERY = 5000
+
+# A policy counts as renewed when the client has a policy of the same type
+# starting within this many days of its end date (see is_renewed)
+DEFAULT_RENEWAL_GRACE_DAYS = 30
+
+# session.info key of the enclosing write batch
+BATCH_KEY = 'write_batch'
+
+def _iter_by_id(session, query, model, page_size, since_id):
+    """
+    Yield rows of a query page by page using keyset pagination on the primary key.
+
+    Objects loaded for a page are expunged from the session once the next page
+    is requested, so the identity map stays flat however large the table is.
+    Objects that were already in the session are left attached.
+    """
+    last_id = since_id
+    while True:
+        known = set(session.identity_map.keys())
+        page = (
+            query.filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(page_size)
+            .all()
+        )
+        if not page:
+            return
+        for obj in page:
+            yield obj
+        last_id = page[-1].id
+        for obj in page:
+            if session.identity_key(instance=obj) not in known:
+                session.expunge(obj)
+
+def _iter_rows_by_key(session, statement, key_column, page_size, since_id):
+    """
+    Yield the rows of a column select page by page using keyset pagination on key_column.
+    """
+    last_id = since_id
+    while True:
+        page = session.execute(
+            statement.where(key_column > last_id).order_by(None).order_by(key_column).limit(page_size)
+        ).all()
+        if not page:
+            return
+        yield from page
+        last_id = page[-1][0]
+
+def _cache_record(obj):
+    """
+    Return the column values of a model instance, as kept in the lookup cache.
+    """
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+def _from_cache_record(session, model, record):
+    """
+    Attach a cached row to the session as a persistent object, without a query.
+    """
+    existing = session.identity_map.get(session.identity_key(model, record['id']))
+    if existing is not None:
+        return existing
+    values = {}
+    for column in model.__table__.columns:
+        value = record.get(column.key)
+        # Disk-backed caches return dates as ISO strings
+        if isinstance(value, str) and column.type.python_type is date:
+            value = date.fromisoformat(value)
+        values[column.key] = value
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return session.merge(obj, load=False)
+
+def _cached_get(session, model, key, object_id):
+    obj = session.identity_map.get(session.identity_key(model, object_id))
+    if obj is not None:
+        return obj
+    if current_batch(session) is not None:
+        # The batch's uncommitted rows must not reach the shared cache, nor be hidden by it
+        return session.get(model, object_id)
+    record = cache.lookup(key)
+    if record is not None:
+        return _from_cache_record(session, model, record)
+    obj = session.get(model, object_id)
+    if obj is not None:
+        cache.store(key, _cache_record(obj))
+    return obj
+
+class _days_after(FunctionElement):
+    # A date column shifted by a number of days, in the dialect's own date arithmetic
+    type = Date()
+    inherit_cache = True
+
+@compiles(_days_after)
+def _compile_days_after(element, compiler, **kw):
+    day, days = element.clauses
+    return f"({compiler.process(day, **kw)} + {compiler.process(days, **kw)})"
+
+@compiles(_days_after, 'sqlite')
+def _compile_days_after_sqlite(element, compiler, **kw):
+    day, days = element.clauses
+    return f"date({compiler.process(day, **kw)}, {compiler.process(days, **kw)} || ' days')"
+
+# Change Tracking Functions
+
+def record_policy_changes(session, policy_ids):
+    """
+    Log policies as changed so the next incremental reminder run re-evaluates them.
+
+    The log rows join the caller's transaction; the caller commits.
+    """
+    now = datetime.now()
+    rows = [{'policy_id': policy_id, 'changed_at': now} for policy_id in policy_ids]
+    if rows:
+        session.execute(insert(PolicyChange), rows)
+
+# Data Version Functions
+# One counter per table that snapshot files (lib/snapshot.py) are built from.
+# Every helper that changes policies or reminders bumps the counter in the
+# same transaction, so a snapshot recording older counters is known stale.
+# A random database id kept alongside tells a recreated or restored database
+# with the same counters apart.
+
+def bump_data_version(session, *names):
+    """
+    Increment the data-version counters of the given tables ('policies', 'reminders').
+
+    The update joins the caller's transaction; the caller commits.
+    """
+    now = datetime.now()
+    for name in names:
+        result = session.execute(
+            update(DataVersion).where(DataVersion.name == name)
+            .values(version=DataVersion.version + 1, changed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            session.execute(insert(DataVersion).values(name=name, version=1, changed_at=now))
+
+def get_data_versions(session):
+    """
+    Return the current data-version counters as a dictionary of table name to version.
+    """
+    return dict(session.execute(
+        select(DataVersion.name, DataVersion.version).where(DataVersion.name != DataVersion.DATABASE_ID)
+    ).all())
+
+def get_database_id(session):
+    """
+    Return the random id of the database, creating it on first use.
+
+    The migration that adds data_versions writes the id; databases migrated
+    without one get it here.
+    """
+    statement = select(DataVersion.version).where(DataVersion.name == DataVersion.DATABASE_ID)
+    database_id = session.scalar(statement)
+    if database_id is not None:
+        return database_id
+    try:
+        with session.begin_nested():
+            session.execute(insert(DataVersion).values(
+                name=DataVersion.DATABASE_ID, version=secrets.randbelow(2 ** 31 - 1) + 1
+            ))
+        _finish_write(session)
+    except IntegrityError:
+        # Another process created it first; the savepoint has been rolled back
+        pass
+    return session.scalar(statement)
+
+# Expiry Calendar Functions
+# The expiry_calendar table keeps, per month of end_date, the number of
+# policies and their premium total. Every helper that adds, changes or
+# deletes policies refreshes the affected months in the same transaction, so
+# dashboards read a handful of bucket rows instead of scanning policies.
+
+def _month_start(day):
+    return day.replace(day=1)
+
+def _next_month(month):
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def _policy_totals(session, start=None, end=None):
+    """
+    Count and sum the premiums of policies with start <= end_date < end, from the policies table.
+    """
+    statement = select(func.count(Policy.id), func.coalesce(func.sum(Policy.premium_amount), 0.0))
+    if start is not None:
+        statement = statement.where(Policy.end_date >= start)
+    if end is not None:
+        statement = statement.where(Policy.end_date < end)
+    return session.execute(statement).one()
+
+def refresh_expiry_buckets(session, end_dates):
+    """
+    Recompute the calendar buckets of the months the given end dates fall in.
+
+    The bucket rows join the caller's transaction; the caller commits.
+    """
+    for month in {_month_start(end_date) for end_date in end_dates if end_date is not None}:
+        count, total = _policy_totals(session, month, _next_month(month))
+        session.execute(delete(ExpiryBucket).where(ExpiryBucket.month == month))
+        if count:
+            session.execute(insert(ExpiryBucket).values(month=month, policies=count, premium_total=total))
+
+def _calendar_from_policies(session):
+    year = extract('year', Policy.end_date)
+    month = extract('month', Policy.end_date)
+    rows = session.execute(
+        select(year, month, func.count(Policy.id), func.sum(Policy.premium_amount)).group_by(year, month)
+    )
+    return {date(int(y), int(m), 1): (count, total or 0.0) for y, m, count, total in rows}
+
+def _rebuild_expiry_calendar(session):
+    session.execute(delete(ExpiryBucket))
+    buckets = [
+        {'month': month, 'policies': count, 'premium_total': total}
+        for month, (count, total) in sorted(_calendar_from_policies(session).items())
+    ]
+    if buckets:
+        session.execute(insert(ExpiryBucket), buckets)
+    return len(buckets)
+
+def rebuild_expiry_calendar(session):
+    """
+    Rebuild the whole expiry calendar from the policies table with one GROUP BY.
+
+    :return: Number of monthly buckets written
+    """
+    try:
+        count = _rebuild_expiry_calendar(session)
+        _finish_write(session)
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return count
+
+def check_expiry_calendar(session):
+    """
+    Compare the expiry calendar with the policies table.
+
+    :return: List of mismatching months with the expected and stored policy counts and premium totals
+    """
+    expected = _calendar_from_policies(session)
+    stored = {
+        bucket.month: (bucket.policies, bucket.premium_total)
+        for bucket in session.execute(select(ExpiryBucket.month, ExpiryBucket.policies, ExpiryBucket.premium_total))
+    }
+    mismatches = []
+    for month in sorted(set(expected) | set(stored)):
+        want = expected.get(month, (0, 0.0))
+        have = stored.get(month, (0, 0.0))
+        if want[0] != have[0] or abs(want[1] - have[1]) > 0.01:
+            mismatches.append({
+                'month': month,
+                'expected': {'policies': want[0], 'premium_total': round(want[1], 2)},
+                'stored': {'policies': have[0], 'premium_total': round(have[1], 2)},
+            })
+    return mismatches
+
+def get_expiry_calendar(session, start=None, end=None):
+    """
+    Retrieve the monthly expiry buckets, optionally only the months from start to end.
+    """
+    statement = select(ExpiryBucket).order_by(ExpiryBucket.month)
+    if start is not None:
+        statement = statement.where(ExpiryBucket.month >= _month_start(start))
+    if end is not None:
+        statement = statement.where(ExpiryBucket.month <= end)
+    return session.scalars(statement).all()
+
+def expiring_totals(session, start, end):
+    """
+    Count the policies expiring from start to end (inclusive) and sum their premiums.
+
+    Whole months inside the range are read from the calendar buckets; only the
+    partial months at either edge are counted on the policies table, through
+    the end_date index.
+
+    :return: Dictionary with the number of policies and the premium total
+    """
+    end_exclusive = end + timedelta(days=1)
+    first_full = start if start.day == 1 else _next_month(start)
+    after_full = _month_start(end_exclusive)
+    if first_full >= after_full:
+        count, total = _policy_totals(session, start, end_exclusive)
+    else:
+        count, total = session.execute(
+            select(func.coalesce(func.sum(ExpiryBucket.policies), 0),
+                   func.coalesce(func.sum(ExpiryBucket.premium_total), 0.0))
+            .where(ExpiryBucket.month >= first_full, ExpiryBucket.month < after_full)
+        ).one()
+        for edge_start, edge_end in ((start, first_full), (after_full, end_exclusive)):
+            if edge_start < edge_end:
+                edge_count, edge_total = _policy_totals(session, edge_start, edge_end)
+                count += edge_count
+                total += edge_total
+    return {'policies': count, 'premium_total': round(total, 2)}
+
+def count_expiring(session, days=90, today=None):
+    """
+    Count the policies expiring between today and the end of the look-ahead window.
+    """
+    today = today or datetime.now().date()
+    return expiring_totals(session, today, today + timedelta(days=days))
+
+# Batched Writes
+# Outside a batch every write helper commits its own transaction. Inside
+# 'with batch(session):' the helpers only stage their changes: new and
+# changed objects are flushed together every flush_every calls (the unit of
+# work turns them into multi-row INSERTs and executemany UPDATEs), the change
+# log, calendar buckets and data versions are written once per flush, and
+# the whole batch commits once at the end or rolls back on error.
+
+class WriteBatch:
+    """
+    Changes staged by the helpers inside a batch() block.
+    """
+
+    def __init__(self, session, flush_every=DEFAULT_FLUSH_EVERY):
+        self.session = session
+        self.flush_every = flush_every
+        self.operations = 0
+        self.flushes = 0
+        self._policies = []
+        self._end_dates = set()
+        self._versions = set()
+        self._cache_keys = set()
+        self._invalidate_all = False
+
+    def stage(self, policies=(), end_dates=(), versions=(), cache_keys=(), invalidate_all=False):
+        """
+        Record the follow-up work of one helper call, flushing once flush_every calls are staged.
+        """
+        self._policies.extend(policies)
+        self._end_dates.update(end_dates)
+        self._versions.update(versions)
+        self._cache_keys.update(cache_keys)
+        self._invalidate_all = self._invalidate_all or invalidate_all
+        self.operations += 1
+        if self.operations % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the staged objects and their change log, calendar buckets and data versions, without committing.
+
+        New objects get their ids here.
+        """
+        self.session.flush()
+        record_policy_changes(self.session, [
+            policy if isinstance(policy, int) else policy.id for policy in self._policies
+        ])
+        refresh_expiry_buckets(self.session, self._end_dates)
+        bump_data_version(self.session, *sorted(self._versions))
+        self._policies, self._end_dates, self._versions = [], set(), set()
+        self.flushes += 1
+
+    def discard(self):
+        """
+        Forget the staged follow-up work after the batch's transaction was rolled back.
+
+        Lookups inside a batch bypass the cache, so nothing cached needs dropping either.
+        """
+        self._policies, self._end_dates, self._versions = [], set(), set()
+        self._cache_keys, self._invalidate_all = set(), False
+
+    def invalidate_cache(self):
+        """
+        Drop the cached lookups of the rows the batch touched.
+        """
+        if self._invalidate_all:
+            cache.invalidate_all()
+        elif self._cache_keys:
+            cache.invalidate(*self._cache_keys)
+        self._cache_keys, self._invalidate_all = set(), False
+
+def current_batch(session):
+    """
+    Return the write batch the session is in, or None.
+    """
+    return session.info.get(BATCH_KEY)
+
+@contextmanager
+def batch(session, flush_every=DEFAULT_FLUSH_EVERY):
+    """
+    Group helper calls into one transaction.
+
+    Inside the block the write helpers stage their changes instead of
+    committing; they are flushed every flush_every calls and committed once
+    when the block ends. An exception rolls the whole batch back and is
+    re-raised unchanged; helpers that fail inside the block raise the
+    original database error and leave the rollback to the batch. New
+    policies get their ids when the batch flushes (call flush() on the
+    yielded batch to force it); new clients are flushed at once, so their
+    ids can be used for the client's policies. Nested blocks join the
+    outer batch.
+
+    :return: Context manager yielding the WriteBatch
+    """
+    existing = current_batch(session)
+    if existing is not None:
+        yield existing
+        return
+    write_batch = WriteBatch(session, flush_every)
+    session.info[BATCH_KEY] = write_batch
+    try:
+        yield write_batch
+    except BaseException:
+        session.rollback()
+        write_batch.discard()
+        raise
+    else:
+        try:
+            write_batch.flush()
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            write_batch.discard()
+            raise Exception(f"Database error: {str(e)}")
+    finally:
+        del session.info[BATCH_KEY]
+        write_batch.invalidate_cache()
+
+def _write_failed(session, error):
+    """
+    Raise a write helper's database error.
+
+    Outside a batch the helper's transaction is rolled back and the error
+    wrapped as before. Inside a batch the error is re-raised as is: rolling
+    back here would end the batch's transaction under it, so batch() does it.
+    """
+    if current_batch(session) is not None:
+        raise error
+    session.rollback()
+    raise Exception(f"Database error: {str(error)}")
+
+def _finish_write(session, policies=(), end_dates=(), versions=(), cache_keys=(), invalidate_all=False):
+    """
+    Complete a helper's write: log the changed policies (objects or ids),
+    refresh their calendar months, bump the data versions, commit and
+    invalidate the cached lookups. Inside a batch all of it is staged instead.
+    """
+    write_batch = current_batch(session)
+    if write_batch is not None:
+        write_batch.stage(policies, end_dates, versions, cache_keys, invalidate_all)
+        return
+    if policies:
+        session.flush()
+        record_policy_changes(session, [policy if isinstance(policy, int) else policy.id for policy in policies])
+    if end_dates:
+        refresh_expiry_buckets(session, end_dates)
+    if versions:
+        bump_data_version(session, *versions)
+    session.commit()
+    if invalidate_all:
+        cache.invalidate_all()
+    elif cache_keys:
+        cache.invalidate(*cache_keys)
 
 # Policy Management Functions
 
@@ -19,17 +501,19 @@ def add_policy(session, client_id, policy_number, policy_type, start_date, end_d
             insurance_company=insurance_company
         )
         session.add(new_policy)
-        session.commit()
+        _finish_write(
+            session, policies=[new_policy], end_dates=[end_date], versions=['policies'],
+            cache_keys=[cache.client_policies_key(session, client_id)]
+        )
         return new_policy
     except SQLAlchemyError as e:
-        session.rollback()
-        raise Exception(f"Database error: {str(e)}")
+        _write_failed(session, e)
 
 def get_policy(session, policy_id):
     """
-    Retrieve a policy by its ID.
+    Retrieve a policy by its ID, from the session, the lookup cache or the database.
     """
-    return session.query(Policy).get(policy_id)
+    return _cached_get(session, Policy, cache.policy_key(session, policy_id), policy_id)
 
 def list_policies(session):
     """
@@ -37,15 +521,33 @@ def list_policies(session):
     """
     return session.query(Policy).all()
 
+def iter_policies(session, page_size=DEFAULT_PAGE_SIZE, since_id=0):
+    """
+    Lazily yield policies in id order, fetching page_size rows at a time.
+    """
+    return _iter_by_id(session, session.query(Policy), Policy, page_size, since_id)
+
 def update_policy(session, policy_id, **kwargs):
     """
     Update an existing policy in the database.
     """
     policy = get_policy(session, policy_id)
     if policy:
-        for key, value in kwargs.items():
-            setattr(policy, key, value)
-        session.commit()
+        old_client_id = policy.client_id
+        old_end_date = policy.end_date
+        try:
+            for key, value in kwargs.items():
+                setattr(policy, key, value)
+            _finish_write(
+                session, policies=[policy.id], end_dates=[old_end_date, policy.end_date], versions=['policies'],
+                cache_keys=[
+                    cache.policy_key(session, policy_id),
+                    cache.client_policies_key(session, old_client_id),
+                    cache.client_policies_key(session, policy.client_id),
+                ]
+            )
+        except SQLAlchemyError as e:
+            _write_failed(session, e)
     return policy
 
 def delete_policy(session, policy_id):
@@ -54,8 +556,16 @@ def delete_policy(session, policy_id):
     """
     policy = get_policy(session, policy_id)
     if policy:
-        session.delete(policy)
-        session.commit()
+        client_id = policy.client_id
+        end_date = policy.end_date
+        try:
+            session.delete(policy)
+            _finish_write(
+                session, policies=[policy_id], end_dates=[end_date], versions=['policies', 'reminders'],
+                cache_keys=[cache.policy_key(session, policy_id), cache.client_policies_key(session, client_id)]
+            )
+        except SQLAlchemyError as e:
+            _write_failed(session, e)
         return True
     return False
 
@@ -68,17 +578,18 @@ def add_client(session, name, email, phone, address):
     try:
         new_client = Client(name=name, email=email, phone=phone, address=address)
         session.add(new_client)
-        session.commit()
+        # The id is needed for the client's policies, also inside a batch
+        session.flush()
+        _finish_write(session)
         return new_client
     except SQLAlchemyError as e:
-        session.rollback()
-        raise Exception(f"Database error: {str(e)}")
+        _write_failed(session, e)
 
 def get_client(session, client_id):
     """
-    Retrieve a client by their ID.
+    Retrieve a client by their ID, from the session, the lookup cache or the database.
     """
-    return session.query(Client).get(client_id)
+    return _cached_get(session, Client, cache.client_key(session, client_id), client_id)
 
 def list_clients(session):
     """
@@ -86,15 +597,24 @@ def list_clients(session):
     """
     return session.query(Client).all()
 
+def iter_clients(session, page_size=DEFAULT_PAGE_SIZE, since_id=0):
+    """
+    Lazily yield clients in id order, fetching page_size rows at a time.
+    """
+    return _iter_by_id(session, session.query(Client), Client, page_size, since_id)
+
 def update_client(session, client_id, **kwargs):
     """
     Update an existing client in the database.
     """
     client = get_client(session, client_id)
     if client:
-        for key, value in kwargs.items():
-            setattr(client, key, value)
-        session.commit()
+        try:
+            for key, value in kwargs.items():
+                setattr(client, key, value)
+            _finish_write(session, cache_keys=[cache.client_key(session, client_id)])
+        except SQLAlchemyError as e:
+            _write_failed(session, e)
     return client
 
 def delete_client(session, client_id):
@@ -103,33 +623,589 @@ def delete_client(session, client_id):
     """
     client = get_client(session, client_id)
     if client:
-        session.delete(client)
-        session.commit()
+        try:
+            session.delete(client)
+            _finish_write(
+                session, versions=['policies'],
+                cache_keys=[cache.client_key(session, client_id), cache.client_policies_key(session, client_id)]
+            )
+        except SQLAlchemyError as e:
+            _write_failed(session, e)
         return True
     return False
 
+# Bulk Operation Functions
+# Each call runs one UPDATE or DELETE per target (one for filter criteria,
+# one per chunk of ids) instead of loading and changing objects one by one,
+# all in a single transaction. Objects already loaded in the session are
+# not updated in place; they are refreshed after the commit.
+
+def _bulk_targets(model, ids, criteria, chunk_size):
+    """
+    Return the WHERE clauses to run a bulk statement with: one for the
+    criteria alone, or one per chunk of ids (combined with the criteria).
+    """
+    criteria = list(criteria)
+    if ids is None:
+        if not criteria:
+            raise ValueError("Bulk operations need ids or criteria; pass criteria=[true()] to match everything")
+        return [criteria]
+    ids = list(ids)
+    return [
+        [model.id.in_(ids[start:start + chunk_size]), *criteria]
+        for start in range(0, len(ids), chunk_size)
+    ]
+
+def _count(session, model, targets):
+    return sum(
+        session.scalar(select(func.count()).select_from(model).where(*where)) for where in targets
+    )
+
+def _record_bulk_policy_changes(session, policy_ids):
+    """
+    Log every policy selected by a subquery as changed, in one INSERT ... SELECT.
+    """
+    session.execute(
+        insert(PolicyChange).from_select(
+            ['policy_id', 'changed_at'],
+            select(policy_ids.c.id, literal(datetime.now(), DateTime))
+        )
+    )
+
+def _end_dates(session, where):
+    """
+    Return the distinct end dates of the policies matching where, so their calendar months can be refreshed.
+    """
+    return set(session.scalars(select(Policy.end_date).where(*where).distinct()))
+
+def _finish_bulk_write(session, end_dates=(), versions=()):
+    """
+    Complete a bulk write. The rows a bulk statement changed are never
+    loaded, so every cached lookup is dropped instead of the rows' keys.
+    """
+    _finish_write(session, end_dates=end_dates, versions=versions, invalidate_all=True)
+
+def bulk_update_policies(session, values, ids=None, criteria=(), dry_run=False, chunk_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Update many policies with single UPDATE statements.
+
+    :param values: Column values to set; SQL expressions are allowed,
+        e.g. {'premium_amount': Policy.premium_amount * 1.08}
+    :param ids: Policy ids to update (chunked), or None to use the criteria alone
+    :param criteria: SQL criteria the policies must match, e.g. [Policy.type == 'Motor Vehicle Insurance']
+    :param dry_run: Only count the matching policies
+    :return: Dictionary with the number of policies matched or updated
+    """
+    targets = _bulk_targets(Policy, ids, criteria, chunk_size)
+    if dry_run:
+        return {'matched': _count(session, Policy, targets), 'dry_run': True}
+    changes_calendar = bool({'end_date', 'premium_amount'} & {getattr(key, 'key', key) for key in values})
+    updated = 0
+    end_dates = set()
+    try:
+        for where in targets:
+            # Logged before the UPDATE, which may change the columns the criteria test
+            _record_bulk_policy_changes(session, select(Policy.id).where(*where).subquery())
+            statement = update(Policy).where(*where).values(values).execution_options(synchronize_session=False)
+            if changes_calendar:
+                # The months the rows leave, then the months RETURNING reports they moved to
+                end_dates |= _end_dates(session, where)
+                moved = session.scalars(statement.returning(Policy.end_date)).all()
+                end_dates.update(moved)
+                updated += len(moved)
+            else:
+                updated += session.execute(statement).rowcount
+        _finish_bulk_write(session, end_dates=end_dates, versions=['policies'])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return {'updated': updated, 'dry_run': False}
+
+def bulk_delete_policies(session, ids=None, criteria=(), dry_run=False, chunk_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Delete many policies and their reminders with single DELETE statements.
+
+    :param ids: Policy ids to delete (chunked), or None to use the criteria alone
+    :param criteria: SQL criteria the policies must match
+    :param dry_run: Only count the policies and reminders that would be deleted
+    :return: Dictionary with the number of policies and reminders matched or deleted
+    """
+    targets = _bulk_targets(Policy, ids, criteria, chunk_size)
+    counts = {'policies': 0, 'reminders': 0, 'dry_run': dry_run}
+    end_dates = set()
+    try:
+        for where in targets:
+            policy_ids = select(Policy.id).where(*where)
+            if dry_run:
+                counts['policies'] += session.scalar(select(func.count()).select_from(policy_ids.subquery()))
+                counts['reminders'] += session.scalar(
+                    select(func.count(Reminder.id)).where(Reminder.policy_id.in_(policy_ids))
+                )
+                continue
+            counts['reminders'] += session.execute(
+                delete(Reminder).where(Reminder.policy_id.in_(policy_ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            _record_bulk_policy_changes(session, policy_ids.subquery())
+            end_dates |= _end_dates(session, where)
+            counts['policies'] += session.execute(
+                delete(Policy).where(*where).execution_options(synchronize_session=False)
+            ).rowcount
+        _finish_bulk_write(session, end_dates=end_dates, versions=['policies', 'reminders'])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return counts
+
+def bulk_update_clients(session, values, ids=None, criteria=(), dry_run=False, chunk_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Update many clients with single UPDATE statements.
+
+    :param values: Column values to set
+    :param ids: Client ids to update (chunked), or None to use the criteria alone
+    :param criteria: SQL criteria the clients must match
+    :param dry_run: Only count the matching clients
+    :return: Dictionary with the number of clients matched or updated
+    """
+    targets = _bulk_targets(Client, ids, criteria, chunk_size)
+    if dry_run:
+        return {'matched': _count(session, Client, targets), 'dry_run': True}
+    updated = 0
+    try:
+        for where in targets:
+            result = session.execute(
+                update(Client).where(*where).values(values).execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        _finish_bulk_write(session)
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return {'updated': updated, 'dry_run': False}
+
+def bulk_delete_clients(session, ids=None, criteria=(), dry_run=False, chunk_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Delete many clients together with their policies and those policies' reminders.
+
+    :param ids: Client ids to delete (chunked), or None to use the criteria alone
+    :param criteria: SQL criteria the clients must match
+    :param dry_run: Only count the clients, policies and reminders that would be deleted
+    :return: Dictionary with the number of clients, policies and reminders matched or deleted
+    """
+    targets = _bulk_targets(Client, ids, criteria, chunk_size)
+    counts = {'clients': 0, 'policies': 0, 'reminders': 0, 'dry_run': dry_run}
+    end_dates = set()
+    try:
+        for where in targets:
+            client_ids = select(Client.id).where(*where)
+            policy_ids = select(Policy.id).where(Policy.client_id.in_(client_ids))
+            if dry_run:
+                counts['clients'] += session.scalar(select(func.count()).select_from(client_ids.subquery()))
+                counts['policies'] += session.scalar(select(func.count()).select_from(policy_ids.subquery()))
+                counts['reminders'] += session.scalar(
+                    select(func.count(Reminder.id)).where(Reminder.policy_id.in_(policy_ids))
+                )
+                continue
+            counts['reminders'] += session.execute(
+                delete(Reminder).where(Reminder.policy_id.in_(policy_ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            _record_bulk_policy_changes(session, policy_ids.subquery())
+            end_dates |= _end_dates(session, [Policy.client_id.in_(client_ids)])
+            counts['policies'] += session.execute(
+                delete(Policy).where(Policy.client_id.in_(client_ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            counts['clients'] += session.execute(
+                delete(Client).where(*where).execution_options(synchronize_session=False)
+            ).rowcount
+        _finish_bulk_write(
+            session, end_dates=end_dates, versions=['policies', 'reminders'] if counts['policies'] else []
+        )
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return counts
+
+def purge_reminders(session, older_than_days=730, statuses=None, dry_run=False, today=None):
+    """
+    Delete reminders dated more than older_than_days ago in one DELETE statement.
+
+    :param statuses: Statuses to purge; by default the closed statuses, so
+        open reminders are never lost
+    :param dry_run: Only count the reminders that would be deleted
+    :return: Dictionary with the number of reminders matched or deleted
+    """
+    cutoff = (today or datetime.now().date()) - timedelta(days=older_than_days)
+    criteria = [Reminder.reminder_date < cutoff]
+    if statuses is None:
+        criteria.append(Reminder.status.in_(Reminder.CLOSED_STATUSES))
+    else:
+        criteria.append(Reminder.status.in_(list(statuses)))
+    if dry_run:
+        return {'reminders': _count(session, Reminder, [criteria]), 'dry_run': True}
+    try:
+        result = session.execute(delete(Reminder).where(*criteria).execution_options(synchronize_session=False))
+        _finish_write(session, versions=['reminders'] if result.rowcount else [])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return {'reminders': result.rowcount, 'dry_run': False}
+
+# Renewal Rule
+# A policy is renewed when the same client holds another policy of the same
+# type that starts within the grace period of its end date, on either side
+# (an early renewal starts before it). Policies running alongside it, or
+# taken out long after it lapsed, are not renewals. close_renewed_reminders
+# and lib.analytics.renewal_rates both use this rule.
+
+def is_renewed(grace_days=DEFAULT_RENEWAL_GRACE_DAYS):
+    """
+    Return an SQL criterion that is true for renewed policies.
+
+    The criterion correlates to Policy in the enclosing query, and finds the
+    successor through the client_id index.
+    """
+    successor = aliased(Policy, name='successor')
+    return (
+        select(successor.id)
+        .where(
+            successor.client_id == Policy.client_id,
+            successor.type == Policy.type,
+            successor.start_date > Policy.start_date,
+            successor.start_date >= _days_after(Policy.end_date, literal(-grace_days, Integer)),
+            successor.start_date <= _days_after(Policy.end_date, literal(grace_days, Integer)),
+        )
+        .exists()
+    )
+
 # Reminder Management Functions
 
-def generate_reminders(session):
+def _pending_reminders_select(horizon, today):
+    """
+    Select the (policy_id, reminder_date, status) rows of the reminders
+    generate_reminders creates: one pending reminder dated today for every
+    policy ending between today and horizon that no reminder covers.
+    """
+    # An expired reminder no longer covers a policy whose end date moved back into the window
+    has_reminder = (
+        select(Reminder.id)
+        .where(Reminder.policy_id == Policy.id, Reminder.status != Reminder.EXPIRED)
+        .exists()
+    )
+    return (
+        select(Policy.id, literal(today, Date), literal(Reminder.PENDING))
+        .where(Policy.end_date >= today, Policy.end_date <= horizon, ~has_reminder)
+    )
+
+def generate_reminders(session, days=90, policy_filter=None, today=None):
     """
     Generate reminders for policies expiring within the next 3 months.
+
+    Policies that have not ended and have no reminder covering them (one that
+    is open, or closed as renewed) are found with a single anti-join and the
+    new reminders are written with one INSERT ... SELECT, so the cost no
+    longer grows with one query per expiring policy.
+
+    :param policy_filter: Optional SQL criterion restricting the policies considered (e.g. a shard)
+    :param today: Date the reminders are issued on (defaults to the current date)
+    :return: Dictionary with the number of reminders created and the elapsed seconds
     """
-    three_months_from_now = datetime.now().date() + timedelta(days=90)
-    policies_to_remind = session.query(Policy).filter(Policy.end_date <= three_months_from_now).all()
-    
-    for policy in policies_to_remind:
-        existing_reminder = session.query(Reminder).filter_by(policy_id=policy.id, status='pending').first()
-        if not existing_reminder:
-            reminder = Reminder(policy_id=policy.id, reminder_date=datetime.now().date(), status='pending')
-            session.add(reminder)
-    
-    session.commit()
+    started = time.perf_counter()
+    today = today or datetime.now().date()
+    horizon = today + timedelta(days=days)
+
+    due_policies = _pending_reminders_select(horizon, today)
+    if policy_filter is not None:
+        due_policies = due_policies.where(policy_filter)
+    try:
+        result = session.execute(
+            insert(Reminder).from_select(
+                ['policy_id', 'reminder_date', 'status'], due_policies
+            )
+        )
+        _finish_write(session, versions=['reminders'] if result.rowcount else [])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+
+    return {
+        'created': result.rowcount,
+        'elapsed': time.perf_counter() - started,
+    }
+
+def generate_reminders_incremental(session, days=90, today=None, name='generate_reminders'):
+    """
+    Generate reminders only for policies that may need one since the last run.
+
+    A watermark stores the window end (horizon) covered by the previous run and
+    the last processed entry of the policy change log. A run evaluates only
+    policies whose end_date lies beyond the old horizon (newly inside the
+    window) or that were added, updated or deleted since, so a daily run costs
+    time proportional to the day's changes rather than the window size. The
+    first run, without a watermark, evaluates the whole window.
+
+    Reminders that expire outside the helpers are not re-evaluated; run generate_reminders for a full sweep when needed.
+
+    :return: Dictionary with the number created, elapsed seconds and whether the run was incremental
+    """
+    started = time.perf_counter()
+    today = today or datetime.now().date()
+    horizon = today + timedelta(days=days)
+
+    watermark = session.scalars(select(ReminderWatermark).filter_by(name=name)).first()
+    # Changes logged after this point are left for the next run
+    last_change_id = session.scalar(select(func.max(PolicyChange.id))) or 0
+
+    policy_filter = None
+    if watermark is not None:
+        last_change_id = max(last_change_id, watermark.last_change_id)
+        changed_ids = select(PolicyChange.policy_id).where(
+            PolicyChange.id > watermark.last_change_id,
+            PolicyChange.id <= last_change_id
+        )
+        policy_filter = or_(Policy.end_date > watermark.horizon, Policy.id.in_(changed_ids))
+
+    result = generate_reminders(session, days=days, policy_filter=policy_filter, today=today)
+
+    try:
+        if watermark is None:
+            watermark = ReminderWatermark(name=name)
+            session.add(watermark)
+        watermark.horizon = max(horizon, watermark.horizon or horizon)
+        watermark.last_change_id = last_change_id
+        watermark.updated_at = datetime.now()
+        # Keep log entries that another watermark has not processed yet
+        processed = session.scalar(select(func.min(ReminderWatermark.last_change_id)))
+        session.execute(delete(PolicyChange).where(PolicyChange.id <= processed))
+        _finish_write(session)
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+
+    result['incremental'] = policy_filter is not None
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+def _schedule_groups(schedule):
+    """
+    Turn a schedule into (criteria, offsets) pairs that partition the policies:
+    one per insurance company, one per policy type for the other companies,
+    and the default for everything else.
+    """
+    companies = list(schedule['company'])
+    types = list(schedule['type'])
+    other_company = or_(Policy.insurance_company.is_(None), Policy.insurance_company.notin_(companies)) \
+        if companies else None
+    groups = [([Policy.insurance_company == company], offsets) for company, offsets in schedule['company'].items()]
+    for policy_type, offsets in schedule['type'].items():
+        groups.append(([Policy.type == policy_type] + ([other_company] if companies else []), offsets))
+    default = ([Policy.type.notin_(types)] if types else []) + ([other_company] if companies else [])
+    groups.append((default, schedule['default']))
+    return groups
+
+def generate_scheduled_reminders(session, schedule=None, policy_filter=None, today=None):
+    """
+    Generate the reminders due under a touchpoint schedule for the whole book in one statement.
+
+    For every policy that has not expired, the latest touchpoint that has come
+    due (the smallest offset with end_date - offset <= today) gets a reminder
+    dated today, unless the policy already has a reminder that is not expired
+    dated on or after that touchpoint's date. Reminders from
+    generate_reminders count as well, so running both never doubles up.
+    Earlier touchpoints that were missed are not back-filled. Every
+    (schedule group, offset) pair becomes one SELECT bounded by literal end_date
+    limits, and all of them feed a single INSERT ... SELECT ... UNION ALL.
+
+    :param schedule: Schedule from lib.schedules.make_schedule or load_schedule (defaults to DEFAULT_OFFSETS)
+    :param policy_filter: Optional SQL criterion restricting the policies considered
+    :param today: Date the reminders are issued on (defaults to the current date)
+    :return: Dictionary with the number of reminders created, the elapsed seconds and the touchpoints evaluated
+    """
+    started = time.perf_counter()
+    today = today or datetime.now().date()
+    schedule = schedule or make_schedule()
+
+    selects = []
+    for criteria, offsets in _schedule_groups(schedule):
+        previous = None
+        for offset in sorted(offsets):
+            # Due now, and the next smaller touchpoint is not due yet
+            window = [
+                Policy.end_date <= today + timedelta(days=offset),
+                Policy.end_date > today + timedelta(days=previous) if previous is not None
+                else Policy.end_date >= today,
+            ]
+            has_touchpoint = (
+                select(Reminder.id)
+                .where(
+                    Reminder.policy_id == Policy.id,
+                    Reminder.status != Reminder.EXPIRED,
+                    Reminder.reminder_date >= _days_after(Policy.end_date, literal(-offset, Integer)),
+                )
+                .exists()
+            )
+            due = (
+                select(Policy.id, literal(today, Date), literal(Reminder.PENDING), literal(offset, Integer))
+                .where(*criteria, *window, ~has_touchpoint)
+            )
+            if policy_filter is not None:
+                due = due.where(policy_filter)
+            selects.append(due)
+            previous = offset
+    try:
+        result = session.execute(
+            insert(Reminder).from_select(
+                ['policy_id', 'reminder_date', 'status', 'offset_days'], union_all(*selects)
+            )
+        )
+        _finish_write(session, versions=['reminders'] if result.rowcount else [])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+
+    return {
+        'created': result.rowcount,
+        'elapsed': time.perf_counter() - started,
+        'touchpoints': len(selects),
+    }
+
+def transition_reminders(session, status, reminder_ids=None, criteria=None, batch_size=DEFAULT_BULK_CHUNK_SIZE):
+    """
+    Move reminders to a new status in bulk.
+
+    Only reminders whose current status may move to the new one (see
+    Reminder.TRANSITIONS) are changed, so for example a closed reminder is
+    never reopened.
+
+    :param reminder_ids: Reminders to move, updated batch_size ids per statement
+    :param criteria: SQL criterion selecting the reminders to move, updated
+        in a single statement; combined with reminder_ids when both are given
+    :return: Number of reminders moved
+    """
+    sources = Reminder.sources(status)
+    if reminder_ids is None and criteria is None:
+        raise ValueError("Give reminder_ids or criteria to select the reminders to move")
+    conditions = [Reminder.status.in_(sources)] + ([criteria] if criteria is not None else [])
+    if reminder_ids is None:
+        batches = [conditions]
+    else:
+        reminder_ids = list(reminder_ids)
+        batches = [
+            conditions + [Reminder.id.in_(reminder_ids[start:start + batch_size])]
+            for start in range(0, len(reminder_ids), batch_size)
+        ]
+    moved = 0
+    try:
+        for batch_criteria in batches:
+            moved += session.execute(
+                update(Reminder).where(*batch_criteria).values(status=status)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        _finish_write(session, versions=['reminders'] if moved else [])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return moved
+
+def close_renewed_reminders(session, limit=None, grace_days=DEFAULT_RENEWAL_GRACE_DAYS):
+    """
+    Close the open reminders of renewed policies as 'renewed' in one statement.
+
+    A policy counts as renewed under is_renewed: the same client holds a
+    policy of the same type starting within grace_days of its end date. The
+    check runs per open reminder through the client_id index, so its cost
+    follows the number of open reminders rather than the size of the book.
+
+    :param limit: Close at most this many reminders (lowest ids first); None closes them all
+    :return: Number of reminders closed
+    """
+    renewed = select(Policy.id).where(Policy.id == Reminder.policy_id, is_renewed(grace_days)).exists()
+    if limit is not None:
+        renewed = Reminder.id.in_(
+            select(Reminder.id)
+            .where(Reminder.status.in_(Reminder.sources(Reminder.RENEWED)), renewed)
+            .order_by(Reminder.id)
+            .limit(limit)
+        )
+    return transition_reminders(session, Reminder.RENEWED, criteria=renewed)
+
+def expire_reminders(session, today=None, limit=None):
+    """
+    Close the open reminders of policies that have already ended as 'expired'.
+
+    Run close_renewed_reminders first so that reminders of policies renewed
+    late are closed as renewed rather than expired.
+
+    :param limit: Expire at most this many reminders (lowest ids first), to
+        keep each transaction short; None expires them all
+    :return: Number of reminders expired
+    """
+    today = today or datetime.now().date()
+    # Correlated, so a limited run stops at the first limit matches instead of listing every ended policy
+    ended = select(Policy.id).where(Policy.id == Reminder.policy_id, Policy.end_date < today).exists()
+    due = (
+        select(Reminder.id)
+        .where(Reminder.status.in_(Reminder.sources(Reminder.EXPIRED)), ended)
+        .order_by(Reminder.id)
+        .limit(limit)
+    )
+    return transition_reminders(session, Reminder.EXPIRED, criteria=Reminder.id.in_(due))
+
+def archive_reminders(session, older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS, limit=DEFAULT_ARCHIVE_CHUNK_SIZE,
+                      today=None):
+    """
+    Move closed reminders dated more than older_than_days ago to reminders_archive.
+
+    One call moves at most limit reminders (lowest ids first) in one
+    transaction: an INSERT ... SELECT into the archive, then a DELETE of the
+    rows it copied. Call it until it returns less than limit to archive
+    everything due, pausing in between to leave the database to other writers.
+
+    :param limit: Reminders per call; None moves them all at once
+    :return: Number of reminders archived
+    """
+    cutoff = (today or datetime.now().date()) - timedelta(days=older_than_days)
+    criteria = [Reminder.status.in_(Reminder.CLOSED_STATUSES), Reminder.reminder_date < cutoff]
+    archived_at = datetime.now()
+    try:
+        if limit is not None:
+            chunk = select(Reminder.id).where(*criteria).order_by(Reminder.id).limit(limit).subquery()
+            last_id = session.scalar(select(func.max(chunk.c.id)))
+            if last_id is None:
+                _finish_write(session)
+                return 0
+            criteria.append(Reminder.id <= last_id)
+        copied = session.execute(
+            insert(ReminderArchive).from_select(
+                ['reminder_id', 'policy_id', 'reminder_date', 'status', 'offset_days', 'archived_at'],
+                select(
+                    Reminder.id, Reminder.policy_id, Reminder.reminder_date, Reminder.status,
+                    Reminder.offset_days, literal(archived_at, DateTime)
+                ).where(*criteria)
+            )
+        )
+        # Delete only what this call copied, even if other rows started matching in between
+        in_archive = (
+            select(ReminderArchive.id)
+            .where(ReminderArchive.reminder_id == Reminder.id, ReminderArchive.archived_at == archived_at)
+            .exists()
+        )
+        session.execute(delete(Reminder).where(*criteria, in_archive).execution_options(synchronize_session=False))
+        _finish_write(session, versions=['reminders'] if copied.rowcount else [])
+    except SQLAlchemyError as e:
+        _write_failed(session, e)
+    return copied.rowcount
+
+def count_pending_reminders(session):
+    """
+    Count the reminders still pending.
+    """
+    return session.scalar(select(func.count(Reminder.id)).where(Reminder.status == Reminder.PENDING))
 
 def list_reminders(session):
     """
     Retrieve all pending reminders from the database.
     """
-    return session.query(Reminder).filter(Reminder.status == 'pending').all()
+    return session.query(Reminder).filter(Reminder.status == Reminder.PENDING).all()
+
+def iter_reminders(session, page_size=DEFAULT_PAGE_SIZE, since_id=0):
+    """
+    Lazily yield pending reminders in id order, fetching page_size rows at a time.
+    """
+    query = session.query(Reminder).filter(Reminder.status == Reminder.PENDING)
+    return _iter_by_id(session, query, Reminder, page_size, since_id)
 
 def get_expiring_policies(session, days=90):
     """
@@ -142,12 +1218,111 @@ def get_expiring_policies(session, days=90):
 
 def get_client_policies(session, client_id):
     """
-    Retrieve all policies associated with a specific client.
+    Retrieve all policies associated with a specific client, through the lookup cache.
     """
-    return session.query(Policy).filter_by(client_id=client_id).all()
+    if current_batch(session) is not None:
+        # As in _cached_get, a batch reads its own uncommitted rows from the database
+        return session.query(Policy).filter_by(client_id=client_id).all()
+    key = cache.client_policies_key(session, client_id)
+    records = cache.lookup(key)
+    if records is not None:
+        return [_from_cache_record(session, Policy, record) for record in records]
+    policies = session.query(Policy).filter_by(client_id=client_id).all()
+    cache.store(key, [_cache_record(policy) for policy in policies])
+    return policies
 
 def get_policy_reminders(session, policy_id):
     """
     Retrieve all reminders associated with a specific policy.
     """
-    return session.query(Reminder).filter_by(policy_id=policy_id).all()
\ No newline at end of file
+    return session.query(Reminder).filter_by(policy_id=policy_id).all()
+
+# Read Model Functions
+# Column-only selects joining each row to its policy and client, so listings
+# and exports run one query instead of one lazy load per row and skip the ORM
+# identity map entirely. Rows are named tuples keyed by the column labels.
+
+CLIENT_CONTACT_COLUMNS = (
+    Client.name.label('client_name'),
+    Client.email.label('client_email'),
+    Client.phone.label('client_phone'),
+    Client.address.label('client_address'),
+)
+
+def expiring_policies_view(days=90, today=None):
+    """
+    Select policies expiring within the given number of days, with client contact fields.
+    """
+    expiry_date = (today or datetime.now().date()) + timedelta(days=days)
+    return (
+        select(
+            Policy.id.label('policy_id'), Policy.policy_number, Policy.type,
+            Policy.start_date, Policy.end_date, Policy.premium_amount,
+            Policy.insurance_company, Policy.client_id, *CLIENT_CONTACT_COLUMNS
+        )
+        .join(Client, Policy.client_id == Client.id)
+        .where(Policy.end_date <= expiry_date)
+        .order_by(Policy.end_date, Policy.id)
+    )
+
+def reminders_view():
+    """
+    Select pending reminders with their policy and client contact fields.
+    """
+    return (
+        select(
+            Reminder.id.label('reminder_id'), Reminder.reminder_date, Reminder.status, Reminder.offset_days,
+            Reminder.policy_id, Policy.policy_number, Policy.type, Policy.end_date,
+            Policy.insurance_company, Policy.client_id, *CLIENT_CONTACT_COLUMNS
+        )
+        .join(Policy, Reminder.policy_id == Policy.id)
+        .join(Client, Policy.client_id == Client.id)
+        .where(Reminder.status == Reminder.PENDING)
+        .order_by(Reminder.id)
+    )
+
+def policies_view():
+    """
+    Select all policies with client contact fields.
+    """
+    return (
+        select(
+            Policy.id.label('policy_id'), Policy.policy_number, Policy.type,
+            Policy.start_date, Policy.end_date, Policy.premium_amount,
+            Policy.insurance_company, Policy.client_id, *CLIENT_CONTACT_COLUMNS
+        )
+        .join(Client, Policy.client_id == Client.id)
+        .order_by(Policy.id)
+    )
+
+def clients_view():
+    """
+    Select all clients.
+    """
+    return select(
+        Client.id.label('client_id'), Client.name, Client.email, Client.phone, Client.address
+    ).order_by(Client.id)
+
+def get_expiring_policies_with_clients(session, days=90):
+    """
+    Retrieve policies expiring within the specified number of days, with client contact fields.
+    """
+    return session.execute(expiring_policies_view(days)).all()
+
+def iter_reminders_with_details(session, page_size=DEFAULT_PAGE_SIZE, since_id=0):
+    """
+    Lazily yield pending reminders with policy number and client contact fields, page by page.
+    """
+    return _iter_rows_by_key(session, reminders_view(), Reminder.id, page_size, since_id)
+
+def get_client_portfolio(session, client_id):
+    """
+    Retrieve a client with their policies and each policy's reminders loaded up front.
+
+    The policies and reminders are fetched with one extra SELECT ... IN each,
+    so walking the portfolio never triggers a lazy load.
+    """
+    return session.get(
+        Client, client_id,
+        options=[selectinload(Client.policies).selectinload(Policy.reminders)]
+    )
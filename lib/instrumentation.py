@@ -0,0 +1,312 @@
+from sqlalchemy import event
+from collections import Counter
+import functools
+import inspect
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+
+# Optional profiling of the helpers in lib/helpers.py.
+#
+# enable() swaps each public data-access helper (a function taking the
+# session first) for a timing wrapper, also where other lib modules imported
+# it by name, and hooks the engine's cursor events; disable() puts the
+# original functions back. While disabled nothing is wrapped or listened to,
+# so there is no overhead at all.
+#
+# Every helper call produces a record with its latency, the number and total
+# time of SQL statements it ran, rows fetched, ORM objects loaded, rows
+# changed by DML, and lock errors with the seconds spent waiting on the lock
+# before each one. Records can be appended to a JSON Lines log,
+# and per-helper totals are available as a Prometheus text exposition.
+
+logger = logging.getLogger(__name__)
+
+# A statement repeated this many times within one helper call is flagged as N+1
+DEFAULT_N_PLUS_ONE_THRESHOLD = 20
+
+# Helpers that take the session but only manage it, rather than access data
+UNINSTRUMENTED_HELPERS = ('batch', 'current_batch')
+
+_state = None
+_local = threading.local()
+
+def _frames():
+    if not hasattr(_local, 'frames'):
+        _local.frames = []
+    return _local.frames
+
+def _new_frame(name):
+    return {
+        'helper': name,
+        'statements': 0,
+        'statement_s': 0.0,
+        'rows_fetched': 0,
+        'orm_objects': 0,
+        'rows_affected': 0,
+        'lock_errors': 0,
+        'lock_wait_s': 0.0,
+        'statement_counts': Counter(),
+    }
+
+def _row_counter(frames):
+    """
+    Return a sqlite3 row factory that counts each fetched row for the helper calls it ran in.
+    """
+    def count(cursor, row):
+        for frame in frames:
+            frame['rows_fetched'] += 1
+        return row
+    return count
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('instrumentation_start', []).append(time.perf_counter())
+    frames = _frames()
+    if frames and isinstance(cursor, sqlite3.Cursor):
+        # sqlite3 reports no rowcount for a SELECT, but passes every row it fetches through the row factory
+        cursor.row_factory = _row_counter(list(frames))
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['instrumentation_start'].pop()
+    rows = max(cursor.rowcount or 0, 0)
+    if cursor.description is None:
+        rows_affected, rows_fetched = rows, 0
+    else:
+        # Other drivers report the rows a SELECT produced as its rowcount
+        rows_affected, rows_fetched = 0, 0 if isinstance(cursor, sqlite3.Cursor) else rows
+    for frame in _frames():
+        frame['statements'] += 1
+        frame['statement_s'] += elapsed
+        frame['rows_fetched'] += rows_fetched
+        frame['rows_affected'] += rows_affected
+        frame['statement_counts'][statement] += 1
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    waited = 0.0
+    if conn is not None and conn.info.get('instrumentation_start'):
+        waited = time.perf_counter() - conn.info['instrumentation_start'].pop()
+    message = str(exception_context.original_exception).lower()
+    if 'locked' in message or 'lock timeout' in message or 'deadlock' in message:
+        # The failed statement spent its time waiting for the lock (the busy or lock timeout)
+        for frame in _frames():
+            frame['lock_errors'] += 1
+            frame['lock_wait_s'] += waited
+
+def _on_load(target, context):
+    for frame in _frames():
+        frame['orm_objects'] += 1
+
+def _finish(frame, elapsed, failed):
+    repeated_statement, repeats = (frame['statement_counts'].most_common(1) or [(None, 0)])[0]
+    record = {
+        'helper': frame['helper'],
+        'elapsed_s': round(elapsed, 6),
+        'statements': frame['statements'],
+        'statement_s': round(frame['statement_s'], 6),
+        'rows_fetched': frame['rows_fetched'],
+        'orm_objects': frame['orm_objects'],
+        'rows_affected': frame['rows_affected'],
+        'lock_errors': frame['lock_errors'],
+        'lock_wait_s': round(frame['lock_wait_s'], 6),
+        'max_statement_repeats': repeats,
+        'n_plus_one': repeats >= _state['n_plus_one_threshold'],
+        'failed': failed,
+    }
+    if record['n_plus_one']:
+        logger.warning(
+            "Possible N+1 in %s: statement ran %d times: %s",
+            frame['helper'], repeats, ' '.join(repeated_statement.split())[:200]
+        )
+    return record
+
+def _record(record):
+    with _state['lock']:
+        totals = _state['totals'].setdefault(record['helper'], Counter())
+        totals['calls'] += 1
+        for key in (
+            'elapsed_s', 'statements', 'statement_s', 'rows_fetched', 'orm_objects', 'rows_affected',
+            'lock_errors', 'lock_wait_s',
+        ):
+            totals[key] += record[key]
+        totals['n_plus_one'] += int(record['n_plus_one'])
+        totals['failures'] += int(record['failed'])
+        _state['records'].append(record)
+        if _state['log']:
+            _state['log'].write(json.dumps(record) + "\n")
+            _state['log'].flush()
+
+def instrument(function):
+    """
+    Wrap a helper so each call is recorded while instrumentation is enabled.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        frames = _frames()
+        frame = _new_frame(function.__name__)
+        frames.append(frame)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            frames.pop()
+            if _state is not None:
+                _record(_finish(frame, time.perf_counter() - started, failed))
+    wrapper.__wrapped_helper__ = function
+    return wrapper
+
+def _data_access_helpers(helpers):
+    """
+    Yield the name and function of each public helper that takes the session as its first argument.
+
+    Statement builders (the read-model views, is_renewed) take no session and
+    are left alone, as are UNINSTRUMENTED_HELPERS.
+    """
+    for name, function in vars(helpers).items():
+        if name.startswith('_') or name in UNINSTRUMENTED_HELPERS or not inspect.isfunction(function):
+            continue
+        if function.__module__ != helpers.__name__:
+            continue
+        parameters = list(inspect.signature(function).parameters)
+        if parameters and parameters[0] == 'session':
+            yield name, function
+
+def _importers(package, functions):
+    """
+    Yield (module, name, function) for every binding of the given functions in the package's loaded modules.
+    """
+    for module_name, module in list(sys.modules.items()):
+        if module is None or (module_name != package and not module_name.startswith(package + '.')):
+            continue
+        for name, value in list(vars(module).items()):
+            if callable(value) and id(value) in functions and functions[id(value)] is value:
+                yield module, name, value
+
+def is_enabled():
+    return _state is not None
+
+def enable(engine=None, log_path=None, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+    """
+    Start recording helper calls.
+
+    :param engine: Engine to hook (defaults to the shared engine)
+    :param log_path: Optional JSON Lines file each call record is appended to
+    :param n_plus_one_threshold: Repeats of one statement within a call that count as N+1
+
+    Helpers are also swapped in the lib modules that imported them by name;
+    modules first imported after enable() keep the originals.
+    """
+    global _state
+    from .models import Base, get_engine
+    from . import helpers
+
+    if _state is not None:
+        disable()
+    engine = engine or get_engine()
+    _state = {
+        'engine': engine,
+        'log': open(log_path, 'a', encoding='utf-8') if log_path else None,
+        'n_plus_one_threshold': n_plus_one_threshold,
+        'totals': {},
+        'records': [],
+        'lock': threading.Lock(),
+        'originals': [],
+    }
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    event.listen(Base, 'load', _on_load, propagate=True)
+
+    functions = {id(function): function for _, function in _data_access_helpers(helpers)}
+    wrappers = {}
+    for module, name, function in _importers(helpers.__package__, functions):
+        if id(function) not in wrappers:
+            wrappers[id(function)] = instrument(function)
+        _state['originals'].append((module, name, function))
+        setattr(module, name, wrappers[id(function)])
+
+def disable():
+    """
+    Stop recording, restore the original helpers and return the collected call records.
+    """
+    global _state
+    from .models import Base
+
+    if _state is None:
+        return []
+    state = _state
+    for module, name, function in state['originals']:
+        setattr(module, name, function)
+    event.remove(state['engine'], 'before_cursor_execute', _before_cursor_execute)
+    event.remove(state['engine'], 'after_cursor_execute', _after_cursor_execute)
+    event.remove(state['engine'], 'handle_error', _handle_error)
+    event.remove(Base, 'load', _on_load)
+    if state['log']:
+        state['log'].close()
+    _state = None
+    return state['records']
+
+def call_records():
+    """
+    Return the call records collected since instrumentation was enabled.
+    """
+    return list(_state['records']) if _state else []
+
+def helper_totals():
+    """
+    Return the per-helper totals (calls, seconds, statements, ...) collected so far.
+    """
+    if _state is None:
+        return {}
+    with _state['lock']:
+        return {helper: dict(totals) for helper, totals in _state['totals'].items()}
+
+def prometheus_text():
+    """
+    Render the per-helper totals in the Prometheus text exposition format.
+    """
+    metrics = (
+        ('calls', 'counter', 'Helper calls'),
+        ('elapsed_s', 'counter', 'Seconds spent in the helper'),
+        ('statements', 'counter', 'SQL statements executed'),
+        ('statement_s', 'counter', 'Seconds spent executing SQL'),
+        ('rows_fetched', 'counter', 'Rows fetched from query results'),
+        ('orm_objects', 'counter', 'ORM objects loaded'),
+        ('rows_affected', 'counter', 'Rows changed by INSERT, UPDATE and DELETE'),
+        ('lock_errors', 'counter', 'Statements that failed on a database lock'),
+        ('lock_wait_s', 'counter', 'Seconds spent waiting on a database lock before failing'),
+        ('n_plus_one', 'counter', 'Calls flagged as N+1'),
+        ('failures', 'counter', 'Calls that raised'),
+    )
+    totals = _state['totals'] if _state else {}
+    lines = []
+    for key, kind, description in metrics:
+        name = f"insurance_tracker_helper_{key}_total"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for helper in sorted(totals):
+            value = totals[helper][key]
+            lines.append(f'{name}{{helper="{helper}"}} {round(value, 6) if isinstance(value, float) else value}')
+
+    from . import cache
+    if cache.is_configured():
+        stats = cache.cache_stats()
+        for key, description in (('hits', 'Lookup cache hits'), ('misses', 'Lookup cache misses')):
+            name = f"insurance_tracker_cache_{key}_total"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {stats[key]}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path):
+    """
+    Write the Prometheus text exposition to a file (e.g. for the node exporter textfile collector).
+    """
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(prometheus_text())
@@ -1,6 +1,8 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker
+import os
 
 # Create the Base class
 Base = declarative_base()
@@ -9,10 +11,122 @@ Base = declarative_base()
 from .client import Client
 from .policy import Policy
 from .reminder import Reminder
+from .import_checkpoint import ImportCheckpoint
+from .policy_change import PolicyChange
+from .reminder_watermark import ReminderWatermark
+from .expiry_bucket import ExpiryBucket
+from .data_version import DataVersion
+from .reminder_archive import ReminderArchive
+from .config import load_engine_config, build_engine
 
-# Create engine and session
-engine = create_engine('sqlite:///insurance_tracker.db')
-Session = sessionmaker(bind=engine)
+# Repository root, where alembic.ini lives
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# This will create all tables
-Base.metadata.create_all(engine)
\ No newline at end of file
+# Revision of the newest migration, which the database must be at. Kept here
+# so startup reads one row instead of loading the migration scripts; update
+# it with every new migration (tests/test_schema.py checks it).
+SCHEMA_REVISION = 'a6f2d8c3e915'
+
+_engine = None
+_engine_config = None
+
+class LazySessionmaker(sessionmaker):
+    """
+    Session factory that creates the engine the first time a session is opened.
+    """
+
+    def __call__(self, **local_kw):
+        get_engine()
+        return super().__call__(**local_kw)
+
+Session = LazySessionmaker()
+
+def get_engine():
+    """
+    Return the shared engine, creating it and checking the schema on first use.
+
+    The engine is built from the environment and config file settings
+    (see lib.models.config) unless configure_engine was called first.
+    """
+    if _engine is None:
+        configure_engine()
+    return _engine
+
+def configure_engine(config=None, **overrides):
+    """
+    Replace the shared engine with one built from the given settings.
+
+    :param config: Settings dictionary; defaults to load_engine_config()
+    :param overrides: Individual settings, e.g. database_url='sqlite:///other.db'
+    :return: The new engine
+    """
+    global _engine, _engine_config
+    config = dict(load_engine_config() if config is None else config)
+    config.update({key: str(value) for key, value in overrides.items()})
+    engine = build_engine(config)
+    check_schema(engine)
+    if _engine is not None:
+        _engine.dispose()
+    Session.configure(bind=engine)
+    _engine = engine
+    _engine_config = config
+    return engine
+
+def get_engine_config():
+    """
+    Return the settings the shared engine was built from, e.g. to rebuild it in a worker process.
+    """
+    get_engine()
+    return dict(_engine_config)
+
+def _alembic_config(url=None):
+    from alembic.config import Config
+
+    config = Config(os.path.join(PROJECT_ROOT, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(PROJECT_ROOT, 'migrations'))
+    if url is not None:
+        config.attributes['database_url'] = url
+    return config
+
+def check_schema(engine):
+    """
+    Raise a RuntimeError if the database is not migrated to the latest Alembic revision.
+
+    The schema is owned by Alembic; run 'alembic upgrade head' to create or update it.
+    """
+    with engine.connect() as connection:
+        check_schema_revision(connection)
+
+def check_schema_revision(connection):
+    """
+    Run check_schema's revision check on an open connection (e.g. through an async connection's run_sync).
+    """
+    try:
+        current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        # No alembic_version table
+        current = None
+    url = connection.engine.url
+    if current is None:
+        raise RuntimeError(
+            f"Database at {url} has no schema; run 'alembic upgrade head' first"
+        )
+    if current != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database at {url} is at revision {current}, not {SCHEMA_REVISION}; "
+            "run 'alembic upgrade head' first"
+        )
+
+def upgrade_schema(url=None, revision='head'):
+    """
+    Apply the Alembic migrations to the given database URL (defaults to the configured one).
+    """
+    from alembic import command
+
+    command.upgrade(_alembic_config(url or load_engine_config()['database_url']), revision)
+
+def __getattr__(name):
+    # Keep 'from lib.models import engine' working without creating the engine at import
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
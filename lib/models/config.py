@@ -0,0 +1,163 @@
+from configparser import ConfigParser
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+import os
+import re
+
+# Settings can come from a [database] section in an INI file (named by
+# INSURANCE_TRACKER_CONFIG, or insurance_tracker.ini in the working directory)
+# and from INSURANCE_TRACKER_<SETTING> environment variables, which win.
+CONFIG_FILE_ENV = 'INSURANCE_TRACKER_CONFIG'
+DEFAULT_CONFIG_FILE = 'insurance_tracker.ini'
+ENV_PREFIX = 'INSURANCE_TRACKER_'
+
+# An empty value disables a setting (for pragmas: leave SQLite's default)
+ENGINE_DEFAULTS = {
+    'database_url': 'sqlite:///insurance_tracker.db',
+    'pool_size': '5',
+    'max_overflow': '10',
+    'pool_timeout': '30',
+    'pool_recycle': '3600',
+    # Milliseconds a statement may run (PostgreSQL) or wait for a lock (SQLite)
+    'statement_timeout': '30000',
+    # Applied to every new SQLite connection
+    'sqlite_journal_mode': 'WAL',
+    'sqlite_synchronous': 'NORMAL',
+    'sqlite_cache_size': '-65536',
+    'sqlite_mmap_size': '268435456',
+    'sqlite_temp_store': 'MEMORY',
+}
+
+SQLITE_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+# Pragma values are interpolated into SQL, so only plain words and integers are allowed
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+def load_engine_config(path=None, environ=None, defaults=None, **overrides):
+    """
+    Load the engine settings as a dictionary of strings.
+
+    Precedence, lowest first: ENGINE_DEFAULTS, the defaults argument, the
+    config file, environment variables, then keyword overrides.
+    """
+    environ = os.environ if environ is None else environ
+    config = dict(ENGINE_DEFAULTS)
+    config.update(defaults or {})
+
+    path = path or environ.get(CONFIG_FILE_ENV)
+    if path is None and os.path.exists(DEFAULT_CONFIG_FILE):
+        path = DEFAULT_CONFIG_FILE
+    if path is not None:
+        parser = ConfigParser()
+        if not parser.read(path):
+            raise RuntimeError(f"Cannot read database config file {path}")
+        if parser.has_section('database'):
+            config.update(parser['database'])
+
+    for key in ENGINE_DEFAULTS:
+        value = environ.get(ENV_PREFIX + key.upper())
+        if value is not None:
+            config[key] = value
+
+    config.update({key: str(value) for key, value in overrides.items() if value is not None})
+    return config
+
+def _int_setting(config, key):
+    value = config.get(key)
+    return int(value) if value not in (None, '') else None
+
+def _apply_sqlite_pragmas(config):
+    pragmas = [
+        (name, config.get(f'sqlite_{name}'))
+        for name in SQLITE_PRAGMAS
+        if config.get(f'sqlite_{name}') not in (None, '')
+    ]
+    for name, value in pragmas:
+        if not PRAGMA_VALUE.match(value):
+            raise ValueError(f"Invalid value for sqlite_{name}: {value!r}")
+    busy_timeout = _int_setting(config, 'statement_timeout')
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if busy_timeout is not None:
+                cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return on_connect
+
+def _engine_arguments(config, url, asyncio=False):
+    kwargs = {}
+    connect_args = {}
+
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+    if not in_memory:
+        for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle'):
+            value = _int_setting(config, key)
+            if value is not None:
+                kwargs[key] = value
+        kwargs['pool_pre_ping'] = url.get_backend_name() != 'sqlite'
+
+    statement_timeout = _int_setting(config, 'statement_timeout')
+    if statement_timeout is not None:
+        if url.get_backend_name() == 'sqlite':
+            connect_args['timeout'] = statement_timeout / 1000
+        elif url.get_backend_name() == 'postgresql' and asyncio:
+            connect_args['server_settings'] = {'statement_timeout': str(statement_timeout)}
+        elif url.get_backend_name() == 'postgresql':
+            connect_args['options'] = f"-c statement_timeout={statement_timeout}"
+    return kwargs, connect_args
+
+def build_engine(config=None):
+    """
+    Create an engine from a settings dictionary (see load_engine_config).
+
+    File-based databases get a connection pool sized by pool_size and
+    max_overflow. SQLite connections have the configured pragmas applied when
+    they are opened, and statement_timeout becomes the lock wait (busy timeout).
+    PostgreSQL connections get it as their statement_timeout.
+    """
+    config = load_engine_config() if config is None else config
+    url = make_url(config['database_url'])
+    kwargs, connect_args = _engine_arguments(config, url)
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if url.get_backend_name() == 'sqlite':
+        event.listen(engine, 'connect', _apply_sqlite_pragmas(config))
+    return engine
+
+# Async drivers used in place of the default driver of each backend
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+def build_async_engine(config=None):
+    """
+    Create an asyncio engine from the same settings as build_engine.
+
+    The database URL is switched to the backend's async driver (aiosqlite or
+    asyncpg), which must be installed. Pool sizes, timeouts and SQLite pragmas
+    are applied as for the synchronous engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    config = load_engine_config() if config is None else config
+    url = make_url(config['database_url'])
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver known for {url.get_backend_name()}")
+    url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    kwargs, connect_args = _engine_arguments(config, url, asyncio=True)
+    if 'pool_size' in kwargs:
+        # aiosqlite would otherwise open a new connection per checkout
+        kwargs['poolclass'] = AsyncAdaptedQueuePool
+
+    try:
+        engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    except ImportError:
+        raise RuntimeError(f"Async database access requires {driver} (pipenv install {driver})")
+    if url.get_backend_name() == 'sqlite':
+        event.listen(engine.sync_engine, 'connect', _apply_sqlite_pragmas(config))
+    return engine
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from . import Base
+
+class DataVersion(Base):
+    __tablename__ = 'data_versions'
+    
+    # Row holding the random id of the database instead of a counter
+    DATABASE_ID = 'database_id'
+
+    # Table the counter tracks ('policies' or 'reminders'), or DATABASE_ID
+    name = Column(String, primary_key=True)
+    # Incremented by every helper that changes the table; fixed for DATABASE_ID
+    version = Column(Integer, nullable=False, default=0)
+    changed_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<DataVersion(name='{self.name}', version={self.version})>"
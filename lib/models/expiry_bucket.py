@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Date, Float
+from . import Base
+
+class ExpiryBucket(Base):
+    __tablename__ = 'expiry_calendar'
+    
+    # First day of the month the policies' end_date falls in
+    month = Column(Date, primary_key=True)
+    policies = Column(Integer, nullable=False, default=0)
+    premium_total = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<ExpiryBucket(month='{self.month}', policies={self.policies}, premium_total={self.premium_total})>"
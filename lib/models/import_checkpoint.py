@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from . import Base
+
+class ImportCheckpoint(Base):
+    __tablename__ = 'import_checkpoints'
+    __table_args__ = (UniqueConstraint('source', 'kind'),)
+    
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    kind = Column(String, nullable=False)
+    records_done = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ImportCheckpoint(source='{self.source}', kind='{self.kind}', records_done={self.records_done})>"
@@ -9,9 +9,9 @@ class Policy(Base):
     policy_number = Column(String, unique=True, nullable=False)
     type = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
-    end_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False, index=True)
     premium_amount = Column(Float, nullable=False)
-    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
+    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False, index=True)
     insurance_company = Column(String)  # New field
     
     client = relationship("Client", back_populates="policies")
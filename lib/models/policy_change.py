@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime
+from . import Base
+
+class PolicyChange(Base):
+    __tablename__ = 'policy_changes'
+    # Ids must never be reused once processed entries are pruned
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    # Append-only log of policies added, updated or deleted since the last
+    # incremental reminder run; no foreign key so deletions can be logged
+    id = Column(Integer, primary_key=True)
+    policy_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<PolicyChange(id={self.id}, policy_id={self.policy_id}, changed_at='{self.changed_at}')>"
@@ -1,17 +1,54 @@
-from sqlalchemy import Column, Integer, Date, String, ForeignKey
+from sqlalchemy import Column, Integer, Date, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from . import Base
 
 class Reminder(Base):
     __tablename__ = 'reminders'
+
+    # Lifecycle: a reminder is created pending, may be sent and then
+    # acknowledged, and is closed as renewed (the policy has a successor) or
+    # expired (the policy ended without one). Closed reminders are final and
+    # eventually move to reminders_archive.
+    PENDING = 'pending'
+    SENT = 'sent'
+    ACKNOWLEDGED = 'acknowledged'
+    RENEWED = 'renewed'
+    EXPIRED = 'expired'
+    OPEN_STATUSES = (PENDING, SENT, ACKNOWLEDGED)
+    CLOSED_STATUSES = (RENEWED, EXPIRED)
+    # Statuses each status may move to
+    TRANSITIONS = {
+        PENDING: (SENT, ACKNOWLEDGED, RENEWED, EXPIRED),
+        SENT: (ACKNOWLEDGED, RENEWED, EXPIRED),
+        ACKNOWLEDGED: (RENEWED, EXPIRED),
+        RENEWED: (),
+        EXPIRED: (),
+    }
+    __table_args__ = (
+        # Pending-reminder lookups per policy (generate_reminders)
+        Index('ix_reminders_policy_id_status', 'policy_id', 'status'),
+        # Listing reminders by status (list_reminders)
+        Index('ix_reminders_status', 'status'),
+    )
     
     id = Column(Integer, primary_key=True)
     policy_id = Column(Integer, ForeignKey('policies.id'), nullable=False)
     reminder_date = Column(Date, nullable=False)
-    status = Column(String, default='pending')
+    status = Column(String, default=PENDING)
+    # Days before the policy's end_date of the schedule touchpoint (None for unscheduled reminders)
+    offset_days = Column(Integer)
     
     # Establish a many-to-one relationship with Policy
     policy = relationship("Policy", back_populates="reminders")
 
+    @classmethod
+    def sources(cls, status):
+        """
+        Return the statuses a reminder may move to the given status from.
+        """
+        if status not in cls.TRANSITIONS:
+            raise ValueError(f"Unknown reminder status: {status} (expected one of {', '.join(cls.TRANSITIONS)})")
+        return tuple(source for source, targets in cls.TRANSITIONS.items() if status in targets)
+
     def __repr__(self):
         return f"<Reminder(id={self.id}, policy_id={self.policy_id}, reminder_date='{self.reminder_date}', status='{self.status}')>"
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Date, DateTime, String
+from . import Base
+
+class ReminderArchive(Base):
+    __tablename__ = 'reminders_archive'
+    
+    id = Column(Integer, primary_key=True)
+    # Id the reminder had in the reminders table
+    reminder_id = Column(Integer, nullable=False, index=True)
+    # No foreign key: the history outlives deleted policies
+    policy_id = Column(Integer, nullable=False, index=True)
+    reminder_date = Column(Date, nullable=False)
+    status = Column(String, nullable=False)
+    offset_days = Column(Integer)
+    archived_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ReminderArchive(reminder_id={self.reminder_id}, policy_id={self.policy_id}, reminder_date='{self.reminder_date}', status='{self.status}')>"
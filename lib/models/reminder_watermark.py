@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from . import Base
+
+class ReminderWatermark(Base):
+    __tablename__ = 'reminder_watermarks'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    # Latest end_date already covered by a reminder run
+    horizon = Column(Date, nullable=False)
+    # Highest PolicyChange id already processed
+    last_change_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ReminderWatermark(name='{self.name}', horizon='{self.horizon}', last_change_id={self.last_change_id})>"
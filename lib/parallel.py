@@ -0,0 +1,113 @@
+from .models import Policy, get_engine_config
+from sqlalchemy import func, select
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import time
+
+# Reminder generation split across worker processes.
+#
+# The policies due in the window are partitioned either into contiguous id
+# ranges or by insurance_company. Each partition is handled by a worker with
+# its own engine and session, running the same anti-join INSERT ... SELECT as
+# generate_reminders restricted to its partition. Partitions are disjoint and
+# each insert re-checks for a pending reminder atomically, so workers never
+# create duplicates and a re-run only fills in what is missing.
+
+PARTITION_KINDS = ('id', 'company')
+
+def plan_id_shards(session, shards, days=90, today=None):
+    """
+    Split the ids of policies due within the window into contiguous ranges.
+
+    :return: List of ('id', low, high) tuples, inclusive bounds
+    """
+    today = today or datetime.now().date()
+    horizon = today + timedelta(days=days)
+    low, high = session.execute(
+        select(func.min(Policy.id), func.max(Policy.id)).where(Policy.end_date <= horizon)
+    ).one()
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // shards))
+    return [('id', start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+def plan_company_shards(session, days=90, today=None):
+    """
+    One shard per insurance company with policies due within the window.
+
+    :return: List of ('company', name) tuples; name may be None
+    """
+    today = today or datetime.now().date()
+    horizon = today + timedelta(days=days)
+    companies = session.scalars(
+        select(Policy.insurance_company).where(Policy.end_date <= horizon).distinct()
+    )
+    return [('company', company) for company in companies]
+
+def shard_filter(shard):
+    """
+    Return the SQL criterion selecting the policies of a shard.
+    """
+    if shard[0] == 'id':
+        return Policy.id.between(shard[1], shard[2])
+    if shard[0] == 'company':
+        if shard[1] is None:
+            return Policy.insurance_company.is_(None)
+        return Policy.insurance_company == shard[1]
+    raise ValueError(f"Unknown shard kind: {shard[0]}")
+
+def _init_worker(engine_config):
+    from .models import configure_engine
+
+    configure_engine(engine_config)
+
+def _generate_shard(shard, days, today):
+    from .models import Session
+    from .helpers import generate_reminders
+
+    session = Session()
+    try:
+        result = generate_reminders(session, days=days, policy_filter=shard_filter(shard), today=today)
+    finally:
+        session.close()
+    result['shard'] = shard
+    return result
+
+def generate_reminders_sharded(session, days=90, workers=4, shards=None, partition='id'):
+    """
+    Generate reminders in parallel, one process-pool task per partition.
+
+    :param session: SQLAlchemy database session, used to plan the partitions
+    :param days: Look-ahead window in days
+    :param workers: Number of worker processes
+    :param shards: Number of id ranges (defaults to workers); ignored for 'company'
+    :param partition: 'id' for contiguous id ranges or 'company' for insurance_company
+    :return: Dictionary with the total created, elapsed seconds and the per-shard results
+    """
+    if partition not in PARTITION_KINDS:
+        raise ValueError(f"Unknown partition kind: {partition}")
+    started = time.perf_counter()
+    today = datetime.now().date()
+    if partition == 'id':
+        plan = plan_id_shards(session, shards or workers, days=days, today=today)
+    else:
+        plan = plan_company_shards(session, days=days, today=today)
+    session.rollback()
+
+    results = []
+    if plan:
+        # Spawned workers start without the parent's engine or pooled connections
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(plan)), mp_context=context,
+            initializer=_init_worker, initargs=(get_engine_config(),)
+        ) as executor:
+            futures = [executor.submit(_generate_shard, shard, days, today) for shard in plan]
+            results = [future.result() for future in futures]
+
+    return {
+        'created': sum(result['created'] for result in results),
+        'elapsed': time.perf_counter() - started,
+        'shards': results,
+    }
@@ -0,0 +1,419 @@
+from .models import Policy, PolicyChange, Session, get_engine
+from .models.config import CONFIG_FILE_ENV, DEFAULT_CONFIG_FILE, ENV_PREFIX
+from . import helpers, instrumentation
+from .schedules import load_schedule
+from sqlalchemy import func, select
+from configparser import ConfigParser
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import threading
+import time
+
+# Long-running reminder scheduler.
+#
+# One process keeps the shared engine (and its connection pool) warm and runs
+# the reminder jobs on fixed intervals, one at a time, each with a session of
+# its own:
+#
+# - generate: the incremental reminder run (only policies that entered the
+#   window or changed since the last run), or with mode = scheduled the
+#   touchpoint schedule, one range of policy ids per transaction
+# - sweep: closes the open reminders of renewed policies as 'renewed', then
+#   those of policies that have ended as 'expired', chunk_size reminders per
+#   transaction
+# - archive: moves closed reminders older than archive_after_days to
+#   reminders_archive, chunk_size reminders per transaction
+#
+# Work is split into short transactions with a chunk_pause between them, so
+# interactive users never wait long for the write lock. A small HTTP server on
+# localhost reports each job's last run and the reminder backlog as JSON
+# (/health) and in the Prometheus text format (/metrics).
+#
+# Settings come from a [scheduler] section of the config file and from
+# INSURANCE_TRACKER_SCHEDULER_<SETTING> environment variables, which win:
+#
+#     [scheduler]
+#     generate_interval = 300
+#     sweep_interval = 3600
+#     archive_interval = 86400
+#     mode = incremental
+#     chunk_size = 1000
+#     chunk_pause = 0.5
+#     http_port = 8765
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_SECTION = 'scheduler'
+
+SCHEDULER_DEFAULTS = {
+    # Seconds between the starts of two runs of a job
+    'generate_interval': '300',
+    'sweep_interval': '3600',
+    'archive_interval': '86400',
+    # Age in days at which closed reminders are archived
+    'archive_after_days': '365',
+    # 'incremental' or 'scheduled'
+    'mode': 'incremental',
+    # Look-ahead window of the incremental run
+    'days': '90',
+    # Rows (sweep) or policy ids (scheduled generation) per transaction
+    'chunk_size': '1000',
+    # Seconds to wait between two transactions of a job
+    'chunk_pause': '0.5',
+    'http_host': '127.0.0.1',
+    # Empty disables the HTTP endpoint
+    'http_port': '8765',
+}
+
+GENERATE_MODES = ('incremental', 'scheduled')
+
+# Seconds between the first runs of consecutive jobs, so they do not start together
+STAGGER_SECONDS = 10
+
+def load_scheduler_config(path=None, environ=None, **overrides):
+    """
+    Load the scheduler settings as a dictionary of strings.
+
+    Precedence, lowest first: SCHEDULER_DEFAULTS, the config file,
+    environment variables, then keyword overrides (None values are ignored).
+    """
+    environ = os.environ if environ is None else environ
+    config = dict(SCHEDULER_DEFAULTS)
+    path = path or environ.get(CONFIG_FILE_ENV)
+    if path is None and os.path.exists(DEFAULT_CONFIG_FILE):
+        path = DEFAULT_CONFIG_FILE
+    if path is not None:
+        parser = ConfigParser()
+        if not parser.read(path):
+            raise RuntimeError(f"Cannot read config file {path}")
+        if parser.has_section(SCHEDULER_SECTION):
+            for key, value in parser[SCHEDULER_SECTION].items():
+                if key not in SCHEDULER_DEFAULTS:
+                    raise ValueError(f"Unknown {SCHEDULER_SECTION} setting: {key}")
+                config[key] = value
+    for key in SCHEDULER_DEFAULTS:
+        value = environ.get(f"{ENV_PREFIX}SCHEDULER_{key.upper()}")
+        if value is not None:
+            config[key] = value
+    config.update({key: str(value) for key, value in overrides.items() if value is not None})
+    if config['mode'] not in GENERATE_MODES:
+        raise ValueError(f"Unknown scheduler mode: {config['mode']} (expected one of {', '.join(GENERATE_MODES)})")
+    return config
+
+class Job:
+    """
+    A task run every interval seconds.
+
+    :param function: Callable taking a session and the stop event, returning
+        a dictionary with at least 'rows', the number of rows it changed
+    """
+
+    def __init__(self, name, interval, function, delay=0.0):
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self.next_run = time.monotonic() + delay
+        self.runs = 0
+        self.failures = 0
+        self.rows = 0
+        self.last_started = None
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+        self.last_success = None
+
+    def status(self):
+        return {
+            'interval_s': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'rows': self.rows,
+            'last_started': self.last_started,
+            'last_duration_s': self.last_duration,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+            'last_success': self.last_success,
+            'next_run_in_s': round(max(0.0, self.next_run - time.monotonic()), 3),
+        }
+
+def _pause(stop, seconds):
+    # Returns True if the scheduler is stopping
+    return stop.wait(seconds) if seconds else stop.is_set()
+
+def _policy_id_ranges(session, criteria, chunk_size):
+    low, high = session.execute(select(func.min(Policy.id), func.max(Policy.id)).where(*criteria)).one()
+    session.commit()
+    if low is None:
+        return []
+    return [(start, min(start + chunk_size - 1, high)) for start in range(low, high + 1, chunk_size)]
+
+def generate_job(config):
+    """
+    Build the reminder generation task for the configured mode.
+    """
+    days = int(config['days'])
+    chunk_size = int(config['chunk_size'])
+    chunk_pause = float(config['chunk_pause'])
+
+    def generate_incremental(session, stop):
+        result = helpers.generate_reminders_incremental(session, days=days)
+        return {'rows': result['created'], 'incremental': result['incremental']}
+
+    def generate_scheduled(session, stop):
+        schedule = load_schedule()
+        today = datetime.now().date()
+        horizon = today + timedelta(days=max(
+            max(offsets) for offsets in
+            [schedule['default'], *schedule['type'].values(), *schedule['company'].values()]
+        ))
+        ranges = _policy_id_ranges(session, [Policy.end_date >= today, Policy.end_date <= horizon], chunk_size)
+        created = 0
+        for number, (low, high) in enumerate(ranges):
+            if number and _pause(stop, chunk_pause):
+                break
+            created += helpers.generate_scheduled_reminders(
+                session, schedule, policy_filter=Policy.id.between(low, high), today=today
+            )['created']
+        return {'rows': created, 'chunks': len(ranges)}
+
+    return generate_scheduled if config['mode'] == 'scheduled' else generate_incremental
+
+def _in_chunks(stop, step, chunk_size, chunk_pause):
+    """
+    Call step() until it handles fewer than chunk_size rows or the scheduler stops.
+
+    :return: Total rows handled and the number of calls
+    """
+    total = chunks = 0
+    while True:
+        count = step()
+        total += count
+        chunks += 1
+        if count < chunk_size or _pause(stop, chunk_pause):
+            return total, chunks
+
+def sweep_job(config):
+    """
+    Build the task closing the open reminders of renewed and then of ended policies, chunk by chunk.
+    """
+    chunk_size = int(config['chunk_size'])
+    chunk_pause = float(config['chunk_pause'])
+
+    def sweep(session, stop):
+        renewed, renew_chunks = _in_chunks(
+            stop, lambda: helpers.close_renewed_reminders(session, limit=chunk_size), chunk_size, chunk_pause
+        )
+        expired, expire_chunks = (0, 0) if stop.is_set() else _in_chunks(
+            stop, lambda: helpers.expire_reminders(session, limit=chunk_size), chunk_size, chunk_pause
+        )
+        return {'rows': renewed + expired, 'renewed': renewed, 'expired': expired,
+                'chunks': renew_chunks + expire_chunks}
+
+    return sweep
+
+def archive_job(config):
+    """
+    Build the task moving old closed reminders to reminders_archive, chunk by chunk.
+    """
+    chunk_size = int(config['chunk_size'])
+    chunk_pause = float(config['chunk_pause'])
+    older_than_days = int(config['archive_after_days'])
+
+    def archive(session, stop):
+        archived, chunks = _in_chunks(
+            stop, lambda: helpers.archive_reminders(session, older_than_days, limit=chunk_size),
+            chunk_size, chunk_pause
+        )
+        return {'rows': archived, 'chunks': chunks}
+
+    return archive
+
+class Scheduler:
+    """
+    Runs jobs one at a time on the shared engine until stopped.
+    """
+
+    def __init__(self, jobs, session_factory=Session):
+        self.jobs = list(jobs)
+        self.session_factory = session_factory
+        self.started = time.time()
+        self.backlog = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopping(self):
+        return self._stop.is_set()
+
+    def run_job(self, job):
+        """
+        Run one job in a fresh session and record its outcome.
+        """
+        started = time.monotonic()
+        with self._lock:
+            job.last_started = datetime.now().isoformat(timespec='seconds')
+        session = self.session_factory()
+        try:
+            result = job.function(session, self._stop)
+            error = None
+        except Exception as e:
+            logger.exception("Scheduler job %s failed", job.name)
+            session.rollback()
+            result, error = None, str(e)
+        try:
+            backlog = self.measure_backlog(session)
+        except Exception:
+            logger.exception("Measuring the reminder backlog failed")
+            backlog = None
+        finally:
+            session.close()
+        elapsed = time.monotonic() - started
+        with self._lock:
+            job.runs += 1
+            job.last_duration = round(elapsed, 6)
+            job.last_result = result
+            job.last_error = error
+            if error is None:
+                job.rows += result.get('rows', 0)
+                job.last_success = job.last_started
+            else:
+                job.failures += 1
+            if backlog is not None:
+                self.backlog = backlog
+            # The interval runs from start to start; an overrunning job runs again at once
+            job.next_run = started + job.interval
+        logger.info("Scheduler job %s finished in %.3fs: %s", job.name, elapsed, error or result)
+
+    def measure_backlog(self, session):
+        """
+        Count the pending reminders and the policy changes the incremental run has yet to process.
+        """
+        backlog = {
+            'pending_reminders': helpers.count_pending_reminders(session),
+            'policy_changes': session.scalar(select(func.count(PolicyChange.id))),
+        }
+        session.commit()
+        return backlog
+
+    def run(self, once=False):
+        """
+        Run the jobs whenever they are due until stop() is called.
+
+        :param once: Run every job once, in order, then return
+        """
+        if once:
+            for job in self.jobs:
+                if self.stopping:
+                    break
+                self.run_job(job)
+            return
+        while not self.stopping:
+            job = min(self.jobs, key=lambda candidate: candidate.next_run)
+            wait = job.next_run - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            self.run_job(job)
+
+    def status(self):
+        """
+        Return the health report: 'ok' unless the latest run of some job failed.
+        """
+        with self._lock:
+            jobs = {job.name: job.status() for job in self.jobs}
+            backlog = dict(self.backlog)
+        return {
+            'status': 'failing' if any(job['last_error'] for job in jobs.values()) else 'ok',
+            'uptime_s': round(time.time() - self.started, 3),
+            'backlog': backlog,
+            'jobs': jobs,
+        }
+
+    def prometheus_text(self):
+        """
+        Render the job and backlog figures in the Prometheus text exposition format.
+        """
+        report = self.status()
+        lines = []
+        job_metrics = (
+            ('runs', 'runs_total', 'counter', 'Job runs'),
+            ('failures', 'failures_total', 'counter', 'Job runs that raised'),
+            ('rows', 'rows_total', 'counter', 'Rows changed by the job'),
+            ('last_duration_s', 'last_duration_seconds', 'gauge', 'Duration of the latest run'),
+        )
+        for key, suffix, kind, description in job_metrics:
+            name = f"insurance_tracker_scheduler_job_{suffix}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for job_name, job in sorted(report['jobs'].items()):
+                if job[key] is not None:
+                    lines.append(f'{name}{{job="{job_name}"}} {job[key]}')
+        for key, description in (
+            ('pending_reminders', 'Reminders still pending'),
+            ('policy_changes', 'Policy changes not yet processed by the incremental run'),
+        ):
+            if key in report['backlog']:
+                name = f"insurance_tracker_scheduler_{key}"
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {report['backlog'][key]}")
+        name = 'insurance_tracker_scheduler_uptime_seconds'
+        lines.append(f"# HELP {name} Seconds since the scheduler started")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {report['uptime_s']}")
+        text = "\n".join(lines) + "\n"
+        if instrumentation.is_enabled():
+            text += instrumentation.prometheus_text()
+        return text
+
+def build_scheduler(config=None):
+    """
+    Create a scheduler with the generate, sweep and archive jobs from the settings (see load_scheduler_config).
+    """
+    config = load_scheduler_config() if config is None else config
+    # Open the pool before the first job
+    get_engine()
+    intervals = [float(config[key]) for key in ('generate_interval', 'sweep_interval', 'archive_interval')]
+    jobs = [
+        Job(name, interval, build(config), delay=min(STAGGER_SECONDS * position, interval))
+        for position, (name, interval, build) in enumerate(zip(
+            ('generate', 'sweep', 'archive'), intervals, (generate_job, sweep_job, archive_job)
+        ))
+    ]
+    return Scheduler(jobs)
+
+def serve_status(scheduler, host='127.0.0.1', port=8765):
+    """
+    Serve /health (JSON) and /metrics (Prometheus text) for a scheduler from a daemon thread.
+
+    :return: The running server; call shutdown() to stop it
+    """
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                report = scheduler.status()
+                body = json.dumps(report, default=str).encode('utf-8')
+                status, content_type = (200 if report['status'] == 'ok' else 503), 'application/json'
+            elif self.path == '/metrics':
+                body = scheduler.prometheus_text().encode('utf-8')
+                status, content_type = 200, 'text/plain; version=0.0.4'
+            else:
+                body, status, content_type = b'Not found\n', 404, 'text/plain'
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("%s %s", self.address_string(), format % args)
+
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='scheduler-status', daemon=True).start()
+    return server
@@ -0,0 +1,72 @@
+from .models.config import CONFIG_FILE_ENV, DEFAULT_CONFIG_FILE
+from configparser import ConfigParser
+import os
+
+# Reminder schedules: the touchpoints, in days before a policy's end_date, at
+# which a reminder is due. A schedule has default offsets plus optional
+# offsets per policy type and per insurance company; a company's offsets win
+# over its policy type's, which win over the default.
+#
+# Schedules can be kept in a [reminder_schedule] section of the config file
+# (see lib.models.config):
+#
+#     [reminder_schedule]
+#     default = 90, 60, 30, 7
+#     type.Travel Insurance = 14, 3
+#     company.Britam = 60, 30, 7
+
+DEFAULT_OFFSETS = (90, 60, 30, 7)
+
+SCHEDULE_SECTION = 'reminder_schedule'
+
+def parse_offsets(value):
+    """
+    Parse day offsets given as a comma-separated string ('90, 60, 30, 7') or a sequence of integers.
+
+    :return: Tuple of distinct non-negative offsets, largest first
+    """
+    parts = value.split(',') if isinstance(value, str) else value
+    try:
+        offsets = {int(part) for part in parts if str(part).strip()}
+    except ValueError:
+        raise ValueError(f"Invalid reminder offsets: {value!r}")
+    if not offsets or min(offsets) < 0:
+        raise ValueError(f"Invalid reminder offsets: {value!r}")
+    return tuple(sorted(offsets, reverse=True))
+
+def make_schedule(default=DEFAULT_OFFSETS, by_type=None, by_company=None):
+    """
+    Build a schedule dictionary from offsets (sequences or comma-separated strings).
+    """
+    return {
+        'default': parse_offsets(default),
+        'type': {name: parse_offsets(offsets) for name, offsets in (by_type or {}).items()},
+        'company': {name: parse_offsets(offsets) for name, offsets in (by_company or {}).items()},
+    }
+
+def load_schedule(path=None, environ=None):
+    """
+    Load the reminder schedule from the config file, falling back to DEFAULT_OFFSETS.
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(CONFIG_FILE_ENV)
+    if path is None and os.path.exists(DEFAULT_CONFIG_FILE):
+        path = DEFAULT_CONFIG_FILE
+    default, by_type, by_company = DEFAULT_OFFSETS, {}, {}
+    if path is not None:
+        parser = ConfigParser()
+        # Policy types and company names are case-sensitive
+        parser.optionxform = str
+        if not parser.read(path):
+            raise RuntimeError(f"Cannot read config file {path}")
+        if parser.has_section(SCHEDULE_SECTION):
+            for key, value in parser[SCHEDULE_SECTION].items():
+                if key == 'default':
+                    default = value
+                elif key.startswith('type.'):
+                    by_type[key[len('type.'):]] = value
+                elif key.startswith('company.'):
+                    by_company[key[len('company.'):]] = value
+                else:
+                    raise ValueError(f"Unknown {SCHEDULE_SECTION} setting: {key}")
+    return make_schedule(default, by_type, by_company)
@@ -0,0 +1,220 @@
+from .models import Client, Policy
+from sqlalchemy import and_, case, column, func, inspect, literal, literal_column, or_, select, table
+from collections import namedtuple
+import re
+import time
+
+# Ranked substring search over clients and policies.
+#
+# On SQLite the FTS5 trigram tables created by the f1c7a3d95b42 migration
+# (clients_fts, policies_fts) find the rows containing every term from an
+# index. They are kept in sync by triggers on the base tables, so every write
+# path (helpers, bulk operations, importer) updates them. Other databases,
+# SQLite builds without the trigram tokenizer, and queries whose terms are
+# all shorter than a trigram fall back to LIKE.
+#
+# Matches are first read unordered, which lets the index stop as soon as it
+# has found RANK_CANDIDATES + 1 of them; when there are no more than
+# RANK_CANDIDATES, every match is ranked. Broader queries are run again with
+# the database ordering the matches before the best RANK_CANDIDATES are read:
+# by bm25 with earlier columns weighted higher on the index, by the first
+# column holding each term on the LIKE path. That costs a pass over every
+# match (about half a second for a term in every row of 300k clients), so
+# only queries too broad to rank in full pay it. Terms too short for the
+# index are tested in the same query, so they filter before the limit. The
+# candidates are then ranked here: terms found in earlier columns (a client's
+# name before their address), and at the start of a word, rank first. Policy
+# numbers are also looked up by prefix on their unique index, which answers a
+# typed number in a millisecond whatever the book size.
+
+DEFAULT_LIMIT = 20
+
+# Shortest term the trigram index can match
+MIN_TERM_LENGTH = 3
+
+# Matches ranked per query; broader queries rank the best ones as ordered by the database
+RANK_CANDIDATES = 500
+
+CLIENT_SEARCH_COLUMNS = (Client.name, Client.email, Client.phone, Client.address)
+POLICY_SEARCH_COLUMNS = (Policy.policy_number, Policy.insurance_company)
+
+# bm25 weight of each indexed column, in the order above
+CLIENT_FTS_WEIGHTS = (8.0, 4.0, 2.0, 1.0)
+POLICY_FTS_WEIGHTS = (2.0, 1.0)
+
+ClientMatch = namedtuple('ClientMatch', ['client_id', 'name', 'email', 'phone', 'address', 'score'])
+
+PolicyMatch = namedtuple(
+    'PolicyMatch',
+    ['policy_id', 'policy_number', 'insurance_company', 'type', 'end_date', 'client_id', 'client_name', 'score']
+)
+
+_fts_engines = {}
+
+def split_terms(query):
+    """
+    Split a search string into terms on whitespace and commas, e.g. 'Wanjiru, Nakuru'.
+    """
+    return [term for term in re.split(r'[\s,]+', query.strip()) if term]
+
+def fts_available(session):
+    """
+    Return True if the database has the full-text search tables.
+    """
+    engine = session.get_bind()
+    if engine not in _fts_engines:
+        _fts_engines[engine] = (
+            engine.dialect.name == 'sqlite'
+            and inspect(engine).has_table('clients_fts')
+            and inspect(engine).has_table('policies_fts')
+        )
+    return _fts_engines[engine]
+
+def _match_expression(terms):
+    # Every term must appear in some column; quoting makes FTS5 syntax characters literal
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def _like_criteria(terms, columns):
+    return and_(*[
+        or_(*[column.ilike(f"%{term}%") for column in columns])
+        for term in terms
+    ])
+
+def _like_score(terms, columns):
+    # The column part of match_score: twice the index of the first column holding each term
+    return sum(
+        case(*[(column.ilike(f"%{term}%"), index * 2) for index, column in enumerate(columns)], else_=0)
+        for term in terms
+    )
+
+def _candidates(session, statement, model, fts_name, terms, columns, weights):
+    """
+    Return the rows of a select containing every term: all of them if there
+    are at most RANK_CANDIDATES, otherwise the best RANK_CANDIDATES as far as
+    SQL can tell.
+    """
+    indexed = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    if indexed and fts_available(session):
+        fts = table(fts_name, column('rowid'))
+        fts_column = literal_column(fts_name)
+        short = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+        statement = (
+            statement.join(fts, fts.c.rowid == model.id)
+            .where(fts_column.op('MATCH')(_match_expression(indexed)))
+        )
+        if short:
+            statement = statement.where(_like_criteria(short, columns))
+        order = [func.bm25(fts_column, *[literal(weight) for weight in weights])]
+    else:
+        statement = statement.where(_like_criteria(terms, columns))
+        order = [_like_score(terms, columns), model.id]
+    rows = session.execute(statement.limit(RANK_CANDIDATES + 1)).all()
+    if len(rows) <= RANK_CANDIDATES:
+        return rows
+    return session.execute(statement.order_by(*order).limit(RANK_CANDIDATES)).all()
+
+def match_score(values, terms):
+    """
+    Score how well column values match the terms; lower is better.
+
+    Each term adds twice the index of the first column containing it, plus one
+    unless it starts a word there, so 0 means every term starts a word in the
+    first column.
+
+    :return: The score, or None if some term is in none of the columns
+    """
+    score = 0
+    for term in terms:
+        term = term.lower()
+        for index, value in enumerate(values):
+            value = (value or '').lower()
+            position = value.find(term)
+            if position >= 0:
+                word_start = position == 0 or not value[position - 1].isalnum()
+                score += index * 2 + (0 if word_start else 1)
+                break
+        else:
+            return None
+    return score
+
+def _rank(rows, terms, columns, make_match, limit):
+    """
+    Score the candidate rows and return the best limit of them.
+    """
+    ranked = []
+    for row in rows:
+        score = match_score(columns(row), terms)
+        if score is not None:
+            ranked.append(make_match(*row, score))
+    # Stable, so equal scores keep the database's order
+    ranked.sort(key=lambda match: match.score)
+    return ranked[:limit]
+
+def search_clients(session, query, limit=DEFAULT_LIMIT):
+    """
+    Find clients whose name, email, phone or address contain every term of the query.
+
+    :return: List of ClientMatch rows (client_id, name, email, phone, address, score), best match first
+    """
+    terms = split_terms(query)
+    if not terms:
+        return []
+    rows = _candidates(
+        session, select(Client.id, *CLIENT_SEARCH_COLUMNS), Client, 'clients_fts',
+        terms, CLIENT_SEARCH_COLUMNS, CLIENT_FTS_WEIGHTS
+    )
+    return _rank(rows, terms, lambda row: row[1:5], ClientMatch, limit)
+
+def _policy_columns():
+    return (
+        Policy.id, Policy.policy_number, Policy.insurance_company, Policy.type,
+        Policy.end_date, Policy.client_id, Client.name
+    )
+
+def _policy_number_prefix(term):
+    # A range on the unique index; LIKE 'x%' cannot use it where LIKE ignores case
+    return and_(Policy.policy_number >= term, Policy.policy_number < term + '\U0010ffff')
+
+def search_policies(session, query, limit=DEFAULT_LIMIT):
+    """
+    Find policies whose policy number or insurance company contain every term of the query.
+
+    A single term that starts one or more policy numbers returns those
+    policies, in policy number order, from the index on policy_number.
+    Otherwise matches are ranked as in search_clients.
+
+    :return: List of PolicyMatch rows (policy_id, policy_number, insurance_company, type, end_date, client_id, client_name, score)
+    """
+    terms = split_terms(query)
+    if not terms:
+        return []
+    if len(terms) == 1:
+        prefixes = {terms[0], terms[0].upper()}
+        numbered = session.execute(
+            select(*_policy_columns())
+            .join(Client, Policy.client_id == Client.id)
+            .where(or_(*[_policy_number_prefix(prefix) for prefix in prefixes]))
+            .order_by(Policy.policy_number)
+            .limit(limit)
+        ).all()
+        if numbered:
+            return [PolicyMatch(*row, 0) for row in numbered]
+
+    rows = _candidates(
+        session, select(*_policy_columns()).join(Client, Policy.client_id == Client.id), Policy, 'policies_fts',
+        terms, POLICY_SEARCH_COLUMNS, POLICY_FTS_WEIGHTS
+    )
+    return _rank(rows, terms, lambda row: row[1:3], PolicyMatch, limit)
+
+def search(session, query, limit=DEFAULT_LIMIT):
+    """
+    Search clients and policies at once.
+
+    :return: Dictionary with the matching 'clients' and 'policies' and the elapsed seconds
+    """
+    started = time.perf_counter()
+    return {
+        'clients': search_clients(session, query, limit),
+        'policies': search_policies(session, query, limit),
+        'elapsed': time.perf_counter() - started,
+    }
@@ -0,0 +1,487 @@
+from .models import Policy, Reminder
+from .helpers import get_data_versions, get_database_id
+from sqlalchemy import func, select
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+# Compact, read-only snapshots of the policy book for batch jobs.
+#
+# A PolicySnapshot holds one typed array per column instead of one ORM object
+# per policy: ids and dates as integers (dates as proleptic ordinals),
+# premiums as doubles and the type and insurance company as codes into small
+# dictionaries of the distinct values. That is about 28 bytes per policy, so a
+# 3M policy book fits in under 100 MB where ORM objects need gigabytes.
+# A ReminderSnapshot does the same for reminders.
+#
+# Rows are loaded with one streaming query ordered by date (end_date,
+# reminder_date), so the date column is sorted and windows are found by
+# bisection. Filters compare integer codes, and rows are only decoded into
+# named tuples when the caller asks for them.
+#
+# Snapshots can also be saved to a file (write_snapshot) and memory-mapped by
+# later processes (open_snapshot, load_snapshot). The columns are then
+# memoryviews straight over the file's pages, so opening costs a header read
+# whatever the book size, and concurrent processes share the page cache. The
+# file records the database id and the data-version counters it was built at
+# (see bump_data_version in lib/helpers.py); load_snapshot rebuilds it once
+# the database has moved on or is a different database altogether.
+
+# Rows fetched per round trip while loading
+CHUNK_SIZE = 10000
+
+SNAPSHOT_PATH_ENV = 'INSURANCE_TRACKER_SNAPSHOT_PATH'
+
+# File layout: magic, header length, JSON header, then the column buffers, 8-byte aligned
+SNAPSHOT_MAGIC = b'ITSNAP\x00\x00'
+SNAPSHOT_FORMAT = 2
+_HEADER_LENGTH = struct.Struct('<I')
+_ALIGNMENT = 8
+
+SnapshotPolicy = namedtuple(
+    'SnapshotPolicy', ['id', 'client_id', 'type', 'insurance_company', 'start_date', 'end_date', 'premium_amount']
+)
+
+SnapshotReminder = namedtuple(
+    'SnapshotReminder', ['id', 'policy_id', 'reminder_date', 'status', 'offset_days']
+)
+
+def _id_typecode(maximum):
+    # 32-bit ids unless the table has outgrown them
+    return 'i' if (maximum or 0) < 2 ** 31 else 'q'
+
+def _ordinal(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+def _stream(session, statement, chunk_size):
+    for partition in session.execute(statement.execution_options(yield_per=chunk_size)).partitions():
+        yield from partition
+
+class _ColumnSnapshot:
+    """
+    Equal-length column sequences (arrays, or memoryviews over a snapshot file), sorted by DATE_COLUMN.
+    """
+
+    DATE_COLUMN = None
+
+    def __init__(self, columns, dictionaries):
+        self.columns = columns
+        self.dictionaries = {name: list(values) for name, values in dictionaries.items()}
+        self._codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.dictionaries.items()
+        }
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    @property
+    def nbytes(self):
+        """
+        Bytes held by the column arrays.
+        """
+        return sum(len(column) * column.itemsize for column in self.columns.values())
+
+    def window(self, start=None, end=None):
+        """
+        Return the range of positions whose date lies between start and end inclusive (either bound optional).
+        """
+        dates = self.columns[self.DATE_COLUMN]
+        low = 0 if start is None else bisect_left(dates, _ordinal(start))
+        high = len(dates) if end is None else bisect_right(dates, _ordinal(end), low)
+        return range(low, high)
+
+    def _filter(self, positions, column, value):
+        values = self.columns[column]
+        return [position for position in positions if values[position] == value]
+
+    def _filter_code(self, positions, dictionary, column, value):
+        code = self._codes[dictionary].get(value)
+        if code is None:
+            return []
+        return self._filter(positions, column, code)
+
+    def rows(self, positions=None):
+        """
+        Yield decoded rows for the given positions (every row if None).
+        """
+        for position in range(len(self)) if positions is None else positions:
+            yield self.row(position)
+
+class PolicySnapshot(_ColumnSnapshot):
+    """
+    Column arrays of every policy, sorted by end_date.
+
+    :param columns: Dictionary of equal-length sequences: id, client_id,
+        start_date, end_date, premium_amount, type_code and company_code
+    :param dictionaries: 'types' and 'companies', the value of each code
+        (None for policies without an insurance company)
+    """
+
+    DATE_COLUMN = 'end_date'
+
+    @classmethod
+    def load(cls, session, chunk_size=CHUNK_SIZE):
+        """
+        Build a snapshot from the policies table with one streaming query.
+        """
+        columns = {
+            'id': array(_id_typecode(session.scalar(select(func.max(Policy.id))))),
+            'client_id': array(_id_typecode(session.scalar(select(func.max(Policy.client_id))))),
+            'start_date': array('i'),
+            'end_date': array('i'),
+            'premium_amount': array('d'),
+            'type_code': array('H'),
+            'company_code': array('H'),
+        }
+        type_codes, company_codes = {}, {}
+        statement = (
+            select(
+                Policy.id, Policy.client_id, Policy.start_date, Policy.end_date,
+                Policy.premium_amount, Policy.type, Policy.insurance_company
+            )
+            .order_by(Policy.end_date, Policy.id)
+        )
+        for policy_id, client_id, start_date, end_date, premium, policy_type, company in \
+                _stream(session, statement, chunk_size):
+            columns['id'].append(policy_id)
+            columns['client_id'].append(client_id)
+            columns['start_date'].append(_ordinal(start_date))
+            columns['end_date'].append(_ordinal(end_date))
+            columns['premium_amount'].append(premium)
+            columns['type_code'].append(type_codes.setdefault(policy_type, len(type_codes)))
+            columns['company_code'].append(company_codes.setdefault(company, len(company_codes)))
+        # The read transaction is not needed once the rows are in memory
+        session.commit()
+        return cls(columns, {'types': list(type_codes), 'companies': list(company_codes)})
+
+    @property
+    def types(self):
+        return self.dictionaries['types']
+
+    @property
+    def companies(self):
+        return self.dictionaries['companies']
+
+    def expiring(self, days=90, today=None):
+        """
+        Return the positions of policies expiring within the specified number of days.
+
+        Uses the same rule as get_expiring_policies: every policy whose end_date
+        is no later than today + days, including those already expired.
+        """
+        horizon = (today or datetime.now().date()) + timedelta(days=days)
+        return self.window(end=horizon)
+
+    def select(self, start=None, end=None, type=None, insurance_company=None, client_id=None, min_premium=None):
+        """
+        Return the positions of policies in an end_date window matching every given filter.
+
+        :param start: Earliest end_date
+        :param end: Latest end_date
+        :param type: Policy type
+        :param insurance_company: Insurance company
+        :param client_id: Owning client
+        :param min_premium: Smallest premium_amount
+        :return: List of positions, in end_date order
+        """
+        positions = self.window(start, end)
+        if type is not None:
+            positions = self._filter_code(positions, 'types', 'type_code', type)
+        if insurance_company is not None:
+            positions = self._filter_code(positions, 'companies', 'company_code', insurance_company)
+        if client_id is not None:
+            positions = self._filter(positions, 'client_id', client_id)
+        if min_premium is not None:
+            premiums = self.columns['premium_amount']
+            positions = [position for position in positions if premiums[position] >= min_premium]
+        return list(positions)
+
+    def row(self, position):
+        """
+        Decode the policy at a position into a SnapshotPolicy.
+        """
+        columns = self.columns
+        return SnapshotPolicy(
+            columns['id'][position],
+            columns['client_id'][position],
+            self.types[columns['type_code'][position]],
+            self.companies[columns['company_code'][position]],
+            date.fromordinal(columns['start_date'][position]),
+            date.fromordinal(columns['end_date'][position]),
+            columns['premium_amount'][position],
+        )
+
+    def premium_total(self, positions=None):
+        """
+        Sum the premiums of the policies at the given positions (every policy if None).
+        """
+        premiums = self.columns['premium_amount']
+        if positions is None:
+            return sum(premiums)
+        if isinstance(positions, range) and positions.step == 1:
+            return sum(premiums[positions.start:positions.stop])
+        return sum(premiums[position] for position in positions)
+
+    def totals_by(self, key, positions=None):
+        """
+        Count policies and sum premiums per 'type' or 'insurance_company'.
+
+        :return: Dictionary of value to (policies, premium_total)
+        """
+        if key == 'type':
+            codes, names = self.columns['type_code'], self.types
+        elif key == 'insurance_company':
+            codes, names = self.columns['company_code'], self.companies
+        else:
+            raise ValueError(f"Unknown grouping: {key}")
+        counts = [0] * len(names)
+        totals = [0.0] * len(names)
+        premiums = self.columns['premium_amount']
+        for position in range(len(self)) if positions is None else positions:
+            code = codes[position]
+            counts[code] += 1
+            totals[code] += premiums[position]
+        return {names[code]: (counts[code], totals[code]) for code in range(len(names)) if counts[code]}
+
+class ReminderSnapshot(_ColumnSnapshot):
+    """
+    Column arrays of every reminder, sorted by reminder_date.
+
+    :param columns: Dictionary of equal-length sequences: id, policy_id,
+        reminder_date, status_code and offset_days (-1 for unscheduled reminders)
+    :param dictionaries: 'statuses', the value of each status code
+    """
+
+    DATE_COLUMN = 'reminder_date'
+
+    @classmethod
+    def load(cls, session, chunk_size=CHUNK_SIZE):
+        """
+        Build a snapshot from the reminders table with one streaming query.
+        """
+        columns = {
+            'id': array(_id_typecode(session.scalar(select(func.max(Reminder.id))))),
+            'policy_id': array(_id_typecode(session.scalar(select(func.max(Reminder.policy_id))))),
+            'reminder_date': array('i'),
+            'status_code': array('H'),
+            'offset_days': array('i'),
+        }
+        status_codes = {}
+        statement = (
+            select(Reminder.id, Reminder.policy_id, Reminder.reminder_date, Reminder.status, Reminder.offset_days)
+            .order_by(Reminder.reminder_date, Reminder.id)
+        )
+        for reminder_id, policy_id, reminder_date, status, offset_days in _stream(session, statement, chunk_size):
+            columns['id'].append(reminder_id)
+            columns['policy_id'].append(policy_id)
+            columns['reminder_date'].append(_ordinal(reminder_date))
+            columns['status_code'].append(status_codes.setdefault(status, len(status_codes)))
+            columns['offset_days'].append(-1 if offset_days is None else offset_days)
+        session.commit()
+        return cls(columns, {'statuses': list(status_codes)})
+
+    @property
+    def statuses(self):
+        return self.dictionaries['statuses']
+
+    def select(self, start=None, end=None, status=None, policy_id=None):
+        """
+        Return the positions of reminders in a reminder_date window matching every given filter.
+        """
+        positions = self.window(start, end)
+        if status is not None:
+            positions = self._filter_code(positions, 'statuses', 'status_code', status)
+        if policy_id is not None:
+            positions = self._filter(positions, 'policy_id', policy_id)
+        return list(positions)
+
+    def row(self, position):
+        """
+        Decode the reminder at a position into a SnapshotReminder.
+        """
+        columns = self.columns
+        offset_days = columns['offset_days'][position]
+        return SnapshotReminder(
+            columns['id'][position],
+            columns['policy_id'][position],
+            date.fromordinal(columns['reminder_date'][position]),
+            self.statuses[columns['status_code'][position]],
+            None if offset_days < 0 else offset_days,
+        )
+
+# Snapshot Files
+
+SNAPSHOT_TABLES = {'policies': PolicySnapshot, 'reminders': ReminderSnapshot}
+
+class SnapshotFile:
+    """
+    A memory-mapped snapshot file: the policies and reminders snapshots and
+    the database id and data versions they were built at.
+
+    Close it (or use it as a context manager) to unmap the file.
+    """
+
+    def __init__(self, path, mapping, header, views):
+        self.path = path
+        self.database_id = header['database_id']
+        self.versions = header['versions']
+        self.created_at = header['created_at']
+        self._mapping = mapping
+        self._views = views
+        for table, snapshot_class in SNAPSHOT_TABLES.items():
+            section = header[table]
+            columns = {name: views[(table, name)] for name in section['columns']}
+            setattr(self, table, snapshot_class(columns, section['dictionaries']))
+
+    def is_current(self, session):
+        """
+        Return whether the snapshot was built from the session's database at its current data versions.
+        """
+        return self.database_id == get_database_id(session) and self.versions == get_data_versions(session)
+
+    def close(self):
+        # Every view over the mapping must be released before it can be unmapped
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def snapshot_path(session):
+    """
+    Return where the snapshot file of the session's database lives.
+
+    INSURANCE_TRACKER_SNAPSHOT_PATH wins; a SQLite database keeps its snapshot
+    next to the database file, other databases in the temporary directory.
+    """
+    if os.environ.get(SNAPSHOT_PATH_ENV):
+        return os.environ[SNAPSHOT_PATH_ENV]
+    url = session.get_bind().url
+    if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:':
+        return f"{url.database}.snapshot"
+    name = zlib.crc32(url.render_as_string(hide_password=True).encode())
+    return os.path.join(tempfile.gettempdir(), f"insurance_tracker-{name:08x}.snapshot")
+
+def _padding(offset):
+    return -offset % _ALIGNMENT
+
+def write_snapshot(session, path=None, chunk_size=CHUNK_SIZE):
+    """
+    Load the policies and reminders and save them as a snapshot file.
+
+    The data versions are read before the rows, so a write that lands while
+    the snapshot is built leaves it marked stale rather than current. The file
+    is written under a temporary name and renamed into place, so processes
+    that have the old file mapped keep reading it undisturbed.
+
+    :return: Path of the snapshot file
+    """
+    path = path or snapshot_path(session)
+    database_id = get_database_id(session)
+    versions = get_data_versions(session)
+    snapshots = {table: snapshot_class.load(session, chunk_size) for table, snapshot_class in SNAPSHOT_TABLES.items()}
+
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'byteorder': sys.byteorder,
+        'database_id': database_id,
+        'versions': versions,
+        'created_at': datetime.now().isoformat(),
+    }
+    buffers = []
+    offset = 0
+    for table, snapshot in snapshots.items():
+        columns = {}
+        for name, column in snapshot.columns.items():
+            offset += _padding(offset)
+            columns[name] = [column.typecode, offset, len(column) * column.itemsize]
+            buffers.append((offset, column))
+            offset += len(column) * column.itemsize
+        header[table] = {'rows': len(snapshot), 'columns': columns, 'dictionaries': snapshot.dictionaries}
+    encoded = json.dumps(header).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.')
+    try:
+        with os.fdopen(descriptor, 'wb') as handle:
+            handle.write(SNAPSHOT_MAGIC)
+            handle.write(_HEADER_LENGTH.pack(len(encoded)))
+            handle.write(encoded)
+            data_start = handle.tell() + _padding(handle.tell())
+            for offset, column in buffers:
+                handle.write(b'\0' * (data_start + offset - handle.tell()))
+                column.tofile(handle)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return path
+
+def open_snapshot(path):
+    """
+    Memory-map a snapshot file; its columns are read straight from the mapped pages.
+
+    :raises ValueError: If the file is not a snapshot of this format
+    """
+    with open(path, 'rb') as handle:
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    views = {}
+    try:
+        if mapping[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        start = len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size
+        header_length, = _HEADER_LENGTH.unpack_from(mapping, len(SNAPSHOT_MAGIC))
+        header = json.loads(mapping[start:start + header_length].decode('utf-8'))
+        if header.get('format') != SNAPSHOT_FORMAT or header.get('byteorder') != sys.byteorder:
+            raise ValueError(f"{path} was written in an incompatible snapshot format")
+        data_start = start + header_length + _padding(start + header_length)
+        views['file'] = memoryview(mapping)
+        for table in SNAPSHOT_TABLES:
+            for name, (typecode, offset, nbytes) in header[table]['columns'].items():
+                begin = data_start + offset
+                views[(table, name)] = views['file'][begin:begin + nbytes].cast(typecode)
+        return SnapshotFile(path, mapping, header, views)
+    except Exception:
+        for view in views.values():
+            view.release()
+        mapping.close()
+        raise
+
+def load_snapshot(session, path=None):
+    """
+    Open the snapshot file if it was built from this database at the current
+    data versions, rebuilding it first if not.
+
+    :return: An open SnapshotFile
+    """
+    path = path or snapshot_path(session)
+    try:
+        snapshot = open_snapshot(path)
+    except (OSError, ValueError):
+        snapshot = None
+    if snapshot is not None:
+        if snapshot.is_current(session):
+            return snapshot
+        snapshot.close()
+    write_snapshot(session, path)
+    return open_snapshot(path)
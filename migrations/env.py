@@ -2,7 +2,7 @@ import sys
 import os
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import create_engine
 from sqlalchemy import pool
 
 from alembic import context
@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 # Import your models
 from lib.models import Base
+from lib.models.config import load_engine_config
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,16 +23,31 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# The database URL comes from the caller (lib.models.upgrade_schema), then the
+# application's environment/config file settings, then sqlalchemy.url above
+database_url = config.attributes.get('database_url') or load_engine_config(
+    defaults={'database_url': config.get_main_option("sqlalchemy.url")}
+)['database_url']
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Full-text search tables (and their FTS5 shadow tables) are created by raw
+# SQL in a migration and are not part of the models
+FTS_TABLES = ('clients_fts', 'policies_fts')
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith(FTS_TABLES):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=database_url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -41,15 +57,12 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = create_engine(database_url, poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -19,12 +19,11 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    columns = [column['name'] for column in sa.inspect(op.get_bind()).get_columns('policies')]
+    if 'insurance_company' not in columns:
+        op.add_column('policies', sa.Column('insurance_company', sa.String(), nullable=True))
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    with op.batch_alter_table('policies') as batch_op:
+        batch_op.drop_column('insurance_company')
@@ -0,0 +1,32 @@
+"""Add indexes for expiry, reminder and client lookups
+
+Revision ID: 3b7e1f2a9c41
+Revises: 8299766fd9e0
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1f2a9c41'
+down_revision: Union[str, None] = '8299766fd9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_policies_end_date', 'policies', ['end_date'], if_not_exists=True)
+    op.create_index('ix_policies_client_id', 'policies', ['client_id'], if_not_exists=True)
+    op.create_index('ix_reminders_policy_id_status', 'reminders', ['policy_id', 'status'], if_not_exists=True)
+    op.create_index('ix_reminders_status', 'reminders', ['status'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminders_status', table_name='reminders', if_exists=True)
+    op.drop_index('ix_reminders_policy_id_status', table_name='reminders', if_exists=True)
+    op.drop_index('ix_policies_client_id', table_name='policies', if_exists=True)
+    op.drop_index('ix_policies_end_date', table_name='policies', if_exists=True)
@@ -0,0 +1,44 @@
+"""Add policy_changes and reminder_watermarks tables
+
+Revision ID: 5e92a0c7d3b8
+Revises: c41d8e5f0a27
+Create Date: 2026-10-17 13:40:27.903512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e92a0c7d3b8'
+down_revision: Union[str, None] = 'c41d8e5f0a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'policy_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('policy_id', sa.Integer(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+    op.create_table(
+        'reminder_watermarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('horizon', sa.Date(), nullable=False),
+        sa.Column('last_change_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reminder_watermarks')
+    op.drop_table('policy_changes')
@@ -0,0 +1,47 @@
+"""Add expiry_calendar table
+
+Revision ID: 9a4d6e2c1f70
+Revises: 5e92a0c7d3b8
+Create Date: 2026-10-17 16:12:05.418263
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d6e2c1f70'
+down_revision: Union[str, None] = '5e92a0c7d3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    expiry_calendar = op.create_table(
+        'expiry_calendar',
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('policies', sa.Integer(), nullable=False),
+        sa.Column('premium_total', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('month'),
+    )
+
+    # Fill the calendar from the existing policies
+    policies = sa.table('policies', sa.column('end_date', sa.Date()), sa.column('premium_amount', sa.Float()))
+    year = sa.extract('year', policies.c.end_date)
+    month = sa.extract('month', policies.c.end_date)
+    rows = op.get_bind().execute(
+        sa.select(year, month, sa.func.count(), sa.func.sum(policies.c.premium_amount)).group_by(year, month)
+    )
+    buckets = [
+        {'month': date(int(y), int(m), 1), 'policies': count, 'premium_total': total or 0.0}
+        for y, m, count, total in rows
+    ]
+    if buckets:
+        op.bulk_insert(expiry_calendar, buckets)
+
+
+def downgrade() -> None:
+    op.drop_table('expiry_calendar')
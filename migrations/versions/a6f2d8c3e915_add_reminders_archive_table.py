@@ -0,0 +1,40 @@
+"""Add reminders_archive table
+
+Revision ID: a6f2d8c3e915
+Revises: b2e8c4a6d913
+Create Date: 2026-10-17 19:21:08.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f2d8c3e915'
+down_revision: Union[str, None] = 'b2e8c4a6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminders_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reminder_id', sa.Integer(), nullable=False),
+        sa.Column('policy_id', sa.Integer(), nullable=False),
+        sa.Column('reminder_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('offset_days', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_reminders_archive_reminder_id', 'reminders_archive', ['reminder_id'])
+    op.create_index('ix_reminders_archive_policy_id', 'reminders_archive', ['policy_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminders_archive_policy_id', table_name='reminders_archive')
+    op.drop_index('ix_reminders_archive_reminder_id', table_name='reminders_archive')
+    op.drop_table('reminders_archive')
@@ -0,0 +1,39 @@
+"""Add data_versions table
+
+Revision ID: b2e8c4a6d913
+Revises: f1c7a3d95b42
+Create Date: 2026-10-17 18:04:27.512390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import secrets
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8c4a6d913'
+down_revision: Union[str, None] = 'f1c7a3d95b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    data_versions = op.create_table(
+        'data_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(data_versions, [
+        {'name': 'policies', 'version': 0, 'changed_at': None},
+        {'name': 'reminders', 'version': 0, 'changed_at': None},
+        # Random id of this database, so snapshots of another database are never taken as current
+        {'name': 'database_id', 'version': secrets.randbelow(2 ** 31 - 1) + 1, 'changed_at': None},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
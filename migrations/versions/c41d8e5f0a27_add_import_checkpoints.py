@@ -0,0 +1,37 @@
+"""Add import_checkpoints table
+
+Revision ID: c41d8e5f0a27
+Revises: 3b7e1f2a9c41
+Create Date: 2026-10-17 10:03:11.542871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e5f0a27'
+down_revision: Union[str, None] = '3b7e1f2a9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'import_checkpoints' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'import_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('records_done', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source', 'kind'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_checkpoints')
@@ -0,0 +1,29 @@
+"""Add offset_days to Reminder
+
+Revision ID: d83b5f1a7e26
+Revises: 9a4d6e2c1f70
+Create Date: 2026-10-17 16:58:41.630927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83b5f1a7e26'
+down_revision: Union[str, None] = '9a4d6e2c1f70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = [column['name'] for column in sa.inspect(op.get_bind()).get_columns('reminders')]
+    if 'offset_days' not in columns:
+        op.add_column('reminders', sa.Column('offset_days', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reminders') as batch_op:
+        batch_op.drop_column('offset_days')
@@ -19,12 +19,43 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases created by the old import-time create_all already have the tables
+    if sa.inspect(op.get_bind()).has_table('clients'):
+        return
+    op.create_table(
+        'clients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'policies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('policy_number', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('premium_amount', sa.Float(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('policy_number'),
+    )
+    op.create_table(
+        'reminders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('policy_id', sa.Integer(), nullable=False),
+        sa.Column('reminder_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['policy_id'], ['policies.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table('reminders')
+    op.drop_table('policies')
+    op.drop_table('clients')
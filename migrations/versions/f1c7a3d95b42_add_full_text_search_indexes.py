@@ -0,0 +1,80 @@
+"""Add full-text search indexes for clients and policies
+
+Revision ID: f1c7a3d95b42
+Revises: d83b5f1a7e26
+Create Date: 2026-10-17 17:31:09.254118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a3d95b42'
+down_revision: Union[str, None] = 'd83b5f1a7e26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# External-content FTS5 tables with the trigram tokenizer, so any substring of
+# three or more characters matches. Triggers keep them in step with every
+# write to the base tables. Only SQLite builds with FTS5 and the trigram
+# tokenizer (3.34 and later) get them; search falls back to LIKE otherwise.
+FTS_TABLES = {
+    'clients_fts': ('clients', ('name', 'email', 'phone', 'address')),
+    'policies_fts': ('policies', ('policy_number', 'insurance_company')),
+}
+
+
+def _fts5_available(bind) -> bool:
+    if bind.dialect.name != 'sqlite':
+        return False
+    options = [row[0] for row in bind.exec_driver_sql("PRAGMA compile_options")]
+    if 'ENABLE_FTS5' not in options:
+        return False
+    # The trigram tokenizer is newer than FTS5 itself
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp.fts_trigram_probe USING fts5(probe, tokenize='trigram')")
+    except sa.exc.DBAPIError:
+        return False
+    bind.exec_driver_sql("DROP TABLE temp.fts_trigram_probe")
+    return True
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _fts5_available(bind):
+        return
+    for fts_table, (table, columns) in FTS_TABLES.items():
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+            f"{column_list}, content='{table}', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        )
+        # Index the rows that already exist
+        op.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for fts_table in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts_table}")
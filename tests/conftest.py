@@ -0,0 +1,46 @@
+from datetime import date
+import pytest
+
+from lib import cache
+from lib.helpers import add_client, add_policy
+from lib.models import Session, configure_engine, upgrade_schema
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """
+    URL of a freshly migrated SQLite database, also set as the configured database.
+    """
+    # Keep any insurance_tracker.ini in the working directory out of the tests
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('INSURANCE_TRACKER_CONFIG', raising=False)
+    monkeypatch.delenv('INSURANCE_TRACKER_SNAPSHOT_PATH', raising=False)
+    url = f"sqlite:///{tmp_path / 'tracker.db'}"
+    monkeypatch.setenv('INSURANCE_TRACKER_DATABASE_URL', url)
+    upgrade_schema(url)
+    return url
+
+@pytest.fixture
+def session(database_url):
+    configure_engine(database_url=database_url)
+    cache.configure_cache(cache.MemoryCache())
+    session = Session()
+    yield session
+    session.close()
+
+@pytest.fixture
+def make_policy(session):
+    """
+    Add a policy (and, unless client_id is given, a client for it) with sensible defaults.
+    """
+    numbers = iter(range(1, 1000000))
+
+    def make(client_id=None, start_date=date(2026, 1, 1), end_date=date(2027, 1, 1),
+             policy_type='Motor Vehicle Insurance', premium_amount=1000.0, insurance_company='Jubilee'):
+        if client_id is None:
+            client_id = add_client(session, 'Amina Otieno', 'amina@example.com', '0712345678', 'Nairobi').id
+        return add_policy(
+            session, client_id, f"POL-{next(numbers):06d}", policy_type,
+            start_date, end_date, premium_amount, insurance_company
+        )
+
+    return make
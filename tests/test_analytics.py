@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import pytest
+
+from lib.analytics import client_concentration, premium_at_risk, premium_percentiles, renewal_report
+from lib.helpers import add_client
+
+TODAY = date(2026, 10, 1)
+
+@pytest.fixture
+def book(session, make_policy):
+    """
+    Two clients: one with 1000 and 3000 expiring in October and November, one with 6000 in December
+    (and 100 later); returns the second client's id.
+    """
+    first = make_policy(end_date=date(2026, 10, 15), premium_amount=1000.0, insurance_company='Jubilee')
+    make_policy(
+        client_id=first.client_id, end_date=date(2026, 11, 15), premium_amount=3000.0,
+        insurance_company='Britam', policy_type='Health Insurance'
+    )
+    other = add_client(session, 'Brian Kamau', 'brian@example.com', '0722000000', 'Kisumu')
+    make_policy(client_id=other.id, end_date=date(2026, 12, 15), premium_amount=6000.0, insurance_company='Jubilee')
+    # Outside a 90-day window
+    make_policy(client_id=other.id, end_date=date(2027, 6, 1), premium_amount=100.0, insurance_company='Jubilee')
+    return other.id
+
+def test_premium_at_risk_groups_in_the_database(session, book):
+    by_month = premium_at_risk(session, 'month', days=90, today=TODAY)
+    by_company = premium_at_risk(session, 'company', days=90, today=TODAY)
+
+    assert [(group['month'], group['policies'], group['premium_total']) for group in by_month] == [
+        ('2026-10', 1, 1000.0), ('2026-11', 1, 3000.0), ('2026-12', 1, 6000.0)
+    ]
+    assert [(group['insurance_company'], group['premium_total']) for group in by_company] == [
+        ('Britam', 3000.0), ('Jubilee', 7000.0)
+    ]
+    with pytest.raises(ValueError):
+        premium_at_risk(session, 'region')
+
+def test_percentiles_interpolate_between_ranks(session, book):
+    stats = premium_percentiles(session, percentiles=(50, 90), days=90, today=TODAY)
+
+    assert stats == {'count': 3, 'mean': 3333.33, 'min': 1000.0, 'max': 6000.0, 'p50': 3000.0, 'p90': 5400.0}
+    assert premium_percentiles(session, days=1, today=TODAY) == {'count': 0}
+
+def test_concentration_reports_the_top_share_and_hhi(session, book):
+    stats = client_concentration(session, top=1)
+
+    # Shares 4000 / 10100 and 6100 / 10100
+    assert (stats['clients'], stats['premium_total']) == (2, 10100.0)
+    assert stats['top_share'] == round(6100 / 10100, 4)
+    assert stats['hhi'] == round((4000 / 101) ** 2 + (6100 / 101) ** 2, 2)
+    assert stats['top_clients'] == [{'client_id': book, 'premium_total': 6100.0}]
+
+def test_report_combines_every_section(session, book):
+    report = renewal_report(session, days=90, top=2, today=TODAY)
+
+    assert len(report['by_type']) == 2
+    assert report['premium_percentiles']['count'] == 3
+    assert len(report['client_concentration']['top_clients']) == 2
+    assert report['renewal_rates']['overall'] == {'expired': 0, 'renewed': 0, 'rate': None}
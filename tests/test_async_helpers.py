@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+import asyncio
+import io
+import json
+
+import pytest
+
+# The async engine needs SQLAlchemy's asyncio extra and the aiosqlite driver
+pytest.importorskip('greenlet')
+pytest.importorskip('aiosqlite')
+
+from lib import async_helpers
+from lib.helpers import generate_reminders, get_data_versions, list_reminders, transition_reminders
+from lib.models import Reminder, get_engine_config, upgrade_schema
+
+TODAY = date.today()
+
+def _run(coroutine):
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            # Each test has its own database, so the shared engine must not outlive it
+            await async_helpers.dispose_async_engine()
+    return asyncio.run(run())
+
+@pytest.fixture
+def pending(session, make_policy):
+    policies = [make_policy(end_date=TODAY + timedelta(days=10)) for _ in range(5)]
+    generate_reminders(session, today=TODAY)
+    return [reminder.id for reminder in list_reminders(session)], policies
+
+def test_reminders_are_read_page_by_page(session, pending):
+    reminder_ids, _ = pending
+
+    async def read():
+        session = await async_helpers.open_session()
+        try:
+            return [row.reminder_id async for row in async_helpers.iter_reminders_async(session, page_size=2)]
+        finally:
+            await session.close()
+
+    assert _run(read()) == reminder_ids
+
+def test_expiring_policies_are_streamed(session, pending):
+    _, policies = pending
+
+    async def read():
+        session = await async_helpers.open_session()
+        try:
+            return [row.policy_id async for row in async_helpers.iter_expiring_policies_async(session, 30, page_size=2)]
+        finally:
+            await session.close()
+
+    assert _run(read()) == [policy.id for policy in policies]
+
+def test_dispatch_marks_delivered_reminders_sent(session, pending):
+    reminder_ids, _ = pending
+    sink = async_helpers.MemorySink(fail_ids=reminder_ids[:1])
+
+    stats = _run(async_helpers.dispatch_reminders(sink, concurrency=2, batch_size=2, page_size=2))
+
+    assert (stats['delivered'], stats['failed'], stats['marked_sent']) == (4, 1, 4)
+    session.expire_all()
+    assert {reminder.id: reminder.status for reminder in session.query(Reminder)} == {
+        reminder_ids[0]: Reminder.PENDING, **{id: Reminder.SENT for id in reminder_ids[1:]}
+    }
+    assert get_data_versions(session)['reminders'] >= 2
+
+def test_closed_reminders_are_not_marked_sent(session, pending):
+    reminder_ids, _ = pending
+    transition_reminders(session, Reminder.EXPIRED, reminder_ids=reminder_ids[:2])
+
+    async def mark():
+        session = await async_helpers.open_session()
+        try:
+            return await async_helpers.mark_reminders(session, reminder_ids, batch_size=2)
+        finally:
+            await session.close()
+
+    assert _run(mark()) == 3
+
+def test_jsonl_sink_writes_one_line_per_reminder(session, pending):
+    handle = io.StringIO()
+
+    stats = _run(async_helpers.dispatch_reminders(async_helpers.JsonlSink(handle)))
+
+    records = [json.loads(line) for line in handle.getvalue().splitlines()]
+    assert stats['marked_sent'] == len(records) == 5
+    assert records[0]['end_date'] == (TODAY + timedelta(days=10)).isoformat()
+
+def test_a_database_behind_the_newest_migration_is_refused(session, tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    upgrade_schema(url, revision='e675ea6d79d4')
+    monkeypatch.setattr(async_helpers, 'get_engine_config', lambda: {**get_engine_config(), 'database_url': url})
+
+    with pytest.raises(RuntimeError, match='is at revision e675ea6d79d4'):
+        _run(async_helpers.open_session())
@@ -0,0 +1,75 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from lib.helpers import add_client, add_policy, batch, check_expiry_calendar, get_data_versions
+from lib.models import Client, Policy, PolicyChange
+
+def _count(session, column):
+    return session.scalar(select(func.count(column)))
+
+def test_batch_commits_every_staged_change_once(session):
+    with batch(session, flush_every=1000) as write_batch:
+        for number in range(3):
+            client = add_client(session, f"Client {number}", f"client{number}@example.com", None, None)
+            add_policy(
+                session, client.id, f"POL-{number}", 'Health Insurance',
+                date(2026, 1, 1), date(2027, number + 1, 1), 500.0, 'Britam'
+            )
+
+    assert write_batch.flushes == 1
+    assert _count(session, Policy.id) == 3
+    assert _count(session, PolicyChange.id) == 3
+    assert get_data_versions(session)['policies'] == 1
+    assert check_expiry_calendar(session) == []
+
+def test_failed_helper_inside_batch_keeps_its_error_and_rolls_the_batch_back(session):
+    client = add_client(session, 'Amina Otieno', 'amina@example.com', None, None)
+
+    with pytest.raises(Exception) as exit_error:
+        with batch(session, flush_every=1):
+            add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+            try:
+                add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+            except Exception as e:
+                helper_error = e
+            # The batch carries on after the caught error, but its transaction is lost
+
+    assert isinstance(helper_error, IntegrityError)
+    assert 'policy_changes.policy_id' not in str(exit_error.value)
+    assert _count(session, Policy.id) == 0
+    assert _count(session, PolicyChange.id) == 0
+
+def test_error_raised_in_batch_body_is_reraised_unchanged(session):
+    with pytest.raises(IntegrityError):
+        with batch(session):
+            client = add_client(session, 'Amina Otieno', 'amina@example.com', None, None)
+            add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+            add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+            write_batch = session.info['write_batch']
+            write_batch.flush()
+
+    assert 'write_batch' not in session.info
+    assert _count(session, Policy.id) == 0
+
+def test_error_in_the_block_discards_the_batch(session):
+    with pytest.raises(ValueError):
+        with batch(session):
+            add_client(session, 'Amina Otieno', 'amina@example.com', None, None)
+            raise ValueError('stop')
+
+    assert 'write_batch' not in session.info
+    assert _count(session, Client.id) == 0
+
+def test_failed_helper_outside_batch_rolls_back_and_wraps_the_error(session):
+    client = add_client(session, 'Amina Otieno', 'amina@example.com', None, None)
+    add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+
+    with pytest.raises(Exception, match='Database error') as error:
+        add_policy(session, client.id, 'POL-1', 'Health Insurance', date(2026, 1, 1), date(2027, 1, 1), 500.0, None)
+
+    assert not isinstance(error.value, SQLAlchemyError)
+    # The session was rolled back and is usable again
+    assert _count(session, Policy.id) == 1
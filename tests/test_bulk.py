@@ -0,0 +1,97 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, func, select, true
+
+from lib.helpers import (
+    add_client, bulk_delete_clients, bulk_delete_policies, bulk_update_clients, bulk_update_policies,
+    check_expiry_calendar, generate_reminders, get_client, get_data_versions, get_policy, list_policies
+)
+from lib.models import Client, ExpiryBucket, Policy, PolicyChange, Reminder
+
+def _count(session, model):
+    return session.scalar(select(func.count()).select_from(model))
+
+def test_update_by_criteria_with_an_expression(session, make_policy):
+    motor = make_policy(premium_amount=1000.0)
+    health = make_policy(premium_amount=1000.0, policy_type='Health Insurance')
+    criteria = [Policy.type == 'Motor Vehicle Insurance']
+    values = {'premium_amount': Policy.premium_amount * 1.1}
+
+    assert bulk_update_policies(session, values, criteria=criteria, dry_run=True) == {'matched': 1, 'dry_run': True}
+    assert get_policy(session, motor.id).premium_amount == 1000.0
+
+    result = bulk_update_policies(session, values, criteria=criteria)
+
+    assert result == {'updated': 1, 'dry_run': False}
+    assert get_policy(session, motor.id).premium_amount == pytest.approx(1100.0)
+    assert get_policy(session, health.id).premium_amount == 1000.0
+    assert check_expiry_calendar(session) == []
+
+def test_update_by_ids_in_chunks_logs_the_changes(session, make_policy):
+    ids = [make_policy().id for _ in range(5)]
+    logged = _count(session, PolicyChange)
+    versions = get_data_versions(session)
+
+    result = bulk_update_policies(session, {'end_date': date(2027, 3, 1)}, ids=ids[:4], chunk_size=2)
+
+    assert result['updated'] == 4
+    assert [policy.end_date for policy in list_policies(session)] == [date(2027, 3, 1)] * 4 + [date(2027, 1, 1)]
+    assert _count(session, PolicyChange) == logged + 4
+    assert get_data_versions(session)['policies'] == versions['policies'] + 1
+    assert check_expiry_calendar(session) == []
+
+def test_only_the_affected_months_are_refreshed(session, make_policy):
+    moved_id = make_policy(end_date=date(2026, 11, 5)).id
+    make_policy(end_date=date(2027, 5, 5))
+    # A stale month the bulk update does not touch stays stale
+    session.execute(delete(ExpiryBucket).where(ExpiryBucket.month == date(2027, 5, 1)))
+    session.commit()
+
+    bulk_update_policies(session, {'end_date': date(2026, 12, 5)}, ids=[moved_id])
+
+    assert [mismatch['month'] for mismatch in check_expiry_calendar(session)] == [date(2027, 5, 1)]
+
+def test_bulk_operations_refuse_to_match_everything_implicitly(session):
+    with pytest.raises(ValueError):
+        bulk_delete_policies(session)
+    assert bulk_update_clients(session, {'address': 'Nakuru'}, criteria=[true()], dry_run=True)['matched'] == 0
+
+def test_delete_policies_takes_their_reminders(session, make_policy):
+    today = date(2026, 12, 1)
+    doomed_id = make_policy(insurance_company='Old Mutual').id
+    kept_id = make_policy().id
+    generate_reminders(session, today=today)
+    criteria = [Policy.insurance_company == 'Old Mutual']
+
+    counted = bulk_delete_policies(session, criteria=criteria, dry_run=True)
+    deleted = bulk_delete_policies(session, criteria=criteria)
+
+    assert (counted['policies'], counted['reminders']) == (deleted['policies'], deleted['reminders']) == (1, 1)
+    assert get_policy(session, doomed_id) is None
+    assert get_policy(session, kept_id) is not None
+    assert _count(session, Reminder) == 1
+    assert check_expiry_calendar(session) == []
+
+def test_delete_clients_cascades_to_policies_and_reminders(session, make_policy):
+    leaving_id = add_client(session, 'Brian Kamau', 'brian@example.com', '0722000000', 'Kisumu').id
+    make_policy(client_id=leaving_id)
+    make_policy(client_id=leaving_id)
+    staying_id = make_policy().id
+    generate_reminders(session, today=date(2026, 12, 1))
+    # Cached before the delete, so the lookup must be invalidated
+    assert get_client(session, leaving_id) is not None
+
+    result = bulk_delete_clients(session, ids=[leaving_id])
+
+    assert result == {'clients': 1, 'policies': 2, 'reminders': 2, 'dry_run': False}
+    assert get_client(session, leaving_id) is None
+    assert [policy.id for policy in list_policies(session)] == [staying_id]
+    assert _count(session, Client) == 1
+    assert check_expiry_calendar(session) == []
+
+def test_update_clients(session):
+    ids = [add_client(session, f"Client {n}", f"c{n}@example.com", '0700000000', 'Mombasa').id for n in range(3)]
+
+    assert bulk_update_clients(session, {'address': 'Nakuru'}, ids=ids[1:])['updated'] == 2
+    assert [get_client(session, id).address for id in ids] == ['Mombasa', 'Nakuru', 'Nakuru']
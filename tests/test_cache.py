@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from lib import cache
+from lib.helpers import (
+    add_client, add_policy, batch, delete_policy, get_client, get_client_policies, get_policy, update_client
+)
+from lib.models import Session
+
+def _fresh_session(session):
+    # A new session has an empty identity map, so lookups go to the cache
+    session.close()
+    return Session()
+
+def test_lookups_are_served_from_the_cache(session, make_policy):
+    policy_id = make_policy(premium_amount=2500.0).id
+    session = _fresh_session(session)
+    cache.reset_stats()
+
+    assert get_policy(session, policy_id).premium_amount == 2500.0
+    session = _fresh_session(session)
+    cached = get_policy(session, policy_id)
+
+    assert (cached.premium_amount, cached.end_date) == (2500.0, date(2027, 1, 1))
+    assert cached in session
+    assert (cache.cache_stats()['hits'], cache.cache_stats()['misses']) == (1, 1)
+    session.close()
+
+def test_writes_invalidate_the_entries_they_change(session, make_policy):
+    policy = make_policy()
+    client_id = policy.client_id
+    get_client(session, client_id)
+    assert len(get_client_policies(session, client_id)) == 1
+
+    update_client(session, client_id, address='Eldoret')
+    add_policy(session, client_id, 'POL-NEW', 'Health Insurance', date(2026, 3, 1), date(2027, 3, 1), 800.0, 'CIC')
+    delete_policy(session, policy.id)
+    session = _fresh_session(session)
+
+    assert get_client(session, client_id).address == 'Eldoret'
+    assert [p.policy_number for p in get_client_policies(session, client_id)] == ['POL-NEW']
+    session.close()
+
+def test_lookups_inside_a_batch_are_not_cached(session):
+    other = Session()
+    try:
+        with batch(session):
+            client_id = add_client(session, 'Amina Otieno', 'amina@example.com', None, None).id
+            session.expunge_all()
+            assert get_client(session, client_id).name == 'Amina Otieno'
+            assert get_client_policies(session, client_id) == []
+
+            # Until the batch commits, nobody else sees the client, also not through the cache
+            assert get_client(other, client_id) is None
+        assert get_client(other, client_id).name == 'Amina Otieno'
+    finally:
+        other.close()
+
+@pytest.mark.parametrize('make_backend', [
+    lambda tmp_path: cache.MemoryCache(max_entries=2),
+    lambda tmp_path: cache.SqliteCache(str(tmp_path / 'cache.db'), max_entries=2),
+], ids=['memory', 'sqlite'])
+def test_backends_evict_the_least_recently_used_entry(tmp_path, make_backend):
+    backend = make_backend(tmp_path)
+    backend.set('a', {'id': 1})
+    backend.set('b', {'id': 2})
+    assert backend.get('a') == {'id': 1}
+
+    backend.set('c', {'id': 3})
+
+    assert backend.get('b') is None
+    assert (backend.get('a'), backend.get('c')) == ({'id': 1}, {'id': 3})
+    assert (len(backend), backend.evictions) == (2, 1)
+
+def test_expired_entries_are_misses(tmp_path):
+    backend = cache.SqliteCache(str(tmp_path / 'cache.db'), ttl=-1)
+    backend.set('policy', {'end_date': date(2027, 1, 1)})
+
+    assert backend.get('policy') is None
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache.SqliteCache(path).set('policy', {'end_date': date(2027, 1, 1)})
+
+    assert cache.SqliteCache(path).get('policy') == {'end_date': '2027-01-01'}
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+import json
+
+from click.testing import CliRunner
+import pytest
+
+from lib.cli import cli
+from lib.models import get_engine
+
+@pytest.fixture
+def invoke(session):
+    runner = CliRunner()
+
+    def invoke(*args):
+        return runner.invoke(cli, list(args), catch_exceptions=False)
+
+    return invoke
+
+def test_policies_list_writes_one_json_line_per_policy(invoke, make_policy):
+    first = make_policy()
+    make_policy()
+    make_policy()
+
+    result = invoke('policies', 'list', '--since-id', str(first.id), '--limit', '1')
+
+    assert result.exit_code == 0
+    record, = [json.loads(line) for line in result.output.splitlines()]
+    assert record['policy_number'] == 'POL-000002'
+
+def test_show_prints_the_record_or_fails(invoke, make_policy):
+    policy = make_policy()
+
+    shown = invoke('policies', 'show', str(policy.id))
+    assert shown.exit_code == 0
+    assert json.loads(shown.output)['end_date'] == '2027-01-01'
+
+    missing = invoke('policies', 'show', str(policy.id + 1))
+    assert missing.exit_code == 1
+    assert f"Policy {policy.id + 1} not found" in missing.output
+
+def test_reminders_generate_reports_the_result(invoke, make_policy):
+    make_policy(end_date=date.today() + timedelta(days=10))
+
+    result = invoke('reminders', 'generate', '--days', '30')
+
+    assert result.exit_code == 0
+    assert json.loads(result.output)['created'] == 1
+
+def test_import_database_errors_are_reported(invoke, tmp_path):
+    path = tmp_path / 'clients.jsonl'
+    path.write_text(json.dumps({'name': 'Amina Otieno', 'email': 'amina@example.com'}) + "\n", encoding='utf-8')
+    with get_engine().begin() as connection:
+        connection.exec_driver_sql('DROP TABLE clients')
+
+    result = invoke('import', 'clients', str(path))
+
+    assert result.exit_code == 1
+    assert 'Error: Database error at record 1' in result.output
+
+def test_conflicting_options_are_a_usage_error(invoke):
+    result = invoke('reminders', 'generate', '--incremental', '--workers', '2')
+
+    assert result.exit_code == 2
+    assert '--incremental cannot be combined with --workers' in result.output
@@ -0,0 +1,56 @@
+from sqlalchemy import text
+import pytest
+
+from lib.models.config import ENGINE_DEFAULTS, build_engine, load_engine_config
+
+def test_settings_precedence(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'tracker.ini'
+    path.write_text("[database]\npool_size = 7\nmax_overflow = 3\nstatement_timeout = 1000\n", encoding='utf-8')
+    environ = {'INSURANCE_TRACKER_CONFIG': str(path), 'INSURANCE_TRACKER_MAX_OVERFLOW': '4'}
+
+    config = load_engine_config(environ=environ, defaults={'pool_timeout': '5'}, statement_timeout=250)
+
+    assert config['pool_recycle'] == ENGINE_DEFAULTS['pool_recycle']
+    assert config['pool_timeout'] == '5'
+    assert config['pool_size'] == '7'
+    assert config['max_overflow'] == '4'
+    assert config['statement_timeout'] == '250'
+
+def test_default_config_file_in_the_working_directory_is_read(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'insurance_tracker.ini').write_text("[database]\npool_size = 2\n", encoding='utf-8')
+
+    assert load_engine_config(environ={})['pool_size'] == '2'
+
+def test_unreadable_config_file_is_an_error(tmp_path):
+    with pytest.raises(RuntimeError, match='Cannot read database config file'):
+        load_engine_config(environ={'INSURANCE_TRACKER_CONFIG': str(tmp_path / 'missing.ini')})
+
+def test_sqlite_connections_get_the_pragmas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = load_engine_config(
+        environ={}, database_url=f"sqlite:///{tmp_path / 'pragmas.db'}", statement_timeout=1500,
+        sqlite_synchronous='OFF', sqlite_cache_size='',
+    )
+    engine = build_engine(config)
+    try:
+        with engine.connect() as connection:
+            def pragma(name):
+                return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 0
+            assert pragma('busy_timeout') == 1500
+            # An empty value leaves SQLite's default
+            assert pragma('cache_size') == -2000
+        assert engine.pool.size() == int(ENGINE_DEFAULTS['pool_size'])
+    finally:
+        engine.dispose()
+
+def test_pragma_values_must_be_plain_words(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = load_engine_config(environ={}, sqlite_journal_mode='WAL; DROP TABLE policies')
+
+    with pytest.raises(ValueError, match='Invalid value for sqlite_journal_mode'):
+        build_engine(config)
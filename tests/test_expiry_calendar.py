@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from lib.helpers import (
+    check_expiry_calendar, count_expiring, delete_policy, expiring_totals, get_expiry_calendar,
+    rebuild_expiry_calendar, update_policy
+)
+from lib.models import ExpiryBucket, Policy
+
+END_DATES = (date(2026, 10, 20), date(2026, 11, 1), date(2026, 11, 30), date(2026, 12, 15), date(2027, 1, 2))
+
+@pytest.fixture
+def book(session, make_policy):
+    return [make_policy(end_date=end_date, premium_amount=100.0 * (n + 1)) for n, end_date in enumerate(END_DATES)]
+
+def _from_policies(session, start, end):
+    count, total = session.execute(
+        select(func.count(Policy.id), func.coalesce(func.sum(Policy.premium_amount), 0.0))
+        .where(Policy.end_date >= start, Policy.end_date <= end)
+    ).one()
+    return {'policies': count, 'premium_total': round(total, 2)}
+
+def test_buckets_follow_every_write(session, book):
+    assert [(b.month, b.policies, b.premium_total) for b in get_expiry_calendar(session)] == [
+        (date(2026, 10, 1), 1, 100.0), (date(2026, 11, 1), 2, 500.0),
+        (date(2026, 12, 1), 1, 400.0), (date(2027, 1, 1), 1, 500.0),
+    ]
+
+    update_policy(session, book[0].id, end_date=date(2026, 12, 1))
+    update_policy(session, book[1].id, premium_amount=250.0)
+    delete_policy(session, book[4].id)
+
+    assert check_expiry_calendar(session) == []
+    assert [b.month for b in get_expiry_calendar(session, start=date(2026, 11, 15))] == [
+        date(2026, 11, 1), date(2026, 12, 1)
+    ]
+
+@pytest.mark.parametrize('start, end', [
+    (date(2026, 10, 1), date(2027, 1, 31)),
+    (date(2026, 10, 21), date(2026, 12, 14)),
+    (date(2026, 11, 1), date(2026, 11, 30)),
+    (date(2026, 11, 2), date(2026, 11, 29)),
+    (date(2026, 9, 1), date(2026, 10, 19)),
+])
+def test_expiring_totals_match_the_policies_table(session, book, start, end):
+    assert expiring_totals(session, start, end) == _from_policies(session, start, end)
+
+def test_count_expiring_uses_the_window(session, book):
+    assert count_expiring(session, days=45, today=date(2026, 10, 17)) == {'policies': 3, 'premium_total': 600.0}
+
+def test_a_stale_calendar_is_reported_and_rebuilt(session, book):
+    session.execute(delete(ExpiryBucket).where(ExpiryBucket.month == date(2026, 11, 1)))
+    session.commit()
+
+    mismatch, = check_expiry_calendar(session)
+    assert mismatch['month'] == date(2026, 11, 1)
+    assert mismatch['stored'] == {'policies': 0, 'premium_total': 0.0}
+
+    assert rebuild_expiry_calendar(session) == 4
+    assert check_expiry_calendar(session) == []
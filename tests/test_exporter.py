@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+import csv
+import json
+
+import pytest
+
+from lib.db.exporter import export_dataset
+
+def test_policies_export_to_csv(session, make_policy, tmp_path):
+    make_policy(premium_amount=1500.0)
+    make_policy(premium_amount=2500.0)
+    output = str(tmp_path / 'policies.csv')
+
+    assert export_dataset(session, 'policies', 'csv', output, chunk_size=1) == 2
+    with open(output, newline='', encoding='utf-8') as handle:
+        rows = list(csv.DictReader(handle))
+    assert [(row['policy_number'], float(row['premium_amount'])) for row in rows] == [
+        ('POL-000001', 1500.0), ('POL-000002', 2500.0)
+    ]
+
+def test_expiring_export_to_jsonl_honours_the_window(session, make_policy, tmp_path):
+    end_date = date.today() + timedelta(days=20)
+    make_policy(end_date=end_date)
+    make_policy(end_date=date.today() + timedelta(days=200))
+    output = str(tmp_path / 'expiring.jsonl')
+
+    assert export_dataset(session, 'expiring', 'jsonl', output, days=30) == 1
+    with open(output, encoding='utf-8') as handle:
+        record, = [json.loads(line) for line in handle]
+    assert record['policy_number'] == 'POL-000001'
+    assert record['end_date'] == end_date.isoformat()
+
+def test_csv_goes_to_standard_output_without_a_file(session, make_policy, capsys):
+    make_policy()
+
+    assert export_dataset(session, 'clients', 'csv') == 1
+    header, row = capsys.readouterr().out.splitlines()
+    assert 'name' in header.split(',') and 'Amina Otieno' in row
+
+def test_unknown_dataset_or_format_is_refused(session):
+    with pytest.raises(ValueError):
+        export_dataset(session, 'claims', 'csv')
+    with pytest.raises(ValueError):
+        export_dataset(session, 'policies', 'xml')
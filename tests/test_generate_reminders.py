@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from lib.helpers import generate_reminders, get_policy_reminders, transition_reminders
+from lib.models import Policy, Reminder
+
+TODAY = date(2026, 10, 1)
+
+def test_only_policies_ending_in_the_window_get_a_reminder(session, make_policy):
+    due = make_policy(end_date=TODAY + timedelta(days=30))
+    edge = make_policy(end_date=TODAY + timedelta(days=90))
+    later = make_policy(end_date=TODAY + timedelta(days=91))
+    ended = make_policy(end_date=TODAY - timedelta(days=1))
+
+    assert generate_reminders(session, today=TODAY)['created'] == 2
+    assert [(r.reminder_date, r.status) for r in get_policy_reminders(session, due.id)] == [(TODAY, Reminder.PENDING)]
+    assert len(get_policy_reminders(session, edge.id)) == 1
+    assert get_policy_reminders(session, later.id) == []
+    assert get_policy_reminders(session, ended.id) == []
+
+def test_rerunning_creates_no_duplicates(session, make_policy):
+    policy = make_policy(end_date=TODAY + timedelta(days=30))
+
+    assert generate_reminders(session, today=TODAY)['created'] == 1
+    assert generate_reminders(session, today=TODAY + timedelta(days=1))['created'] == 0
+    assert len(get_policy_reminders(session, policy.id)) == 1
+
+def test_renewed_reminder_still_covers_but_expired_does_not(session, make_policy):
+    renewed = make_policy(end_date=TODAY + timedelta(days=30))
+    expired = make_policy(end_date=TODAY + timedelta(days=30))
+    generate_reminders(session, today=TODAY)
+    transition_reminders(session, Reminder.RENEWED, criteria=Reminder.policy_id == renewed.id)
+    transition_reminders(session, Reminder.EXPIRED, criteria=Reminder.policy_id == expired.id)
+
+    assert generate_reminders(session, today=TODAY)['created'] == 1
+    assert len(get_policy_reminders(session, renewed.id)) == 1
+    assert len(get_policy_reminders(session, expired.id)) == 2
+
+def test_policy_filter_restricts_the_policies_considered(session, make_policy):
+    included = make_policy(end_date=TODAY + timedelta(days=30))
+    excluded = make_policy(end_date=TODAY + timedelta(days=30))
+
+    result = generate_reminders(session, today=TODAY, policy_filter=Policy.id == included.id)
+
+    assert result['created'] == 1
+    assert get_policy_reminders(session, excluded.id) == []
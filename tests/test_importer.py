@@ -0,0 +1,77 @@
+from datetime import date
+import csv
+import json
+
+from lib.db.importer import import_file
+from lib.helpers import add_client, check_expiry_calendar, list_clients, list_policies
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+def _policy(number, **values):
+    record = {
+        'policy_number': number, 'policy_type': 'Health Insurance', 'start_date': '2026-01-01',
+        'end_date': '2027-01-01', 'premium_amount': '12,000', 'insurance_company': 'Britam',
+        'client_email': 'amina@example.com', 'client_id': '',
+    }
+    record.update(values)
+    return record
+
+def test_clients_are_imported_from_jsonl(session, tmp_path):
+    path = tmp_path / 'clients.jsonl'
+    path.write_text(
+        json.dumps({'name': 'Amina Otieno', 'email': 'amina@example.com', 'phone': '0712345678'}) + "\n\n"
+        + json.dumps({'name': 'Brian Kamau'}) + "\n",
+        encoding='utf-8'
+    )
+
+    report = import_file(session, str(path), 'clients')
+
+    assert (report['inserted'], report['rejected']) == (1, 1)
+    assert [(client.name, client.address) for client in list_clients(session)] == [('Amina Otieno', None)]
+    with open(report['rejects_path'], encoding='utf-8') as rejects:
+        assert [json.loads(line)['reason'] for line in rejects] == ['missing email']
+
+def test_invalid_policies_are_rejected_with_a_reason(session, tmp_path):
+    client = add_client(session, 'Amina Otieno', 'amina@example.com', '0712345678', 'Nairobi')
+    path = _write_csv(tmp_path / 'policies.csv', [
+        _policy('POL-1'),
+        _policy('POL-1'),
+        _policy('POL-2', client_email='', client_id=str(client.id + 1)),
+        _policy('POL-3', end_date='2025-01-01'),
+        _policy('POL-4', client_email='nobody@example.com'),
+        _policy('POL-5', premium_amount='lots'),
+    ])
+
+    report = import_file(session, path, 'policies', batch_size=2)
+
+    assert (report['inserted'], report['rejected']) == (1, 5)
+    policy, = list_policies(session)
+    assert (policy.client_id, policy.premium_amount, policy.end_date) == (client.id, 12000.0, date(2027, 1, 1))
+    with open(report['rejects_path'], encoding='utf-8') as rejects:
+        reasons = {json.loads(line)['record']: json.loads(line)['reason'] for line in rejects}
+    assert reasons == {
+        2: "duplicate policy_number 'POL-1'",
+        3: f"unknown client_id {client.id + 1}",
+        4: "end_date is before start_date",
+        5: "unknown client_email 'nobody@example.com'",
+        6: "invalid premium_amount 'lots'",
+    }
+    assert check_expiry_calendar(session) == []
+
+def test_resumed_import_skips_committed_batches(session, tmp_path):
+    add_client(session, 'Amina Otieno', 'amina@example.com', '0712345678', 'Nairobi')
+    path = _write_csv(tmp_path / 'policies.csv', [_policy(f"POL-{number}") for number in range(1, 6)])
+
+    assert import_file(session, path, 'policies', batch_size=2)['inserted'] == 5
+    resumed = import_file(session, path, 'policies', batch_size=2)
+    assert (resumed['inserted'], resumed['skipped']) == (0, 5)
+
+    # Without resume the file is read again and every record is a duplicate
+    again = import_file(session, path, 'policies', resume=False)
+    assert (again['inserted'], again['rejected']) == (0, 5)
+    assert len(list_policies(session)) == 5
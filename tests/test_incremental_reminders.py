@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from lib.helpers import generate_reminders_incremental, get_policy_reminders, update_policy
+from lib.models import PolicyChange, ReminderWatermark
+
+TODAY = date(2026, 10, 1)
+
+def test_first_run_sweeps_the_window_and_sets_the_watermark(session, make_policy):
+    make_policy(end_date=TODAY + timedelta(days=30))
+    make_policy(end_date=TODAY + timedelta(days=120))
+
+    result = generate_reminders_incremental(session, today=TODAY)
+
+    assert (result['created'], result['incremental']) == (1, False)
+    watermark = session.scalars(select(ReminderWatermark)).one()
+    assert watermark.horizon == TODAY + timedelta(days=90)
+    # Processed change log entries are pruned
+    assert session.scalar(select(func.count(PolicyChange.id))) == 0
+
+def test_later_runs_pick_up_policies_entering_the_window(session, make_policy):
+    later = make_policy(end_date=TODAY + timedelta(days=100))
+    generate_reminders_incremental(session, today=TODAY)
+
+    result = generate_reminders_incremental(session, today=TODAY + timedelta(days=10))
+
+    assert (result['created'], result['incremental']) == (1, True)
+    assert len(get_policy_reminders(session, later.id)) == 1
+
+def test_later_runs_pick_up_changed_policies(session, make_policy):
+    moved = make_policy(end_date=TODAY + timedelta(days=300))
+    generate_reminders_incremental(session, today=TODAY)
+    added = make_policy(end_date=TODAY + timedelta(days=20))
+    update_policy(session, moved.id, end_date=TODAY + timedelta(days=40))
+
+    assert generate_reminders_incremental(session, today=TODAY)['created'] == 2
+    assert generate_reminders_incremental(session, today=TODAY)['created'] == 0
+    assert len(get_policy_reminders(session, added.id)) == 1
@@ -0,0 +1,98 @@
+import sqlite3
+
+from sqlalchemy import select
+import pytest
+
+from lib import helpers, instrumentation, snapshot
+from lib.models import Policy, Session, configure_engine, get_engine
+
+@pytest.fixture
+def profiled(session):
+    instrumentation.enable(engine=get_engine())
+    yield session
+    instrumentation.disable()
+
+def _records(helper):
+    return [record for record in instrumentation.call_records() if record['helper'] == helper]
+
+def test_helper_calls_are_recorded(profiled, make_policy):
+    for _ in range(3):
+        make_policy()
+    assert len(helpers.list_policies(profiled)) == 3
+
+    record = _records('list_policies')[-1]
+    assert (record['statements'], record['orm_objects'], record['failed']) == (1, 3, False)
+    assert instrumentation.helper_totals()['list_policies']['calls'] == 1
+    assert 'insurance_tracker_helper_calls_total{helper="list_policies"} 1' in instrumentation.prometheus_text()
+
+def test_disable_restores_the_helpers(session):
+    original = helpers.list_policies
+    instrumentation.enable(engine=get_engine())
+    assert helpers.list_policies is not original
+
+    instrumentation.disable()
+
+    assert helpers.list_policies is original
+    assert instrumentation.call_records() == []
+
+def test_only_data_access_helpers_are_wrapped(profiled):
+    assert hasattr(helpers.list_policies, '__wrapped_helper__')
+    for name in ('batch', 'current_batch', 'reminders_view', 'is_renewed'):
+        assert not hasattr(getattr(helpers, name), '__wrapped_helper__'), name
+
+def test_helpers_imported_by_name_are_wrapped_and_restored(session):
+    original = snapshot.get_data_versions
+    instrumentation.enable(engine=get_engine())
+    try:
+        assert snapshot.get_data_versions.__wrapped_helper__ is original
+        assert snapshot.get_data_versions is helpers.get_data_versions
+    finally:
+        instrumentation.disable()
+    assert snapshot.get_data_versions is original
+    assert helpers.get_data_versions is original
+
+def test_rows_fetched_are_counted(profiled, make_policy):
+    for _ in range(3):
+        make_policy()
+    assert len(helpers.list_policies(profiled)) == 3
+    versions = snapshot.get_data_versions(profiled)
+    assert _records('list_policies')[-1]['rows_fetched'] == 3
+    assert _records('get_data_versions')[-1]['rows_fetched'] == len(versions)
+    assert instrumentation.helper_totals()['list_policies']['rows_fetched'] == 3
+    assert 'insurance_tracker_helper_rows_fetched_total{helper="list_policies"} 3' in instrumentation.prometheus_text()
+
+def test_repeated_statements_are_flagged(session, make_policy):
+    instrumentation.enable(engine=get_engine(), n_plus_one_threshold=3)
+    try:
+        ids = [make_policy().id for _ in range(3)]
+
+        @instrumentation.instrument
+        def load_one_by_one(session):
+            return [session.execute(select(Policy).where(Policy.id == id)).scalar_one() for id in ids]
+
+        load_one_by_one(session)
+        record = _records('load_one_by_one')[-1]
+    finally:
+        instrumentation.disable()
+    assert record['n_plus_one']
+    assert record['max_statement_repeats'] == 3
+    assert record['rows_fetched'] == 3
+
+def test_lock_errors_record_the_time_spent_waiting(session, database_url):
+    session.close()
+    engine = configure_engine(database_url=database_url, statement_timeout=100)
+    session = Session()
+    holder = sqlite3.connect(database_url[len('sqlite:///'):])
+    holder.execute('BEGIN IMMEDIATE')
+    instrumentation.enable(engine=engine)
+    try:
+        with pytest.raises(Exception, match='locked'):
+            helpers.add_client(session, 'Amina Otieno', 'amina@example.com', None, None)
+        record = _records('add_client')[-1]
+    finally:
+        instrumentation.disable()
+        holder.rollback()
+        holder.close()
+        session.close()
+    assert (record['lock_errors'], record['failed']) == (1, True)
+    assert record['lock_wait_s'] >= 0.05
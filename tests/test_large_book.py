@@ -0,0 +1,35 @@
+from argparse import Namespace
+from datetime import date
+import random
+
+from benchmarks.large_book import build_pools, generate_clients, generate_policies, populate, run_benchmarks
+from lib.helpers import check_expiry_calendar, get_data_versions
+
+def _book(seed):
+    rng = random.Random(seed)
+    first_names, street_addresses = build_pools(seed)
+    clients = list(generate_clients(rng, 20, first_names, street_addresses))
+    return clients, list(generate_policies(rng, 20, 3, 2, date(2026, 10, 1)))
+
+def test_the_seed_fixes_the_generated_book():
+    assert _book(7) == _book(7)
+    assert _book(7) != _book(8)
+
+def test_populated_book_keeps_the_calendar_and_versions_current(session):
+    counts = populate(session.get_bind(), clients=50, policies_per_client=3, history_years=2, seed=7)
+
+    assert counts['clients'] == 50
+    assert counts['policies'] > 50
+    assert check_expiry_calendar(session) == []
+    assert get_data_versions(session) == {'policies': 1, 'reminders': 1}
+
+def test_selected_benchmarks_report_timings_and_rows(session):
+    counts = populate(session.get_bind(), clients=50, policies_per_client=3, history_years=2, seed=7)
+    args = Namespace(seed=7, lookups=5, repeat=2, benchmarks='generate_reminders.initial,list_policies')
+
+    initial, listed = run_benchmarks(args, counts)
+
+    assert (initial['name'], initial['repeat']) == ('generate_reminders.initial', 1)
+    assert initial['rows'] > 0
+    assert (listed['name'], listed['rows'], listed['repeat']) == ('list_policies', counts['policies'], 2)
+    assert listed['min_s'] <= listed['median_s'] <= listed['max_s']
@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+from lib.helpers import add_client, generate_reminders, iter_clients, iter_policies, iter_reminders, transition_reminders
+from lib.models import Reminder
+
+def test_iter_policies_walks_every_page_in_id_order(session, make_policy):
+    ids = [make_policy().id for _ in range(7)]
+
+    assert [policy.id for policy in iter_policies(session, page_size=3)] == ids
+    assert [policy.id for policy in iter_policies(session, page_size=3, since_id=ids[4])] == ids[5:]
+
+def test_pages_already_read_leave_the_session(session):
+    for number in range(5):
+        add_client(session, f"Client {number}", f"client{number}@example.com", '0700000000', 'Mombasa')
+    session.expunge_all()
+
+    clients = iter_clients(session, page_size=2)
+    first = next(clients)
+    assert first in session
+    next(clients)
+    next(clients)
+    assert first not in session
+    assert len(list(clients)) == 2
+
+def test_objects_loaded_before_iterating_stay_attached(session, make_policy):
+    policy = make_policy()
+    make_policy()
+
+    list(iter_policies(session, page_size=1))
+
+    assert policy in session
+
+def test_iter_reminders_yields_pending_reminders_only(session, make_policy):
+    today = date(2026, 10, 1)
+    policies = [make_policy(end_date=today + timedelta(days=30)) for _ in range(3)]
+    generate_reminders(session, today=today)
+    transition_reminders(session, Reminder.SENT, criteria=Reminder.policy_id == policies[1].id)
+
+    assert [reminder.policy_id for reminder in iter_reminders(session, page_size=1)] == [
+        policies[0].id, policies[2].id
+    ]
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+import pytest
+
+from lib.helpers import list_reminders
+from lib.parallel import generate_reminders_sharded, plan_company_shards, plan_id_shards, shard_filter
+
+SOON = date.today() + timedelta(days=30)
+
+def test_id_shards_cover_the_due_policies_without_overlap(session, make_policy):
+    ids = [make_policy(end_date=SOON).id for _ in range(7)]
+    make_policy(end_date=SOON + timedelta(days=365))
+
+    plan = plan_id_shards(session, 3)
+
+    assert plan == [('id', ids[0], ids[2]), ('id', ids[3], ids[5]), ('id', ids[6], ids[6])]
+
+def test_company_shards_include_policies_without_a_company(session, make_policy):
+    make_policy(end_date=SOON, insurance_company='Britam')
+    make_policy(end_date=SOON, insurance_company=None)
+
+    assert sorted(plan_company_shards(session), key=str) == [('company', 'Britam'), ('company', None)]
+    assert str(shard_filter(('company', None))) == 'policies.insurance_company IS NULL'
+    with pytest.raises(ValueError):
+        shard_filter(('region', 'Coast'))
+
+@pytest.mark.parametrize('partition', ['id', 'company'])
+def test_workers_create_one_reminder_per_due_policy(session, make_policy, partition):
+    for number in range(6):
+        make_policy(end_date=SOON, insurance_company=('Jubilee', 'Britam', 'CIC')[number % 3])
+    make_policy(end_date=SOON + timedelta(days=365))
+
+    result = generate_reminders_sharded(session, days=90, workers=2, shards=3, partition=partition)
+
+    assert result['created'] == 6
+    assert len(result['shards']) == 3
+    assert generate_reminders_sharded(session, days=90, workers=2, partition=partition)['created'] == 0
+    assert len(list_reminders(session)) == 6
@@ -0,0 +1,18 @@
+from sqlalchemy import inspect
+
+from lib.db.query_plan import EXPECTED_INDEXES, check_indexes
+
+def test_lookup_indexes_exist(session):
+    inspector = inspect(session.get_bind())
+    indexes = {
+        index['name'] for table in ('policies', 'reminders') for index in inspector.get_indexes(table)
+    }
+    assert set(EXPECTED_INDEXES.values()) <= indexes
+
+def test_hot_path_queries_use_their_index(session, make_policy):
+    make_policy()
+    results = check_indexes(session)
+
+    assert set(results) == set(EXPECTED_INDEXES)
+    for name, (uses_index, plan) in results.items():
+        assert uses_index, f"{name}: {plan}"
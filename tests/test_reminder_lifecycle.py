@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from lib.analytics import renewal_rates
+from lib.helpers import (
+    add_policy, archive_reminders, batch, close_renewed_reminders, expire_reminders, generate_reminders,
+    get_policy_reminders, transition_reminders
+)
+from lib.models import Policy, Reminder, ReminderArchive
+
+TODAY = date(2026, 10, 17)
+
+def _statuses(session, policy):
+    return [reminder.status for reminder in get_policy_reminders(session, policy.id)]
+
+def _renew(session, policy, start_date, number):
+    return add_policy(
+        session, policy.client_id, number, policy.type, start_date,
+        start_date.replace(year=start_date.year + 1), policy.premium_amount, policy.insurance_company
+    )
+
+def test_transitions_only_follow_the_lifecycle(session, make_policy):
+    policy = make_policy(end_date=date(2026, 11, 30))
+    generate_reminders(session, today=TODAY)
+    reminder_id = get_policy_reminders(session, policy.id)[0].id
+
+    assert transition_reminders(session, Reminder.SENT, reminder_ids=[reminder_id]) == 1
+    assert transition_reminders(session, Reminder.EXPIRED, reminder_ids=[reminder_id]) == 1
+    # Closed reminders are never reopened
+    assert transition_reminders(session, Reminder.PENDING, reminder_ids=[reminder_id]) == 0
+    assert _statuses(session, policy) == [Reminder.EXPIRED]
+
+    with pytest.raises(ValueError):
+        transition_reminders(session, 'lost', reminder_ids=[reminder_id])
+
+def test_reminder_is_closed_as_renewed_by_a_successor_within_the_grace_period(session, make_policy):
+    policy = make_policy(start_date=date(2025, 12, 1), end_date=date(2026, 11, 30))
+    generate_reminders(session, today=TODAY)
+    _renew(session, policy, date(2026, 12, 1), 'POL-RENEWAL')
+
+    assert close_renewed_reminders(session) == 1
+    assert _statuses(session, policy) == [Reminder.RENEWED]
+
+@pytest.mark.parametrize('successor_start', [
+    # Runs alongside the policy
+    date(2026, 2, 1),
+    # Taken out long after the policy lapsed
+    date(2029, 3, 1),
+])
+def test_other_policies_of_the_same_type_are_not_renewals(session, make_policy, successor_start):
+    policy = make_policy(start_date=date(2025, 12, 1), end_date=date(2026, 11, 30))
+    generate_reminders(session, today=TODAY)
+    _renew(session, policy, successor_start, 'POL-OTHER')
+
+    assert close_renewed_reminders(session) == 0
+    assert _statuses(session, policy) == [Reminder.PENDING]
+
+def test_renewal_rates_use_the_same_rule(session, make_policy):
+    renewed = make_policy(start_date=date(2025, 6, 1), end_date=date(2026, 5, 31))
+    _renew(session, renewed, date(2026, 6, 10), 'POL-RENEWAL')
+    concurrent = make_policy(start_date=date(2025, 7, 1), end_date=date(2026, 6, 30))
+    _renew(session, concurrent, date(2025, 8, 1), 'POL-CONCURRENT')
+
+    rates = renewal_rates(session, today=TODAY)
+
+    # POL-CONCURRENT also ended in the window, without a successor
+    assert rates['overall'] == {'expired': 3, 'renewed': 1, 'rate': round(1 / 3, 4)}
+
+def test_expired_reminders_are_archived_and_stop_covering_their_policy(session, make_policy):
+    policy = make_policy(end_date=date(2025, 9, 30))
+    generate_reminders(session, today=date(2025, 9, 1))
+
+    assert expire_reminders(session, today=TODAY) == 1
+    assert archive_reminders(session, older_than_days=30, today=TODAY) == 1
+    assert get_policy_reminders(session, policy.id) == []
+    assert session.query(ReminderArchive).one().status == Reminder.EXPIRED
+
+def test_archiving_nothing_inside_a_batch_leaves_the_batch_open(session, make_policy):
+    with pytest.raises(RuntimeError):
+        with batch(session):
+            make_policy(end_date=date(2026, 11, 1))
+            assert archive_reminders(session, today=TODAY) == 0
+            raise RuntimeError('abandon the batch')
+
+    assert session.query(Policy).count() == 0
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+
+from lib.helpers import generate_reminders, generate_scheduled_reminders, get_policy_reminders
+from lib.schedules import load_schedule, make_schedule, parse_offsets
+
+END_DATE = date(2026, 12, 31)
+
+def _offsets(session, policy):
+    return sorted(
+        (reminder.reminder_date, reminder.offset_days) for reminder in get_policy_reminders(session, policy.id)
+    )
+
+def test_latest_due_touchpoint_gets_one_reminder(session, make_policy):
+    policy = make_policy(end_date=END_DATE)
+    today = END_DATE - timedelta(days=45)
+
+    assert generate_scheduled_reminders(session, today=today)['created'] == 1
+    assert generate_scheduled_reminders(session, today=today)['created'] == 0
+    assert _offsets(session, policy) == [(today, 60)]
+
+def test_each_touchpoint_is_issued_once_as_it_comes_due(session, make_policy):
+    policy = make_policy(end_date=END_DATE)
+    schedule = make_schedule(default=(60, 30))
+
+    for days_left in (50, 40, 20, 10):
+        generate_scheduled_reminders(session, schedule, today=END_DATE - timedelta(days=days_left))
+
+    assert _offsets(session, policy) == [
+        (END_DATE - timedelta(days=50), 60), (END_DATE - timedelta(days=20), 30)
+    ]
+
+def test_reminders_from_generate_reminders_cover_the_touchpoint(session, make_policy):
+    policy = make_policy(end_date=END_DATE)
+    today = END_DATE - timedelta(days=45)
+    generate_reminders(session, today=today)
+
+    assert generate_scheduled_reminders(session, today=today)['created'] == 0
+    # A later touchpoint is still due once it comes
+    later = END_DATE - timedelta(days=25)
+    assert generate_scheduled_reminders(session, today=later)['created'] == 1
+    assert _offsets(session, policy) == [(today, None), (later, 30)]
+
+def test_company_offsets_win_over_type_offsets_and_the_default(session, make_policy):
+    schedule = make_schedule(default=(60,), by_type={'Travel Insurance': '14'}, by_company={'Britam': [30]})
+    default = make_policy(end_date=END_DATE)
+    travel = make_policy(end_date=END_DATE, policy_type='Travel Insurance')
+    britam_travel = make_policy(end_date=END_DATE, policy_type='Travel Insurance', insurance_company='Britam')
+    today = END_DATE - timedelta(days=20)
+
+    assert generate_scheduled_reminders(session, schedule, today=today)['created'] == 2
+    assert _offsets(session, default) == [(today, 60)]
+    assert _offsets(session, travel) == []
+    assert _offsets(session, britam_travel) == [(today, 30)]
+
+def test_schedule_is_read_from_the_config_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'tracker.ini'
+    path.write_text(
+        "[reminder_schedule]\ndefault = 30, 90\ntype.Travel Insurance = 14, 3\ncompany.Britam = 7\n",
+        encoding='utf-8'
+    )
+
+    assert load_schedule(str(path)) == {
+        'default': (90, 30), 'type': {'Travel Insurance': (14, 3)}, 'company': {'Britam': (7,)}
+    }
+    assert load_schedule(environ={})['default'] == (90, 60, 30, 7)
+
+@pytest.mark.parametrize('value', ['', '30, soon', '7, -1'])
+def test_invalid_offsets_are_refused(value):
+    with pytest.raises(ValueError, match='Invalid reminder offsets'):
+        parse_offsets(value)
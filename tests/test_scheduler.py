@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import json
+
+import pytest
+
+from lib.helpers import generate_reminders, list_reminders
+from lib.scheduler import Job, Scheduler, build_scheduler, load_scheduler_config, serve_status
+
+TODAY = date.today()
+
+def _config(**overrides):
+    return load_scheduler_config(environ={}, chunk_pause=0, chunk_size=2, **overrides)
+
+def test_settings_precedence_and_validation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'tracker.ini'
+    path.write_text("[scheduler]\nchunk_size = 50\nsweep_interval = 60\n", encoding='utf-8')
+    environ = {'INSURANCE_TRACKER_CONFIG': str(path), 'INSURANCE_TRACKER_SCHEDULER_SWEEP_INTERVAL': '120'}
+
+    config = load_scheduler_config(environ=environ, mode='scheduled', days=None)
+
+    assert (config['chunk_size'], config['sweep_interval']) == ('50', '120')
+    assert (config['mode'], config['days']) == ('scheduled', '90')
+    with pytest.raises(ValueError, match='Unknown scheduler mode'):
+        load_scheduler_config(environ={}, mode='hourly')
+
+@pytest.mark.parametrize('mode', ['incremental', 'scheduled'])
+def test_run_once_generates_then_sweeps(session, make_policy, mode):
+    for _ in range(3):
+        make_policy(end_date=TODAY + timedelta(days=5))
+    ended = make_policy(start_date=TODAY - timedelta(days=400), end_date=TODAY - timedelta(days=35))
+    # An open reminder left over from before the policy ended
+    generate_reminders(session, days=30, today=TODAY - timedelta(days=60))
+    runner = build_scheduler(_config(mode=mode))
+
+    runner.run(once=True)
+
+    report = runner.status()
+    assert report['status'] == 'ok'
+    assert report['jobs']['generate']['rows'] == 3
+    assert report['jobs']['sweep']['last_result']['expired'] == 1
+    assert report['backlog']['pending_reminders'] == 3
+    assert all(reminder.policy_id != ended.id for reminder in list_reminders(session))
+
+def test_a_failing_job_is_reported_and_the_others_still_run(session):
+    def broken(session, stop):
+        raise RuntimeError('no route to host')
+
+    runner = Scheduler([Job('broken', 60, broken), Job('fine', 60, lambda session, stop: {'rows': 2})])
+    runner.run(once=True)
+
+    report = runner.status()
+    assert report['status'] == 'failing'
+    assert (report['jobs']['broken']['failures'], report['jobs']['broken']['last_error']) == (1, 'no route to host')
+    assert (report['jobs']['fine']['runs'], report['jobs']['fine']['rows']) == (1, 2)
+    assert 'insurance_tracker_scheduler_job_failures_total{job="broken"} 1' in runner.prometheus_text()
+
+def test_status_endpoint(session):
+    runner = Scheduler([Job('fine', 60, lambda session, stop: {'rows': 0})])
+    runner.run(once=True)
+    server = serve_status(runner, port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urlopen(f"{base}/health") as response:
+            assert json.load(response)['jobs']['fine']['runs'] == 1
+        with urlopen(f"{base}/metrics") as response:
+            assert b'insurance_tracker_scheduler_pending_reminders 0' in response.read()
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{base}/other")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
@@ -0,0 +1,22 @@
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from lib.models import SCHEMA_REVISION, _alembic_config, check_schema, upgrade_schema
+
+def test_schema_revision_is_the_newest_migration():
+    assert SCHEMA_REVISION == ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+def test_check_schema_accepts_a_migrated_database(database_url):
+    check_schema(create_engine(database_url))
+
+def test_check_schema_rejects_an_empty_database(tmp_path):
+    with pytest.raises(RuntimeError, match='has no schema'):
+        check_schema(create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+
+def test_check_schema_rejects_a_database_behind_the_newest_migration(tmp_path):
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    upgrade_schema(url, revision='e675ea6d79d4')
+
+    with pytest.raises(RuntimeError, match='is at revision e675ea6d79d4'):
+        check_schema(create_engine(url))
@@ -0,0 +1,89 @@
+from datetime import date
+from types import SimpleNamespace
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from lib import search
+from lib.helpers import add_client, add_policy
+from lib.models import PROJECT_ROOT
+
+@pytest.fixture(params=['fts', 'like'])
+def search_session(request, session, monkeypatch):
+    """
+    The session, searched through the trigram index and through the LIKE fallback.
+    """
+    if request.param == 'like':
+        monkeypatch.setattr(search, 'fts_available', lambda session: False)
+    else:
+        assert search.fts_available(session)
+    return session
+
+def test_match_score_prefers_earlier_columns_and_word_starts():
+    assert search.match_score(('Grace Kamau', 'Mombasa'), ['kamau']) == 0
+    assert search.match_score(('Grace Wakamau', 'Mombasa'), ['kamau']) == 1
+    assert search.match_score(('Grace', 'Kamau Road'), ['kamau']) == 2
+    assert search.match_score(('Grace', 'Mombasa'), ['kamau']) is None
+
+def test_clients_matching_every_term_are_ranked(search_session):
+    add_client(search_session, 'Brian Otieno', 'brian@example.com', None, 'Kamau Road, Nairobi')
+    best = add_client(search_session, 'Grace Kamau', 'grace@example.com', None, 'Nairobi')
+    add_client(search_session, 'Grace Wanjiru', 'wanjiru@example.com', None, 'Mombasa')
+
+    matches = search.search_clients(search_session, 'kamau, nairobi')
+
+    assert matches[0].client_id == best.id
+    assert len(matches) == 2
+    assert search.search_clients(search_session, ' , ') == []
+
+def test_best_matches_are_found_beyond_the_candidate_limit(search_session, monkeypatch):
+    monkeypatch.setattr(search, 'RANK_CANDIDATES', 5)
+    for number in range(20):
+        add_client(search_session, f"Client {number}", f"c{number}@example.com", None, 'Kamau Road, Nairobi')
+    # Added last, but the only client with the term in their name
+    best = add_client(search_session, 'Grace Kamau', 'grace@example.com', None, 'Mombasa')
+
+    matches = search.search_clients(search_session, 'kamau', limit=3)
+
+    assert matches[0].client_id == best.id
+    assert matches[0].score == 0
+
+def test_short_terms_filter_before_the_candidate_limit(search_session, monkeypatch):
+    monkeypatch.setattr(search, 'RANK_CANDIDATES', 5)
+    for number in range(20):
+        add_client(search_session, f"Wanjiru {number}", f"w{number}@example.com", None, 'Nakuru')
+    wanted = add_client(search_session, 'Wanjiru Ng', 'ng@example.com', None, 'Nakuru')
+
+    matches = search.search_clients(search_session, 'wanjiru ng')
+
+    assert [match.client_id for match in matches] == [wanted.id]
+
+def test_policy_search_by_number_prefix_and_company(search_session, make_policy):
+    policy = make_policy(insurance_company='Jubilee Insurance')
+    add_policy(
+        search_session, policy.client_id, 'KE-000000777', 'Health Insurance',
+        date(2026, 1, 1), date(2027, 1, 1), 100.0, 'Britam'
+    )
+
+    assert [match.policy_number for match in search.search_policies(search_session, 'ke-0000007')] == ['KE-000000777']
+    assert [match.policy_id for match in search.search_policies(search_session, 'jubilee')] == [policy.id]
+
+def _fts_migration():
+    path = os.path.join(PROJECT_ROOT, 'migrations', 'versions', 'f1c7a3d95b42_add_full_text_search_indexes.py')
+    spec = importlib.util.spec_from_file_location('fts_migration', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_migration_skips_the_index_without_the_trigram_tokenizer():
+    class NoTrigram:
+        dialect = SimpleNamespace(name='sqlite')
+
+        def exec_driver_sql(self, statement):
+            if statement.startswith('PRAGMA'):
+                return [('ENABLE_FTS5',)]
+            raise OperationalError(statement, {}, Exception('no such tokenizer: trigram'))
+
+    assert _fts_migration()._fts5_available(NoTrigram()) is False
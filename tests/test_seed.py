@@ -0,0 +1,13 @@
+from sqlalchemy import func, select
+
+from lib.db.seed import seed_data
+from lib.helpers import check_expiry_calendar
+from lib.models import Policy, PolicyChange
+
+def test_seeding_keeps_the_calendar_and_change_log_current(session):
+    seed_data()
+
+    policies = session.scalar(select(func.count(Policy.id)))
+    assert policies >= 10
+    assert check_expiry_calendar(session) == []
+    assert session.scalar(select(func.count(PolicyChange.id))) == policies
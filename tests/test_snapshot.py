@@ -0,0 +1,102 @@
+from datetime import date
+import os
+
+from sqlalchemy import delete
+
+from lib.db.seed import seed_data
+from lib.helpers import add_client, generate_reminders, get_data_versions, get_database_id, list_policies, update_policy
+from lib.models import DataVersion, configure_engine, upgrade_schema
+from lib.snapshot import PolicySnapshot, ReminderSnapshot, load_snapshot, open_snapshot, write_snapshot
+
+def test_policy_snapshot_windows_and_filters(session, make_policy):
+    make_policy(end_date=date(2026, 11, 1), premium_amount=100.0)
+    make_policy(end_date=date(2026, 12, 1), premium_amount=200.0, policy_type='Health Insurance')
+    make_policy(end_date=date(2027, 6, 1), premium_amount=400.0)
+
+    snapshot = PolicySnapshot.load(session)
+
+    window = snapshot.expiring(days=60, today=date(2026, 10, 17))
+    assert [row.end_date for row in snapshot.rows(window)] == [date(2026, 11, 1), date(2026, 12, 1)]
+    assert snapshot.premium_total(window) == 300.0
+    assert snapshot.select(type='Health Insurance') == [1]
+    assert snapshot.totals_by('type') == {'Motor Vehicle Insurance': (2, 500.0), 'Health Insurance': (1, 200.0)}
+
+def test_policy_snapshot_combines_filters(session, make_policy):
+    other = add_client(session, 'Brian Kamau', 'brian@example.com', '0722000000', 'Kisumu')
+    make_policy(end_date=date(2026, 11, 1), premium_amount=100.0, insurance_company=None)
+    wanted = make_policy(client_id=other.id, end_date=date(2026, 11, 2), premium_amount=900.0)
+    make_policy(client_id=other.id, end_date=date(2026, 11, 3), premium_amount=50.0)
+
+    snapshot = PolicySnapshot.load(session)
+
+    position, = snapshot.select(end=date(2026, 12, 1), client_id=other.id, min_premium=500.0)
+    assert snapshot.row(position) == (
+        wanted.id, other.id, 'Motor Vehicle Insurance', 'Jubilee', date(2026, 1, 1), date(2026, 11, 2), 900.0
+    )
+    assert snapshot.row(snapshot.select(insurance_company=None)[0]).insurance_company is None
+    assert snapshot.select(insurance_company='Unknown') == []
+    # Integer ids and dates, a double and two small codes per policy
+    assert snapshot.nbytes == len(snapshot) * 28
+
+def test_reminder_snapshot_decodes_statuses_and_offsets(session, make_policy):
+    policy = make_policy(end_date=date(2026, 11, 1))
+    generate_reminders(session, today=date(2026, 10, 1))
+
+    snapshot = ReminderSnapshot.load(session)
+
+    reminder, = snapshot.rows(snapshot.select(start=date(2026, 10, 1), status='pending'))
+    assert (reminder.policy_id, reminder.reminder_date, reminder.offset_days) == (policy.id, date(2026, 10, 1), None)
+    assert snapshot.select(status='sent') == []
+
+def test_load_snapshot_rebuilds_after_a_write(session, make_policy, tmp_path):
+    path = str(tmp_path / 'book.snapshot')
+    policy = make_policy(end_date=date(2026, 11, 1))
+    with load_snapshot(session, path) as first:
+        assert first.versions == get_data_versions(session)
+
+    update_policy(session, policy.id, end_date=date(2027, 2, 1))
+
+    with load_snapshot(session, path) as second:
+        assert second.versions == get_data_versions(session)
+        assert [row.end_date for row in second.policies.rows()] == [date(2027, 2, 1)]
+
+def test_seeding_makes_the_snapshot_stale(session, make_policy, tmp_path):
+    path = str(tmp_path / 'book.snapshot')
+    make_policy(end_date=date(2026, 11, 1))
+    write_snapshot(session, path)
+    versions = get_data_versions(session)
+
+    seed_data()
+
+    assert get_data_versions(session)['policies'] > versions['policies']
+    with open_snapshot(path) as stale:
+        assert not stale.is_current(session)
+    with load_snapshot(session, path) as current:
+        assert len(current.policies) == len(list_policies(session))
+
+def test_snapshot_of_a_recreated_database_is_not_current(session, make_policy, database_url, tmp_path):
+    path = str(tmp_path / 'book.snapshot')
+    make_policy(end_date=date(2026, 10, 27))
+    write_snapshot(session, path)
+    first_id = get_database_id(session)
+    session.close()
+
+    # Rebuild the database in place with the same counters but different data
+    os.unlink(database_url[len('sqlite:///'):])
+    upgrade_schema(database_url)
+    configure_engine(database_url=database_url)
+    make_policy(end_date=date(2027, 11, 21))
+    assert get_database_id(session) != first_id
+
+    with load_snapshot(session, path) as current:
+        assert current.database_id == get_database_id(session)
+        assert [row.end_date for row in current.policies.rows()] == [date(2027, 11, 21)]
+
+def test_database_id_is_created_on_first_use(session):
+    session.execute(delete(DataVersion).where(DataVersion.name == DataVersion.DATABASE_ID))
+    session.commit()
+
+    database_id = get_database_id(session)
+
+    assert database_id is not None
+    assert get_database_id(session) == database_id
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from lib.helpers import (
+    add_client, generate_reminders, get_client_portfolio, get_expiring_policies_with_clients,
+    iter_reminders_with_details, transition_reminders
+)
+from lib.models import Reminder, get_engine
+
+def test_expiring_policies_carry_client_contact_fields(session, make_policy):
+    soon = make_policy(end_date=date.today() + timedelta(days=5))
+    make_policy(end_date=date.today() + timedelta(days=200))
+
+    row, = get_expiring_policies_with_clients(session, days=30)
+
+    assert (row.policy_id, row.policy_number) == (soon.id, soon.policy_number)
+    assert (row.client_name, row.client_email, row.client_phone) == ('Amina Otieno', 'amina@example.com', '0712345678')
+
+def test_reminder_details_page_through_pending_reminders(session, make_policy):
+    today = date(2026, 10, 1)
+    policies = [make_policy(end_date=today + timedelta(days=10)) for _ in range(3)]
+    generate_reminders(session, today=today)
+    transition_reminders(session, Reminder.SENT, criteria=Reminder.policy_id == policies[0].id)
+
+    rows = list(iter_reminders_with_details(session, page_size=1))
+
+    assert [(row.policy_number, row.client_address) for row in rows] == [
+        (policies[1].policy_number, 'Nairobi'), (policies[2].policy_number, 'Nairobi')
+    ]
+
+def test_portfolio_is_walked_without_lazy_loads(session, make_policy):
+    client_id = add_client(session, 'Brian Kamau', 'brian@example.com', '0722000000', 'Kisumu').id
+    for _ in range(3):
+        make_policy(client_id=client_id, end_date=date.today() + timedelta(days=10))
+    generate_reminders(session)
+    session.expunge_all()
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(get_engine(), 'before_cursor_execute', listener)
+    try:
+        portfolio = get_client_portfolio(session, client_id)
+        reminders = [reminder.status for policy in portfolio.policies for reminder in policy.reminders]
+    finally:
+        event.remove(get_engine(), 'before_cursor_execute', listener)
+
+    assert reminders == [Reminder.PENDING] * 3
+    assert len(statements) == 3